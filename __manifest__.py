@@ -1,7 +1,7 @@
 {
     'name': 'Student Management System',
     'icon': '/odoo_student_management/static/img/academy.png',
-    'version': '18.0.1.0.1',
+    'version': '18.0.1.0.4',
     'category': 'Education',
     'summary': 'Complete Student Management System ',
     'description': """
@@ -36,7 +36,7 @@
     """,
     'author': 'Adnan Alrashed',
     'website': 'https://ittech-ye.net',
-    'depends': ['base', 'web', 'mail', 'documents', 'website'],
+    'depends': ['base', 'web', 'bus', 'mail', 'documents', 'website'],
     'data': [
         # Security
         'security/groups.xml',
@@ -46,6 +46,8 @@
         'data/sequence_data.xml',
         'data/session_year_data.xml',
         'data/course_data.xml',
+        'data/notification_cron.xml',
+        'data/grade_scale_data.xml',
         
         
         # Views
@@ -60,6 +62,7 @@
         'views/notification_views.xml',
         'views/res_users_views.xml',
         'views/student_result_views.xml',
+        'views/grade_scale_views.xml',
         'views/change_password_views.xml',
         'views/staff_profile_views.xml',
         'views/profile/student_profile_views.xml',
@@ -82,6 +85,10 @@
         'web.assets_backend': [
             # 'odoo_student_management/static/src/css/student_management.css',
             # 'odoo_student_management/static/src/js/student_management.js',
+            'odoo_student_management/static/src/js/notification_service.js',
+        ],
+        'web.assets_frontend': [
+            'odoo_student_management/static/src/js/notification_service.js',
         ],
     },
     'demo': [],
@@ -21,98 +21,37 @@ class StudentManagementAdminController(http.Controller):
         if not request.env.user.has_group(self.ADMIN_GROUP):
             raise AccessError("Access denied. Admin privileges required.")
 
-    # ===== دوال مساعدة للإحصائيات =====
-    def _safe_count(self, model_names, domain=None):
-        """يحاول العد على أول موديل متاح من القائمة (مع sudo)، وإلا يرجّع 0"""
-        domain = domain or []
-        for name in model_names:
-            try:
-                return request.env[name].sudo().search_count(domain)
-            except Exception:
-                continue
-        return 0
-
-    def _count_staff(self):
-        """
-        يحسب عدد الموظفين:
-        1) إن وُجد موديل staff مخصص: student_management.staff
-        2) وإلا: عدد مستخدمي res.users ضمن مجموعة الموظفين (fallback)
-        """
-        try:
-            count_staff_model = request.env['student_management.staff'].sudo().search_count([])
-            if count_staff_model:
-                return count_staff_model
-        except Exception:
-            pass
-
-        try:
-            staff_group = request.env.ref(self.STAFF_GROUP)
-            return request.env['res.users'].sudo().search_count([
-                ('groups_id', 'in', [staff_group.id]),
-                ('active', '=', True),
-            ])
-        except Exception:
-            return 0
-
-    def _count_status_any(self, model_names, field_candidates=('leave_status', 'state'), pending_values=('pending', 'to_approve', 'confirm')):
-        """
-        يحاول إيجاد حقل حالة صالح (leave_status أو state)، ثم يجمع القيم التي تُعد "قيد الموافقة".
-        يجرّب الموديلات بالترتيب ويرجع أول نتيجة صالحة (حتى لو كانت 0).
-        """
-        for model in model_names:
-            try:
-                env_model = request.env[model].sudo()
-            except Exception:
-                continue
-            # جرّب الحقول المحتملة
-            for field in field_candidates:
-                total = 0
-                field_ok = False
-                for val in pending_values:
-                    try:
-                        cnt = env_model.search_count([(field, '=', val)])
-                        total += int(cnt)
-                        field_ok = True
-                    except Exception:
-                        # هذا الحقل غير موجود أو القيمة غير صالحة للموديل الحالي
-                        continue
-                if field_ok:
-                    return total
-        return 0
-
     @http.route('/student_management/admin/dashboard', type='http', auth='user', website=True, methods=['GET'])
     def admin_dashboard(self, **kwargs):
         """Admin dashboard page"""
         try:
             self._check_admin_access()
 
-            values = {
-                # الأساسيات
-                'total_students':  self._safe_count(['student_management.student',  'student.student']),
-                'total_courses':   self._safe_count(['student_management.course',   'student.course']),
-                'total_subjects':  self._safe_count(['student_management.subject',  'student.subject']),
-                'total_staff':     self._count_staff(),
-
-                # إحصائيات إضافية
-                'total_sessions':  self._safe_count(['student_management.session_year', 'student.session_year']),
-                'total_attendance': self._safe_count(['student_management.attendance', 'student.attendance']),
-
-                # طلبات إجازة قيد الموافقة (موظفون/طلاب) — مرنة حسب حقول الحالة والموديلات
-                'pending_staff_leaves': self._count_status_any(
-                    ['student_management.leave_report_staff', 'hr.leave'],
-                    field_candidates=('leave_status', 'state'),
-                    pending_values=('pending', 'to_approve', 'confirm')
-                ),
-                'pending_student_leaves': self._count_status_any(
-                    ['student_management.leave_report_student', 'student_management.leave_report', 'hr.leave'],
-                    field_candidates=('leave_status', 'state'),
-                    pending_values=('pending', 'to_approve', 'confirm')
-                ),
-            }
+            # العدادات تُقرأ من لقطة مخزنة تُحدَّث عند تعديل البيانات أو انتهاء صلاحيتها
+            values = request.env['student_management.dashboard_snapshot'].sudo().get_admin_dashboard_values()
             return request.render('odoo_student_management.admin_dashboard_template', values)
         except AccessError:
             return request.redirect('/student_management/login')
 
+    @http.route('/student_management/api/admin/leave/bulk_decide', type='json', auth='user', methods=['POST'])
+    def bulk_decide_leaves(self, decision, leave_type='student', **kwargs):
+        """Approve, reject or reset many leave requests at once
+
+        Accepts the filters of ``bulk_decide``: ``ids``, ``course_id``,
+        ``session_year_id``, ``date_from``, ``date_to`` and ``admin_reply``.
+        """
+        try:
+            self._check_admin_access()
+            model_name = {
+                'student': 'student_management.leave_report_student',
+                'staff': 'student_management.leave_report_staff',
+            }[leave_type]
+            filters = {key: kwargs[key] for key in ('ids', 'course_id', 'session_year_id', 'date_from', 'date_to', 'admin_reply') if key in kwargs}
+            return dict(request.env[model_name].bulk_decide(decision, **filters), success=True)
+        except Exception as e:
+            _logger.error(f"Error in bulk leave decision: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
     # ==================== STAFF MANAGEMENT ====================
 
     @http.route('/student_management/admin/staff/add', type='http', auth='user', website=True, methods=['GET', 'POST'] )
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import logging
 from odoo import http
+from odoo.exceptions import AccessError
 from odoo.http import request
 
 _logger = logging.getLogger(__name__)
@@ -71,85 +72,124 @@ class StudentManagementMainController(http.Controller):
                 'error': str(e)
             }
 
+    def _group_counts(self, model_name, domain, groupby):
+        """Return ``{group key: count}`` from a single grouped query.
+
+        With one groupby field the key is the record, with several it is
+        the tuple of group values.
+        """
+        groups = request.env[model_name]._read_group(domain, groupby, ['__count'])
+        if len(groupby) == 1:
+            return {key: count for key, count in groups}
+        return {tuple(group[:-1]): group[-1] for group in groups}
+
+    def _rank_by_attendance(self, model_name, fname, offset, limit):
+        """Page ``model_name`` by present count, then by name.
+
+        Records without any present attendance follow the ranked ones, so
+        every page is full until the model runs out of records.
+        """
+        Attendance = request.env['student_management.attendance']
+        domain = [('status', '=', 'present'), (fname, '!=', False)]
+        ranked = Attendance._read_group(
+            domain, [fname], ['__count'],
+            order='__count desc', offset=offset, limit=limit,
+        )
+        records = request.env[model_name].browse([record.id for record, _count in ranked])
+        if limit and len(records) == limit:
+            return records
+        ranked_ids = [record.id for [record] in Attendance._read_group(domain, [fname])]
+        rest = request.env[model_name].search(
+            [('id', 'not in', ranked_ids)], order='name',
+            offset=max(offset - len(ranked_ids), 0),
+            limit=limit - len(records) if limit else None,
+        )
+        return records + rest
+
     @http.route('/student_management/dashboard_stats', type='json', auth='user', methods=['POST'])
-    def get_dashboard_stats(self, **kwargs):
-        """Get dashboard statistics for admin users"""
+    def get_dashboard_stats(self, limit=None, offset=0, order='name', **kwargs):
+        """Get dashboard statistics for admin users
+
+        Every metric comes from one grouped query, so the number of queries
+        does not depend on the number of students or staff. ``limit`` and
+        ``offset`` paginate the per-student and per-staff arrays; with
+        ``order='attendance'`` they are ranked by present count (top-N),
+        followed by the records without attendance in name order.
+        """
         try:
             # Check if user is admin
             if not request.env.user.has_group('odoo_student_management.group_student_management_admin'):
                 raise AccessError("Access denied. Admin privileges required.")
             
+            Student = request.env['student_management.student']
+            Staff = request.env['student_management.staff']
+            
             # Get basic counts
-            student_count = request.env['student_management.student'].search_count([])
-            staff_count = request.env['student_management.staff'].search_count([])
+            student_count = Student.search_count([])
+            staff_count = Staff.search_count([])
             course_count = request.env['student_management.course'].search_count([])
             subject_count = request.env['student_management.subject'].search_count([])
             
             # Get course statistics
-            courses = request.env['student_management.course'].search([])
+            students_per_course = self._group_counts('student_management.student', [], ['course_id'])
+            subjects_per_course = self._group_counts('student_management.subject', [], ['course_id'])
             course_stats = []
-            for course in courses:
+            for course in request.env['student_management.course'].search([]):
                 course_stats.append({
                     'name': course.course_name,
-                    'student_count': course.student_count,
-                    'subject_count': course.subject_count,
+                    'student_count': students_per_course.get(course, 0),
+                    'subject_count': subjects_per_course.get(course, 0),
                 })
             
             # Get subject statistics
-            subjects = request.env['student_management.subject'].search([])
+            students_per_subject = self._group_counts('student_management.student', [], ['subject_ids'])
             subject_stats = []
-            for subject in subjects:
+            for subject in request.env['student_management.subject'].search([]):
                 subject_stats.append({
                     'name': subject.subject_name,
                     'course': subject.course_id.course_name,
-                    'student_count': subject.student_count,
+                    'student_count': students_per_subject.get(subject, 0),
                 })
             
+            # Pick the staff and students to report on
+            offset = int(offset or 0)
+            limit = int(limit) if limit else None
+            if order == 'attendance':
+                staffs = self._rank_by_attendance('student_management.staff', 'staff_id', offset, limit)
+                students = self._rank_by_attendance('student_management.student', 'student_id', offset, limit)
+            else:
+                staffs = Staff.search([], offset=offset, limit=limit)
+                students = Student.search([], offset=offset, limit=limit)
+            
             # Get staff attendance statistics
+            staff_attendance = self._group_counts('student_management.attendance', [
+                ('staff_id', 'in', staffs.ids),
+                ('status', '=', 'present')
+            ], ['staff_id'])
+            staff_leaves = self._group_counts('student_management.leave_report_staff', [
+                ('staff_id', 'in', staffs.ids),
+                ('leave_status', '=', 'approved')
+            ], ['staff_id'])
             staff_stats = []
-            staffs = request.env['student_management.staff'].search([])
             for staff in staffs:
-                # Count attendance records for subjects taught by this staff
-                attendance_count = request.env['student_management.attendance'].search_count([
-                    ('subject_id.staff_id', '=', staff.id),
-                    ('status', '=', 'present')
-                ])
-                
-                # Count leave requests
-                leave_count = request.env['student_management.leave_report_staff'].search_count([
-                    ('staff_id', '=', staff.id),
-                    ('leave_status', '=', 'approved')
-                ])
-                
                 staff_stats.append({
                     'name': staff.name,
-                    'attendance_count': attendance_count,
-                    'leave_count': leave_count,
+                    'attendance_count': staff_attendance.get(staff, 0),
+                    'leave_count': staff_leaves.get(staff, 0),
                 })
             
             # Get student attendance statistics
+            student_attendance = self._group_counts('student_management.attendance', [
+                ('student_id', 'in', students.ids)
+            ], ['student_id', 'status'])
+            # Absences on approved leave are already recorded as excused
             student_stats = []
-            students = request.env['student_management.student'].search([])
             for student in students:
-                present_count = request.env['student_management.attendance'].search_count([
-                    ('student_id', '=', student.id),
-                    ('status', '=', 'present')
-                ])
-                
-                absent_count = request.env['student_management.attendance'].search_count([
-                    ('student_id', '=', student.id),
-                    ('status', '=', 'absent')
-                ])
-                
-                leave_count = request.env['student_management.leave_report_student'].search_count([
-                    ('student_id', '=', student.id),
-                    ('leave_status', '=', 'approved')
-                ])
-                
                 student_stats.append({
                     'name': student.name,
-                    'present_count': present_count,
-                    'absent_count': absent_count + leave_count,
+                    'present_count': student_attendance.get((student, 'present'), 0),
+                    'absent_count': student_attendance.get((student, 'absent'), 0),
+                    'excused_count': student_attendance.get((student, 'excused'), 0),
                 })
             
             return {
@@ -165,7 +205,12 @@ class StudentManagementMainController(http.Controller):
                     'subjects': subject_stats,
                     'staff': staff_stats,
                     'students': student_stats,
-                }
+                },
+                'pagination': {
+                    'offset': offset,
+                    'limit': limit,
+                    'order': order,
+                },
             }
         except Exception as e:
             _logger.error(f"Error getting dashboard stats: {str(e)}")
@@ -175,53 +220,19 @@ class StudentManagementMainController(http.Controller):
             }
 
     @http.route('/student_management/api/notifications', type='json', auth='user', methods=['POST'])
-    def get_notifications(self, **kwargs):
-        """Get notifications for current user"""
+    def get_notifications(self, limit=10, **kwargs):
+        """Get notifications for current user
+
+        Direct and broadcast notifications are merged, newest first; the
+        ``source`` key of each entry tells them apart. New notifications are
+        also pushed on the bus (``student_management/notification``), so
+        clients only need to call this when a push arrives.
+        """
         try:
-            user = request.env.user
-            notifications = []
-            
-            if user.has_group('odoo_student_management.group_student_management_student'):
-                # Get student notifications
-                student = request.env['student_management.student'].search([('user_id', '=', user.id)], limit=1)
-                if student:
-                    student_notifications = request.env['student_management.notification_student'].search([
-                        ('student_id', '=', student.id),
-                        ('is_read', '=', False)
-                    ], limit=10, order='create_date desc')
-                    
-                    for notif in student_notifications:
-                        notifications.append({
-                            'id': notif.id,
-                            'title': notif.title,
-                            'message': notif.message,
-                            'type': notif.notification_type,
-                            'priority': notif.priority,
-                            'date': notif.create_date.strftime('%Y-%m-%d %H:%M:%S'),
-                        })
-            
-            elif user.has_group('odoo_student_management.group_student_management_staff'):
-                # Get staff notifications
-                staff = request.env['student_management.staff'].search([('user_id', '=', user.id)], limit=1)
-                if staff:
-                    staff_notifications = request.env['student_management.notification_staff'].search([
-                        ('staff_id', '=', staff.id),
-                        ('is_read', '=', False)
-                    ], limit=10, order='create_date desc')
-                    
-                    for notif in staff_notifications:
-                        notifications.append({
-                            'id': notif.id,
-                            'title': notif.title,
-                            'message': notif.message,
-                            'type': notif.notification_type,
-                            'priority': notif.priority,
-                            'date': notif.create_date.strftime('%Y-%m-%d %H:%M:%S'),
-                        })
-            
+            inbox = request.env['student_management.notification_inbox'].sudo()._get_inbox(request.env.user)
             return {
                 'success': True,
-                'notifications': notifications
+                'notifications': inbox.get_notifications(limit=min(int(limit or 10), 100))
             }
         except Exception as e:
             _logger.error(f"Error getting notifications: {str(e)}")
@@ -230,13 +241,41 @@ class StudentManagementMainController(http.Controller):
                 'error': str(e)
             }
 
+    @http.route('/student_management/api/notifications/unread_count', type='http', auth='user', methods=['GET'])
+    def get_unread_count(self, **kwargs):
+        """Unread notification count for the badge
+
+        Answers from the inbox counters with a single query. The ETag lets
+        clients revalidate and get a 304 while the count is unchanged.
+        """
+        user = request.env.user
+        count = request.env['student_management.notification_inbox'].sudo()._get_unread_count(user)
+        etag = f'"{user.id}-{count}"'
+        headers = [('ETag', etag), ('Cache-Control', 'private, no-cache')]
+        if etag in request.httprequest.headers.get('If-None-Match', ''):
+            return request.make_response('', headers=headers, status=304)
+        return request.make_json_response({'unread_count': count}, headers=headers)
+
     @http.route('/student_management/api/mark_notification_read', type='json', auth='user', methods=['POST'])
-    def mark_notification_read(self, notification_id, **kwargs):
-        """Mark notification as read"""
+    def mark_notification_read(self, notification_id, source='direct', **kwargs):
+        """Mark notification as read
+
+        For ``source='broadcast'`` only that broadcast becomes read; the
+        older broadcasts keep their status.
+        """
         try:
             user = request.env.user
             
-            if user.has_group('odoo_student_management.group_student_management_student'):
+            if source == 'broadcast':
+                inbox = request.env['student_management.notification_inbox'].sudo()._get_inbox(user)
+                broadcast = request.env['student_management.notification_broadcast'].sudo().search(
+                    inbox._get_broadcast_domain() + [('id', '=', notification_id)], limit=1
+                )
+                if broadcast:
+                    inbox.mark_broadcast_read(broadcast)
+                    return {'success': True}
+
+            elif user.has_group('odoo_student_management.group_student_management_student'):
                 notification = request.env['student_management.notification_student'].browse(notification_id)
                 if notification.student_id.user_id.id == user.id:
                     notification.action_mark_as_read()
@@ -23,9 +23,46 @@ class StudentManagementStaffController(http.Controller):
             raise UserError("Staff record not found for current user")
         return staff
 
+    def _get_subject_attendance_data(self, subjects):
+        """Attendance records per subject, from one grouped query"""
+        counts = dict(request.env['student_management.attendance']._read_group(
+            [('subject_id', 'in', subjects.ids)], ['subject_id'], ['__count']
+        ))
+        return [{
+            'name': subject.subject_name,
+            'attendance_count': counts.get(subject, 0),
+        } for subject in subjects]
+
+    def _get_student_attendance_data(self, course_ids):
+        """Present/absent counts per student of ``course_ids``.
+
+        The roster and the counters are read with two queries, whatever
+        the number of students.
+        """
+        students = request.env['student_management.student'].search([('course_id', 'in', course_ids)])
+        on_leave = request.env['student_management.leave_report_student'].sudo().get_on_leave(owner_ids=students.ids)
+        counts = {
+            (student, status): count
+            for student, status, count in request.env['student_management.attendance']._read_group(
+                [('student_id', 'in', students.ids)], ['student_id', 'status'], ['__count']
+            )
+        }
+        return [{
+            'name': student.name,
+            'present_count': counts.get((student, 'present'), 0),
+            'absent_count': counts.get((student, 'absent'), 0),
+            'excused_count': counts.get((student, 'excused'), 0),
+            'on_leave': student in on_leave,
+        } for student in students]
+
     @http.route('/student_management/staff/dashboard', type='http', auth='user', website=True, methods=['GET'])
-    def staff_dashboard(self, **kwargs):
-        """Staff dashboard page"""
+    def staff_dashboard(self, lazy=None, **kwargs):
+        """Staff dashboard page
+
+        With ``lazy=1`` the page is rendered without the per-subject and
+        per-student tables, which are then fetched from
+        ``/student_management/api/staff/dashboard_tables``.
+        """
         try:
             self._check_staff_access()
             staff = self._get_current_staff()
@@ -50,32 +87,12 @@ class StudentManagementStaffController(http.Controller):
             
             subjects_count = len(subjects)
             
-            # Get attendance data by subject
-            subject_data = []
-            for subject in subjects:
-                attendance_count_subject = request.env['student_management.attendance'].search_count([('subject_id', '=', subject.id)])
-                subject_data.append({
-                    'name': subject.subject_name,
-                    'attendance_count': attendance_count_subject
-                })
-            
-            # Get student attendance data
-            students = request.env['student_management.student'].search([('course_id', 'in', course_ids)])
-            student_data = []
-            for student in students:
-                present_count = request.env['student_management.attendance'].search_count([
-                    ('student_id', '=', student.id),
-                    ('status', '=', 'present')
-                ])
-                absent_count = request.env['student_management.attendance'].search_count([
-                    ('student_id', '=', student.id),
-                    ('status', '=', 'absent')
-                ])
-                student_data.append({
-                    'name': student.name,
-                    'present_count': present_count,
-                    'absent_count': absent_count
-                })
+            lazy = lazy in ('1', 'true', 'True')
+            if lazy:
+                subject_data = student_data = []
+            else:
+                subject_data = self._get_subject_attendance_data(subjects)
+                student_data = self._get_student_attendance_data(course_ids)
             
             # استخدام القالب الصحيح للداشبورد
             return request.render('odoo_student_management.staff_dashboard_template', {
@@ -85,11 +102,30 @@ class StudentManagementStaffController(http.Controller):
                 'subjects_count': subjects_count,
                 'subject_data': subject_data,
                 'student_data': student_data,
+                'on_leave_today': bool(request.env['student_management.leave_report_staff'].sudo().get_on_leave(owner_ids=staff.ids)),
+                'lazy': lazy,
+                'unread_count': request.env['student_management.notification_inbox'].sudo()._get_unread_count(request.env.user),
                 'staff': staff
             })
         except AccessError:
             return request.redirect('/student_management/login')
 
+    @http.route('/student_management/api/staff/dashboard_tables', type='json', auth='user', methods=['POST'])
+    def get_dashboard_tables(self, **kwargs):
+        """Per-subject and per-student tables of the staff dashboard"""
+        try:
+            self._check_staff_access()
+            staff = self._get_current_staff()
+            subjects = request.env['student_management.subject'].search([('staff_id', '=', staff.id)])
+            return {
+                'success': True,
+                'subject_data': self._get_subject_attendance_data(subjects),
+                'student_data': self._get_student_attendance_data(subjects.mapped('course_id.id')),
+            }
+        except Exception as e:
+            _logger.error(f"Error getting dashboard tables: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
     # ==================== ATTENDANCE MANAGEMENT ====================
 
     # @http.route('/student_management/staff/attendance/take', type='http', auth='user', methods=['GET'])
@@ -109,8 +145,12 @@ class StudentManagementStaffController(http.Controller):
     #         return request.redirect('/student_management/login')
 
     @http.route('/student_management/api/staff/get_students', type='json', auth='user', methods=['POST'])
-    def get_students(self, subject_id, session_year_id, **kwargs):
-        """Get students for a subject and session year"""
+    def get_students(self, subject_id, session_year_id, attendance_date=None, **kwargs):
+        """Get students for a subject and session year
+
+        ``on_leave`` flags the students with an approved leave on
+        ``attendance_date`` (today by default).
+        """
         try:
             self._check_staff_access()
             
@@ -121,12 +161,16 @@ class StudentManagementStaffController(http.Controller):
                 ('course_id', '=', subject.course_id.id),
                 ('session_year_id', '=', session_year.id)
             ])
+            on_leave = request.env['student_management.leave_report_student'].sudo().get_on_leave(
+                attendance_date, students.ids
+            )
             
             student_data = []
             for student in students:
                 student_data.append({
                     'id': student.id,
-                    'name': student.name
+                    'name': student.name,
+                    'on_leave': student in on_leave
                 })
             
             return {
@@ -154,29 +198,18 @@ class StudentManagementStaffController(http.Controller):
             if subject.staff_id.id != staff.id:
                 raise AccessError("You are not authorized to take attendance for this subject")
             
-            # Create attendance record
-            attendance = request.env['student_management.attendance'].sudo().create({
-                'subject_id': subject_id,
-                'session_year_id': session_year_id,
-                'attendance_date': attendance_date,
-            })
-            
-            # Create attendance records for each student
-            for student_info in student_data:
-                student_id = student_info['id']
-                status = student_info['status']
-
-                request.env['student_management.attendance'].sudo().create({
-                    'student_id': student_id,
-                    'subject_id': subject_id,
-                    'session_year_id': session_year_id,
-                    'attendance_date': attendance_date,
-                    'status': status,
-                })
+            # Validate and store the whole roll call in one batch
+            outcome = request.env['student_management.attendance'].sudo().save_attendance_bulk(
+                subject_id, session_year_id, attendance_date, student_data
+            )
             
             return {
                 'success': True,
-                'message': 'Attendance saved successfully'
+                'message': 'Attendance saved successfully',
+                'created': outcome['created'],
+                'updated': outcome['updated'],
+                'failed': outcome['failed'],
+                'results': outcome['results'],
             }
         except Exception as e:
             _logger.error(f"Error saving attendance: {str(e)}")
@@ -294,6 +327,42 @@ class StudentManagementStaffController(http.Controller):
 
     # ==================== STUDENT RESULTS ====================
 
+    @http.route('/student_management/api/staff/results/import', type='http', auth='user', methods=['POST'])
+    def import_results(self, **kwargs):
+        """Import a CSV/XLSX gradebook for the subjects taught by the staff member.
+
+        The file is posted as ``gradebook`` in a multipart form that must
+        also carry the ``csrf_token`` of the session (the staff dashboard
+        form includes it); the file is read as a stream and the response
+        lists the number of created results and the rejected rows.
+        """
+        try:
+            self._check_staff_access()
+            staff = self._get_current_staff()
+
+            gradebook = request.httprequest.files.get('gradebook')
+            if not gradebook or not gradebook.filename:
+                raise UserError("No gradebook file was uploaded")
+
+            subjects = request.env['student_management.subject'].search([('staff_id', '=', staff.id)])
+            report = request.env['student_management.result_import']._import_gradebook(
+                gradebook.stream, gradebook.filename, subjects=subjects
+            )
+            return request.make_json_response({
+                'success': True,
+                'created': report['created'],
+                'failed': len(report['errors']),
+                'errors': report['errors'],
+            })
+        except AccessError:
+            raise
+        except Exception as e:
+            _logger.error(f"Error importing results: {str(e)}")
+            return request.make_json_response({
+                'success': False,
+                'error': str(e)
+            })
+
     # @http.route('/student_management/staff/results/add', type='http', auth='user', methods=['GET', 'POST'])
     # def add_student_result(self, **kwargs):
     #     """Add student result"""
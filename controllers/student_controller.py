@@ -11,6 +11,8 @@ _logger = logging.getLogger(__name__)
 class StudentManagementStudentController(http.Controller):
     """Student controller for Student Management System student operations"""
 
+    NOTIFICATIONS_PER_PAGE = 20
+
     def _check_student_access(self):
         """Check if current user has student access"""
         if not request.env.user.has_group('odoo_student_management.group_student_management_student'):
@@ -30,16 +32,8 @@ class StudentManagementStudentController(http.Controller):
             self._check_student_access()
             student = self._get_current_student()
             
-            # Get attendance statistics
-            total_attendance = request.env['student_management.attendance'].search_count([('student_id', '=', student.id)])
-            present_attendance = request.env['student_management.attendance'].search_count([
-                ('student_id', '=', student.id),
-                ('status', '=', 'present')
-            ])
-            absent_attendance = request.env['student_management.attendance'].search_count([
-                ('student_id', '=', student.id),
-                ('status', '=', 'absent')
-            ])
+            # Attendance figures come from one grouped query, cached per student
+            dashboard = request.env['student_management.dashboard_snapshot'].sudo().get_student_dashboard_values(student)
             
             # Get subjects count and course info with safe access
             subjects_count = 0
@@ -64,45 +58,17 @@ class StudentManagementStudentController(http.Controller):
             except Exception as e:
                 _logger.warning(f"Could not access session data for student {student.id}: {str(e)}")
             
-            # Get attendance data by subject
-            subject_data = []
-            try:
-                subjects = request.env['student_management.subject'].search([])
-                for subject in subjects:
-                    try:
-                        present_count = request.env['student_management.attendance'].search_count([
-                            ('student_id', '=', student.id),
-                            ('subject_id', '=', subject.id),
-                            ('status', '=', 'present')
-                        ])
-                        absent_count = request.env['student_management.attendance'].search_count([
-                            ('student_id', '=', student.id),
-                            ('subject_id', '=', subject.id),
-                            ('status', '=', 'absent')
-                        ])
-                        
-                        # Only add subjects with attendance records
-                        if present_count > 0 or absent_count > 0:
-                            subject_data.append({
-                                'name': subject.subject_name,
-                                'present_count': present_count,
-                                'absent_count': absent_count
-                            })
-                    except Exception as e:
-                        _logger.warning(f"Could not get attendance for subject {subject.id}: {str(e)}")
-                        continue
-            except Exception as e:
-                _logger.error(f"Error getting subject data: {str(e)}")
-            
             return request.render('odoo_student_management.student_dashboard_template', {
-                'total_attendance': total_attendance,
-                'present_attendance': present_attendance,
-                'absent_attendance': absent_attendance,
+                'total_attendance': dashboard['total_attendance'],
+                'present_attendance': dashboard['present_attendance'],
+                'absent_attendance': dashboard['absent_attendance'],
+                'excused_attendance': dashboard['excused_attendance'],
                 'subjects_count': subjects_count,
-                'subject_data': subject_data,
+                'subject_data': dashboard['subject_data'],
                 'student': student,
                 'course_name': course_name,
-                'session_name': session_name
+                'session_name': session_name,
+                'unread_count': request.env['student_management.notification_inbox'].sudo()._get_unread_count(request.env.user),
             })
         except AccessError:
             return request.redirect('/student_management/login')
@@ -350,25 +316,34 @@ class StudentManagementStudentController(http.Controller):
 
     # ==================== NOTIFICATIONS ====================
 
-    @http.route('/student_management/student/notifications', type='http', auth='user', methods=['GET'])
-    def view_notifications(self, **kwargs):
-        """View student notifications"""
+    @http.route([
+        '/student_management/student/notifications',
+        '/student_management/student/notifications/page/<int:page>',
+    ], type='http', auth='user', website=True, methods=['GET'])
+    def view_notifications(self, page=1, **kwargs):
+        """View student notifications, one page at a time"""
         try:
             self._check_student_access()
             student = self._get_current_student()
             
-            # Get notifications for this student
-            notifications = request.env['student_management.notification_student'].search([
-                ('student_id', '=', student.id)
-            ], order='create_date desc')
+            # Direct and course broadcast notifications, newest first
+            inbox = request.env['student_management.notification_inbox'].sudo()._get_inbox(request.env.user)
+            pager = request.website.pager(
+                url='/student_management/student/notifications',
+                total=inbox.count_notifications(),
+                page=page,
+                step=self.NOTIFICATIONS_PER_PAGE,
+            )
+            notifications = inbox.get_notifications(
+                limit=self.NOTIFICATIONS_PER_PAGE, unread_only=False, offset=pager['offset']
+            )
             
-            # Mark notifications as read when viewed
-            unread_notifications = notifications.filtered(lambda n: not n.is_read)
-            if unread_notifications:
-                unread_notifications.sudo().write({'is_read': True})
+            # Only the notifications shown on this page become read
+            inbox.mark_notifications_read(notifications)
             
             return request.render('odoo_student_management.student_notifications', {
                 'notifications': notifications,
+                'pager': pager,
                 'student': student
             })
         except AccessError:
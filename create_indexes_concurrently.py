@@ -0,0 +1,104 @@
+import os
+import sys
+
+import psycopg2
+
+# بيانات الاتصال بقاعدة بيانات أودو (يمكن تعديلها عبر متغيرات البيئة)
+DB_CONFIG = {
+    "dbname": os.environ.get("PGDATABASE"),
+    "user": os.environ.get("PGUSER", "postgres"),
+    "password": os.environ.get("PGPASSWORD", ""),
+    "host": os.environ.get("PGHOST", "localhost"),
+    "port": os.environ.get("PGPORT", "5432"),
+}
+
+# Same leave range expression as LEAVE_RANGE_SQL in models/leave.py
+LEAVE_RANGE_SQL = "daterange(leave_date, COALESCE(leave_end_date, leave_date), '[]')"
+
+# Same names as the ones declared by the models (index=True fields and init()),
+# so the module upgrade finds them already built and skips them.
+# (name, table, columns or SQL expressions[, {"method": ...}])
+INDEXES = [
+    # Single-column indexes declared with index=True
+    ("student_management_attendance__attendance_date_index", "student_management_attendance", ["attendance_date"]),
+    ("student_management_attendance__staff_id_index", "student_management_attendance", ["staff_id"]),
+    ("student_management_attendance_report__attendance_id_index", "student_management_attendance_report", ["attendance_id"]),
+    ("student_management_attendance_report__subject_id_index", "student_management_attendance_report", ["subject_id"]),
+    ("student_management_leave_report_student__leave_status_index", "student_management_leave_report_student", ["leave_status"]),
+    ("student_management_leave_report_staff__leave_status_index", "student_management_leave_report_staff", ["leave_status"]),
+    ("student_management_student_result__subject_id_index", "student_management_student_result", ["subject_id"]),
+    ("student_management_student_result__course_id_index", "student_management_student_result", ["course_id"]),
+    ("student_management_student_result__grade_scale_id_index", "student_management_student_result", ["grade_scale_id"]),
+    ("student_management_attendance__excused_leave_id_index", "student_management_attendance", ["excused_leave_id"]),
+    ("student_management_attendance_report__excused_leave_id_index", "student_management_attendance_report", ["excused_leave_id"]),
+    ("student_management_student__user_id_index", "student_management_student", ["user_id"]),
+    ("student_management_student__course_id_index", "student_management_student", ["course_id"]),
+    ("student_management_student__session_year_id_index", "student_management_student", ["session_year_id"]),
+    ("student_management_subject__course_id_index", "student_management_subject", ["course_id"]),
+    ("student_management_subject__staff_id_index", "student_management_subject", ["staff_id"]),
+    # Composite indexes declared in init()
+    ("student_management_attendance_student_status_index", "student_management_attendance", ["student_id", "status"]),
+    ("student_management_attendance_subject_session_date_index", "student_management_attendance", ["subject_id", "session_year_id", "attendance_date"]),
+    ("student_management_notification_student_student_read_index", "student_management_notification_student", ["student_id", "is_read"]),
+    ("student_management_notification_staff_staff_read_index", "student_management_notification_staff", ["staff_id", "is_read"]),
+    ("student_management_notification_student_retention_index", "student_management_notification_student", ["active", "create_date"]),
+    ("student_management_notification_staff_retention_index", "student_management_notification_staff", ["active", "create_date"]),
+    ("student_management_leave_report_student_student_status_index", "student_management_leave_report_student", ["student_id", "leave_status"]),
+    ("student_management_leave_report_staff_staff_status_index", "student_management_leave_report_staff", ["staff_id", "leave_status"]),
+    ("student_management_student_course_session_index", "student_management_student", ["course_id", "session_year_id"]),
+    # GiST indexes on (owner, leave range), see LeaveDecisionMixin._create_leave_range_index
+    ("student_management_leave_report_student_leave_range_index", "student_management_leave_report_student",
+     ["student_id", LEAVE_RANGE_SQL], {"method": "gist"}),
+    ("student_management_leave_report_staff_leave_range_index", "student_management_leave_report_staff",
+     ["staff_id", LEAVE_RANGE_SQL], {"method": "gist"}),
+]
+
+# شغّل هذا السكربت قبل ترقية الموديول على قواعد البيانات الكبيرة:
+# CREATE INDEX CONCURRENTLY لا يعمل داخل معاملة، وسكربتات الترحيل في أودو
+# تعمل داخل معاملة الترقية نفسها.
+if not DB_CONFIG["dbname"]:
+    sys.exit("حدد قاعدة البيانات عبر المتغير PGDATABASE")
+
+try:
+    print("جاري الاتصال بقاعدة البيانات...")
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    # The GiST indexes put the owner id next to the range
+    cur.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    for index_name, table_name, columns, *options in INDEXES:
+        options = options[0] if options else {}
+        cur.execute("SELECT 1 FROM pg_class WHERE relname = %s", (table_name,))
+        if not cur.fetchone():
+            print(f"الجدول {table_name} غير موجود، تم التخطي")
+            continue
+
+        # A failed concurrent build leaves an INVALID index behind: drop it first
+        cur.execute("""
+            SELECT i.indisvalid
+              FROM pg_class c
+              JOIN pg_index i ON i.indexrelid = c.oid
+             WHERE c.relname = %s
+        """, (index_name,))
+        row = cur.fetchone()
+        if row and row[0]:
+            print(f"الفهرس {index_name} موجود بالفعل")
+            continue
+        if row:
+            cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"')
+
+        print(f"جاري إنشاء الفهرس {index_name}...")
+        column_list = ", ".join(f'"{column}"' if column.isidentifier() else column for column in columns)
+        method = options.get("method", "btree")
+        cur.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index_name}" ON "{table_name}" '
+                    f'USING {method} ({column_list})')
+
+    print("تم إنشاء الفهارس بنجاح!")
+
+except Exception as e:
+    print(f"حدث خطأ: {str(e)}")
+finally:
+    if 'conn' in locals():
+        conn.close()
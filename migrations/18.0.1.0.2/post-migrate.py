@@ -0,0 +1,7 @@
+from odoo import api, SUPERUSER_ID
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    
+    # Fill the attendance aggregate table from the existing reports
+    env['student_management.attendance_stat']._rebuild_attendance_stats()
@@ -0,0 +1,7 @@
+from odoo import api, SUPERUSER_ID
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    
+    # Initialise the student attendance counters from the aggregate table
+    env['student_management.student']._recompute_attendance_counters()
@@ -0,0 +1,7 @@
+from odoo import api, SUPERUSER_ID
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    
+    # Fill the leave balance ledger from the existing leave requests
+    env['student_management.leave_balance']._rebuild_leave_balances()
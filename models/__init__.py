@@ -1,3 +1,4 @@
+from . import dashboard_snapshot
 from . import session_year
 from . import course
 from . import subject
@@ -7,8 +8,13 @@ from . import attendance
 from . import leave
 from . import feedback
 from . import notification
+from . import notification_broadcast
+from . import push_outbox
+from . import grade_scale
 from . import student_result
+from . import result_import
 from . import res_users
+from . import ir_websocket
 from . import staff_profile
 from . import change_password
 from . import student_profile
\ No newline at end of file
@@ -1,5 +1,10 @@
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
+
+from .leave import LEAVE_RANGE_SQL
 
 
 class Attendance(models.Model):
@@ -7,7 +12,9 @@ class Attendance(models.Model):
     _description = 'Attendance Session'
     _order = 'attendance_date desc, subject_id'
     _rec_name = 'display_name'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'student_management.dashboard.mixin']
+    _dashboard_counters = ('total_attendance',)
+    _dashboard_fields = ('student_id', 'subject_id', 'status')
 
     student_id = fields.Many2one(
         'student_management.student',
@@ -27,7 +34,8 @@ class Attendance(models.Model):
         string='Attendance Date',
         required=True,
         default=fields.Date.today,
-        help='Date when attendance was taken'
+        help='Date when attendance was taken',
+        index=True
     )
     session_year_id = fields.Many2one(
         'student_management.session_year',
@@ -55,7 +63,8 @@ class Attendance(models.Model):
         string='Staff',
         related='subject_id.staff_id',
         store=True,
-        readonly=True
+        readonly=True,
+        index=True
     )
     
     # Statistics
@@ -85,16 +94,39 @@ class Attendance(models.Model):
 
     status = fields.Selection(
         [('present', 'Present'),
-         ('absent', 'Absent')],
+         ('absent', 'Absent'),
+         ('excused', 'Excused')],
         string='Status',
         required=True,
         default='present'
     )
+    excused_leave_id = fields.Many2one(
+        'student_management.leave_report_student',
+        string='Excused By Leave',
+        ondelete='set null',
+        readonly=True,
+        index=True,
+        help='Approved leave that excused this absence; withdrawing the approval restores it'
+    )
     remarks = fields.Text(
         string='Remarks',
         help='Additional notes about the attendance'
     )
 
+    _sql_constraints = [
+        ('student_subject_date_session_unique',
+         'unique(student_id, subject_id, attendance_date, session_year_id)',
+         'Attendance for this student and subject on this date already exists.'),
+    ]
+
+    def init(self):
+        # Per-student status counts of the student and admin dashboards
+        create_index(self.env.cr, 'student_management_attendance_student_status_index',
+                     self._table, ['student_id', 'status'])
+        # Roll-call lookups by subject, session year and date (save/update attendance)
+        create_index(self.env.cr, 'student_management_attendance_subject_session_date_index',
+                     self._table, ['subject_id', 'session_year_id', 'attendance_date'])
+
     @api.depends('subject_id', 'attendance_date')
     def _compute_display_name(self):
         for record in self:
@@ -114,19 +146,33 @@ class Attendance(models.Model):
             else:
                 record.attendance_percentage = 0.0
 
-    @api.constrains('subject_id', 'attendance_date', 'session_year_id')
-    def _check_unique_attendance(self):
-        for record in self:
-            existing = self.search([
-                ('id', '!=', record.id),
-                ('subject_id', '=', record.subject_id.id),
-                ('attendance_date', '=', record.attendance_date),
-                ('session_year_id', '=', record.session_year_id.id)
-            ])
-            if existing:
-                raise ValidationError(
-                    f"Attendance for {record.subject_id.subject_name} on {record.attendance_date} already exists."
-                )
+    def write(self, vals):
+        """Move the aggregate counters of the session reports when the
+        session changes subject or session year."""
+        if 'subject_id' not in vals and 'session_year_id' not in vals:
+            return super().write(vals)
+        reports = self.attendance_report_ids
+        deltas = reports._get_attendance_stat_deltas(sign=-1)
+        result = super().write(vals)
+        for key, (total, present) in reports._get_attendance_stat_deltas().items():
+            deltas[key][0] += total
+            deltas[key][1] += present
+        self.env['student_management.attendance_stat']._apply_deltas(deltas)
+        return result
+
+    def unlink(self):
+        """Reports are removed by the database cascade, so release their
+        counters here."""
+        deltas = self.attendance_report_ids._get_attendance_stat_deltas(sign=-1)
+        result = super().unlink()
+        self.env['student_management.attendance_stat']._apply_deltas(deltas)
+        return result
+
+    def _get_dashboard_keys(self):
+        # The student dashboards of the concerned students are cached too
+        return super()._get_dashboard_keys() + [
+            f'student_dashboard:{student_id}' for student_id in set(self.student_id.ids)
+        ]
 
     def action_view_reports(self):
         """Action to view attendance reports for this session"""
@@ -156,24 +202,186 @@ class Attendance(models.Model):
         }
 
     @api.model
-    def create_attendance_reports(self, attendance_id):
-        """Create attendance reports for all students in the course"""
-        attendance = self.browse(attendance_id)
-        if not attendance.attendance_report_ids:
-            # Get all students in the course for this session year
-            students = self.env['student_management.student'].search([
-                ('course_id', '=', attendance.course_id.id),
-                ('session_year_id', '=', attendance.session_year_id.id),
-                ('active', '=', True)
-            ])
-            
-            # Create attendance reports for each student
-            for student in students:
-                self.env['student_management.attendance_report'].create({
-                    'student_id': student.id,
-                    'attendance_id': attendance.id,
-                    'status': False,  # Default to absent
+    def save_attendance_bulk(self, subject_id, session_year_id, attendance_date, student_data):
+        """Record a whole roll call for one subject session in a single batch.
+
+        ``student_data`` is a list of ``{'id': <student id>, 'status': 'present'|'absent'|'excused'}``
+        dicts. The roster is validated once, rows that already exist for the
+        session are updated with at most one write per status, and every new
+        row is inserted through one multi-row ``create``. Chatter tracking is
+        disabled for the batch. Students absent on an approved leave are
+        recorded as excused, using one leave lookup for the whole roster.
+
+        Student ids may be sent as strings (JSON clients); ids that are not
+        integers are reported on their row.
+
+        Returns a dict with ``created``/``updated``/``failed`` counters and a
+        ``results`` list holding one outcome per input row, in input order.
+        """
+        subject = self.env['student_management.subject'].browse(subject_id).exists()
+        session_year = self.env['student_management.session_year'].browse(session_year_id).exists()
+        if not subject:
+            raise ValidationError("Subject not found.")
+        if not session_year:
+            raise ValidationError("Session year not found.")
+        attendance_date = fields.Date.to_date(attendance_date)
+        valid_statuses = dict(self._fields['status'].selection)
+
+        student_ids = []
+        for info in student_data:
+            try:
+                student_ids.append(int(info.get('id')))
+            except (TypeError, ValueError):
+                student_ids.append(None)
+
+        # Resolve the whole roster with one query
+        requested_ids = [student_id for student_id in student_ids if student_id]
+        roster = self.env['student_management.student'].search([
+            ('id', 'in', requested_ids),
+            ('course_id', '=', subject.course_id.id),
+            ('session_year_id', '=', session_year.id),
+        ])
+        roster_ids = set(roster.ids)
+        on_leave = self.env['student_management.leave_report_student'].sudo()._get_approved_leaves_on(
+            attendance_date, list(roster_ids)
+        )
+
+        existing = self.search([
+            ('student_id', 'in', list(roster_ids)),
+            ('subject_id', '=', subject.id),
+            ('session_year_id', '=', session_year.id),
+            ('attendance_date', '=', attendance_date),
+        ])
+        existing_by_student = {record.student_id.id: record for record in existing}
+
+        results = []
+        seen = set()
+        to_create = []
+        to_update = {}
+        for info, student_id in zip(student_data, student_ids):
+            status = info.get('status')
+            leave_id = False
+            if status == 'absent' and student_id in on_leave:
+                status, leave_id = 'excused', on_leave[student_id]
+            outcome = {'student_id': student_id}
+            if student_id is None:
+                outcome.update(student_id=info.get('id'), result='error', error=f"Invalid student id '{info.get('id')}'.")
+            elif status not in valid_statuses:
+                outcome.update(result='error', error=f"Invalid status '{status}'.")
+            elif student_id not in roster_ids:
+                outcome.update(result='error', error="Student is not enrolled in this subject for the session year.")
+            elif student_id in seen:
+                outcome.update(result='error', error="Duplicate entry for this student.")
+            elif student_id in existing_by_student:
+                to_update.setdefault((status, leave_id), []).append(existing_by_student[student_id].id)
+                outcome.update(result='updated', status=status)
+            else:
+                to_create.append({
+                    'student_id': student_id,
+                    'subject_id': subject.id,
+                    'session_year_id': session_year.id,
+                    'attendance_date': attendance_date,
+                    'status': status,
+                    'excused_leave_id': leave_id,
                 })
+                outcome.update(result='created', status=status)
+            if student_id:
+                seen.add(student_id)
+            results.append(outcome)
+
+        batch = self.with_context(tracking_disable=True)
+        for (status, leave_id), record_ids in to_update.items():
+            batch.browse(record_ids).write({'status': status, 'excused_leave_id': leave_id})
+        created = batch.create(to_create) if to_create else self.browse()
+
+        created_by_student = {record.student_id.id: record.id for record in created}
+        for outcome in results:
+            if outcome['result'] == 'created':
+                outcome['attendance_id'] = created_by_student[outcome['student_id']]
+            elif outcome['result'] == 'updated':
+                outcome['attendance_id'] = existing_by_student[outcome['student_id']].id
+
+        return {
+            'created': len(created),
+            'updated': sum(len(ids) for ids in to_update.values()),
+            'failed': len([outcome for outcome in results if outcome['result'] == 'error']),
+            'results': results,
+        }
+
+    @api.model
+    def create_attendance_reports(self, attendance_ids):
+        """Create attendance reports for all students in the course.
+
+        Accepts a single session id or a list of ids, so the reports of many
+        sessions (e.g. a whole term's timetable) are generated in one batch.
+        """
+        if isinstance(attendance_ids, int):
+            attendance_ids = [attendance_ids]
+        return self.browse(attendance_ids)._create_attendance_reports()
+
+    def _create_attendance_reports(self):
+        """Materialise the missing reports of these sessions with one
+        roster query, one existing-report query and one multi-row create."""
+        sessions = self.filtered(lambda a: a.course_id and a.session_year_id)
+        AttendanceReport = self.env['student_management.attendance_report']
+        if not sessions:
+            return AttendanceReport
+
+        # Get all students of the involved courses and session years
+        students = self.env['student_management.student'].search([
+            ('course_id', 'in', sessions.course_id.ids),
+            ('session_year_id', 'in', sessions.session_year_id.ids),
+            ('active', '=', True)
+        ])
+        roster = defaultdict(list)
+        for student in students:
+            roster[(student.course_id.id, student.session_year_id.id)].append(student.id)
+
+        existing = {
+            (attendance.id, student.id)
+            for attendance, student in AttendanceReport._read_group(
+                [('attendance_id', 'in', sessions.ids)],
+                groupby=['attendance_id', 'student_id'],
+            )
+        }
+        excused = self._get_excused_pairs(sessions, students)
+
+        vals_list = [
+            {
+                'student_id': student_id,
+                'attendance_id': attendance.id,
+                'status': False,  # Default to absent
+                'is_excused': (attendance.id, student_id) in excused,
+                'excused_leave_id': excused.get((attendance.id, student_id), False),
+            }
+            for attendance in sessions
+            for student_id in roster[(attendance.course_id.id, attendance.session_year_id.id)]
+            if (attendance.id, student_id) not in existing
+        ]
+        if not vals_list:
+            return AttendanceReport
+        return AttendanceReport.with_context(tracking_disable=True).create(vals_list)
+
+    @api.model
+    def _get_excused_pairs(self, sessions, students):
+        """``{(session id, student id): leave id}`` of the students on
+        approved leave on the session date, from one join against the leave
+        requests"""
+        if not sessions or not students:
+            return {}
+        self.env['student_management.leave_report_student'].flush_model()
+        self.flush_model(['attendance_date'])
+        self.env.cr.execute(f"""
+            SELECT session.id, leave.student_id, leave.id
+              FROM student_management_attendance AS session
+              JOIN student_management_leave_report_student AS leave
+                ON leave.leave_status = 'approved'
+               AND {LEAVE_RANGE_SQL}
+                   @> session.attendance_date
+             WHERE session.id IN %s
+               AND leave.student_id IN %s
+        """, [tuple(sessions.ids), tuple(students.ids)])
+        return {(session_id, student_id): leave_id for session_id, student_id, leave_id in self.env.cr.fetchall()}
 
 
 class AttendanceReport(models.Model):
@@ -185,13 +393,11 @@ class AttendanceReport(models.Model):
 
     total_attendance = fields.Integer(
         string='Total Attendance',
-        compute='_compute_attendance_stats',
-        store=True
+        compute='_compute_attendance_stats'
     )
     attendance_percentage = fields.Float(
         string='Attendance Percentage',
-        compute='_compute_attendance_stats',
-        store=True
+        compute='_compute_attendance_stats'
     )
     last_updated = fields.Datetime(
         string='Last Updated',
@@ -219,13 +425,27 @@ class AttendanceReport(models.Model):
         string='Attendance Session',
         required=True,
         ondelete='cascade',
-        help='Attendance session this report belongs to'
+        help='Attendance session this report belongs to',
+        index=True
     )
     status = fields.Boolean(
         string='Present',
         default=False,
         help='True if student was present, False if absent'
     )
+    is_excused = fields.Boolean(
+        string='Excused',
+        default=False,
+        help='Absent on an approved leave; not counted in the attendance statistics'
+    )
+    excused_leave_id = fields.Many2one(
+        'student_management.leave_report_student',
+        string='Excused By Leave',
+        ondelete='set null',
+        readonly=True,
+        index=True,
+        help='Approved leave that excused this absence; withdrawing the approval restores it'
+    )
     display_name = fields.Char(
         string='Display Name',
         compute='_compute_display_name',
@@ -238,7 +458,8 @@ class AttendanceReport(models.Model):
         string='Subject',
         related='attendance_id.subject_id',
         store=True,
-        readonly=True
+        readonly=True,
+        index=True
     )
     attendance_date = fields.Date(
         string='Date',
@@ -268,43 +489,77 @@ class AttendanceReport(models.Model):
         compute='_compute_attendance_records'
     )
 
-    @api.depends('student_id', 'attendance_id', 'status')
+    _sql_constraints = [
+        ('student_attendance_unique',
+         'unique(student_id, attendance_id)',
+         'Attendance report for this student in this session already exists.'),
+    ]
+
+    @api.depends('student_id', 'attendance_id', 'status', 'is_excused')
     def _compute_display_name(self):
         for record in self:
             if record.student_id and record.attendance_id:
-                status_text = "Present" if record.status else "Absent"
+                status_text = "Present" if record.status else "Excused" if record.is_excused else "Absent"
                 record.display_name = f"{record.student_id.name} - {status_text}"
             else:
                 record.display_name = "New Attendance Report"
 
-    @api.depends('student_id', 'attendance_id')
+    @api.depends('student_id', 'subject_id', 'session_year_id', 'status')
     def _compute_attendance_stats(self):
-        """Compute attendance statistics for the student"""
+        """Read the statistics from the maintained aggregate table"""
+        stats = self.env['student_management.attendance_stat'].search([
+            ('student_id', 'in', self.student_id.ids),
+            ('subject_id', 'in', self.subject_id.ids),
+            ('session_year_id', 'in', self.session_year_id.ids),
+        ])
+        stats_by_key = {
+            (stat.student_id.id, stat.subject_id.id, stat.session_year_id.id): stat
+            for stat in stats
+        }
         for report in self:
-            domain = [
-                ('student_id', '=', report.student_id.id),
-                ('subject_id', '=', report.subject_id.id)
-            ]
-            all_reports = self.search(domain)
-            report.total_attendance = len(all_reports)
-            present_reports = all_reports.filtered(lambda r: r.status)
-            if report.total_attendance > 0:
-                report.attendance_percentage = (len(present_reports) / report.total_attendance) * 100
-            else:
-                report.attendance_percentage = 0.0
+            stat = stats_by_key.get(
+                (report.student_id.id, report.subject_id.id, report.session_year_id.id)
+            )
+            report.total_attendance = stat.total_count if stat else 0
+            report.attendance_percentage = stat.attendance_percentage if stat else 0.0
 
-    @api.constrains('student_id', 'attendance_id')
-    def _check_unique_student_attendance(self):
-        for record in self:
-            existing = self.search([
-                ('id', '!=', record.id),
-                ('student_id', '=', record.student_id.id),
-                ('attendance_id', '=', record.attendance_id.id)
-            ])
-            if existing:
-                raise ValidationError(
-                    f"Attendance report for {record.student_id.name} in this session already exists."
-                )
+    def _get_attendance_stat_deltas(self, sign=1):
+        """Return the counter contribution of these reports, keyed by
+        (student, subject, session year)."""
+        deltas = defaultdict(lambda: [0, 0])
+        for report in self:
+            if report.is_excused and not report.status:
+                continue
+            key = (report.student_id.id, report.subject_id.id, report.session_year_id.id)
+            deltas[key][0] += sign
+            if report.status:
+                deltas[key][1] += sign
+        return deltas
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        reports = super().create(vals_list)
+        self.env['student_management.attendance_stat']._apply_deltas(
+            reports._get_attendance_stat_deltas()
+        )
+        return reports
+
+    def write(self, vals):
+        if not {'status', 'is_excused', 'student_id', 'attendance_id'} & set(vals):
+            return super().write(vals)
+        deltas = self._get_attendance_stat_deltas(sign=-1)
+        result = super().write(vals)
+        for key, (total, present) in self._get_attendance_stat_deltas().items():
+            deltas[key][0] += total
+            deltas[key][1] += present
+        self.env['student_management.attendance_stat']._apply_deltas(deltas)
+        return result
+
+    def unlink(self):
+        deltas = self._get_attendance_stat_deltas(sign=-1)
+        result = super().unlink()
+        self.env['student_management.attendance_stat']._apply_deltas(deltas)
+        return result
 
     def toggle_status(self):
         """Toggle attendance status between present and absent"""
@@ -344,4 +599,143 @@ class AttendanceReport(models.Model):
         }
 
 
+class AttendanceStat(models.Model):
+    _name = 'student_management.attendance_stat'
+    _description = 'Student Attendance Statistics'
+    _order = 'student_id, subject_id'
 
+    student_id = fields.Many2one(
+        'student_management.student',
+        string='Student',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+    subject_id = fields.Many2one(
+        'student_management.subject',
+        string='Subject',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+    session_year_id = fields.Many2one(
+        'student_management.session_year',
+        string='Session Year',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+    total_count = fields.Integer(
+        string='Total Sessions',
+        readonly=True,
+        default=0
+    )
+    present_count = fields.Integer(
+        string='Present Sessions',
+        readonly=True,
+        default=0
+    )
+    attendance_percentage = fields.Float(
+        string='Attendance Percentage',
+        readonly=True,
+        default=0.0,
+        aggregator='avg'
+    )
+
+    _sql_constraints = [
+        ('student_subject_session_unique',
+         'unique(student_id, subject_id, session_year_id)',
+         'Attendance statistics already exist for this student, subject and session year.'),
+    ]
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """Add counter deltas with a single statement.
+
+        ``deltas`` maps ``(student_id, subject_id, session_year_id)`` to a
+        ``[total_delta, present_delta]`` pair. Existing rows get the raw
+        deltas, clamped at zero; the missing ones are inserted with the
+        clamped deltas, ``ON CONFLICT`` covering rows created concurrently.
+        """
+        rows = sorted(
+            (student_id, subject_id, session_year_id, total, present)
+            for (student_id, subject_id, session_year_id), (total, present) in deltas.items()
+            if student_id and subject_id and session_year_id and (total or present)
+        )
+        if not rows:
+            return
+        self.env.cr.execute(f"""
+            WITH delta (student_id, subject_id, session_year_id, total, present) AS (
+                VALUES {', '.join(['%s'] * len(rows))}
+            ), updated AS (
+                UPDATE student_management_attendance_stat AS stat
+                   SET total_count = GREATEST(stat.total_count + d.total, 0),
+                       present_count = GREATEST(stat.present_count + d.present, 0),
+                       attendance_percentage = CASE
+                           WHEN stat.total_count + d.total > 0
+                           THEN 100.0 * GREATEST(stat.present_count + d.present, 0)
+                                / (stat.total_count + d.total)
+                           ELSE 0 END,
+                       write_uid = %s,
+                       write_date = NOW() AT TIME ZONE 'UTC'
+                  FROM delta AS d
+                 WHERE stat.student_id = d.student_id
+                   AND stat.subject_id = d.subject_id
+                   AND stat.session_year_id = d.session_year_id
+             RETURNING stat.student_id, stat.subject_id, stat.session_year_id
+            )
+            INSERT INTO student_management_attendance_stat AS stat
+                (student_id, subject_id, session_year_id, total_count, present_count,
+                 attendance_percentage, create_uid, create_date, write_uid, write_date)
+            SELECT d.student_id, d.subject_id, d.session_year_id,
+                   GREATEST(d.total, 0), GREATEST(d.present, 0),
+                   CASE WHEN d.total > 0 THEN 100.0 * GREATEST(d.present, 0) / d.total ELSE 0 END,
+                   %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+              FROM delta AS d
+             WHERE NOT EXISTS (
+                    SELECT 1 FROM updated AS u
+                     WHERE u.student_id = d.student_id
+                       AND u.subject_id = d.subject_id
+                       AND u.session_year_id = d.session_year_id)
+            ON CONFLICT (student_id, subject_id, session_year_id) DO UPDATE SET
+                total_count = GREATEST(stat.total_count + EXCLUDED.total_count, 0),
+                present_count = GREATEST(stat.present_count + EXCLUDED.present_count, 0),
+                attendance_percentage = CASE
+                    WHEN stat.total_count + EXCLUDED.total_count > 0
+                    THEN 100.0 * GREATEST(stat.present_count + EXCLUDED.present_count, 0)
+                         / (stat.total_count + EXCLUDED.total_count)
+                    ELSE 0 END,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, [*rows, self.env.uid, self.env.uid, self.env.uid])
+        self.invalidate_model()
+
+        # Roll the same deltas up into the per-student counters
+        student_deltas = defaultdict(lambda: [0, 0])
+        for student_id, _subject_id, _session_year_id, total, present in rows:
+            student_deltas[student_id][0] += total
+            student_deltas[student_id][1] += present
+        self.env['student_management.student']._apply_attendance_deltas(student_deltas)
+
+    @api.model
+    def _rebuild_attendance_stats(self):
+        """Rebuild every counter from the attendance reports in one pass"""
+        self.env['student_management.attendance_report'].flush_model()
+        self.env.cr.execute("DELETE FROM student_management_attendance_stat")
+        self.env.cr.execute("""
+            INSERT INTO student_management_attendance_stat
+                (student_id, subject_id, session_year_id, total_count, present_count,
+                 attendance_percentage, create_uid, create_date, write_uid, write_date)
+            SELECT student_id, subject_id, session_year_id,
+                   COUNT(*), COUNT(*) FILTER (WHERE status),
+                   100.0 * COUNT(*) FILTER (WHERE status) / COUNT(*),
+                   %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+              FROM student_management_attendance_report
+             WHERE student_id IS NOT NULL
+               AND subject_id IS NOT NULL
+               AND session_year_id IS NOT NULL
+               AND (status OR NOT COALESCE(is_excused, FALSE))
+          GROUP BY student_id, subject_id, session_year_id
+        """, [self.env.uid, self.env.uid])
+        self.invalidate_model()
+        return True
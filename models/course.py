@@ -24,7 +24,9 @@ class Course(models.Model):
         'mail.activity.mixin',         # لدعم الأنشطة المجدولة
         'mail.tracking.duration.mixin',# لتتبع مدة المراحل
         'ir.attachment',               # لربط المرفقات مباشرة بالنموذج
+        'student_management.dashboard.mixin',  # لتحديث عدادات لوحة التحكم
     ]
+    _dashboard_counters = ('total_courses',)
 
     course_name = fields.Char(
         string='Course Name',
@@ -0,0 +1,286 @@
+import json
+import logging
+from datetime import timedelta
+
+import psycopg2
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class DashboardSnapshot(models.Model):
+    _name = 'student_management.dashboard_snapshot'
+    _description = 'Dashboard Counter Snapshot'
+    _order = 'key'
+    _rec_name = 'key'
+
+    key = fields.Char(
+        string='Key',
+        required=True,
+        readonly=True,
+        help='Identifier of the cached dashboard value'
+    )
+    value = fields.Json(
+        string='Value',
+        readonly=True
+    )
+    computed_at = fields.Datetime(
+        string='Computed At',
+        readonly=True
+    )
+    version = fields.Integer(
+        string='Version',
+        readonly=True,
+        help='Value of the invalidation sequence of the key when the snapshot was computed'
+    )
+    invalidated_at = fields.Datetime(
+        string='Invalidated At',
+        readonly=True,
+        help='Last invalidation of a key without sequence; snapshots computed '
+             'by transactions started before it are stale'
+    )
+
+    _sql_constraints = [
+        ('key_unique', 'unique(key)', 'Dashboard snapshot key must be unique.'),
+    ]
+
+    # Admin dashboard counters: key -> (model, domain)
+    _ADMIN_COUNTERS = {
+        'total_students': ('student_management.student', []),
+        'total_courses': ('student_management.course', []),
+        'total_subjects': ('student_management.subject', []),
+        'total_staff': ('student_management.staff', []),
+        'total_sessions': ('student_management.session_year', []),
+        'total_attendance': ('student_management.attendance', []),
+        'pending_staff_leaves': ('student_management.leave_report_staff', [('leave_status', '=', 'pending')]),
+        'pending_student_leaves': ('student_management.leave_report_student', [('leave_status', '=', 'pending')]),
+    }
+
+    def init(self):
+        # Invalidating an admin counter bumps its sequence instead of writing
+        # the shared snapshot row, so concurrent writers never contend on it
+        for key in self._ADMIN_COUNTERS:
+            self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {self._get_sequence_name(key)}")
+
+    @api.model
+    def _get_sequence_name(self, key):
+        return f'student_management_dashboard_{key}_seq'
+
+    @api.model
+    def _get_versions(self, keys):
+        """Current invalidation version of the admin counters among ``keys``,
+        read with one query; other keys have no version"""
+        versioned = [key for key in keys if key in self._ADMIN_COUNTERS]
+        if not versioned:
+            return {}
+        # A sequence that was never bumped reports last_value 1 until its first nextval
+        self.env.cr.execute(' UNION ALL '.join(
+            f"SELECT %s, CASE WHEN is_called THEN last_value ELSE 0 END"
+            f"  FROM {self._get_sequence_name(key)}" for key in versioned
+        ), versioned)
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _get_ttl(self):
+        """Maximum age of a snapshot, in seconds"""
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'student_management.dashboard_cache_ttl', 300
+        ))
+
+    @api.model
+    def _get_snapshots(self, keys, compute):
+        """Return ``{key: value}`` for ``keys``.
+
+        Fresh snapshots are read with one query; missing, expired or
+        invalidated ones are computed by ``compute(missing_keys)`` (which
+        returns a dict) and stored with a single upsert. Storing is best
+        effort: a concurrent refresh of the same rows only skips the cache.
+        """
+        if not keys:
+            return {}
+        # Versions are read before computing: an invalidation committed
+        # meanwhile leaves the new snapshot stale rather than wrong. Other
+        # keys compare computed_at, the start of the computing transaction,
+        # with their invalidation time, which the upsert below never resets.
+        versions = self._get_versions(keys)
+        limit = fields.Datetime.now() - timedelta(seconds=self._get_ttl())
+        self.env.cr.execute("""
+            SELECT key, value, version
+              FROM student_management_dashboard_snapshot
+             WHERE key IN %s AND computed_at >= %s
+               AND (invalidated_at IS NULL OR computed_at > invalidated_at)
+        """, [tuple(keys), limit])
+        values = {
+            key: value
+            for key, value, version in self.env.cr.fetchall()
+            if key not in versions or version == versions[key]
+        }
+
+        missing = [key for key in keys if key not in values]
+        if missing:
+            computed = compute(missing)
+            rows = [(key, json.dumps(computed[key]), versions.get(key, 0)) for key in missing]
+            try:
+                with self.env.cr.savepoint():
+                    self.env.cr.execute(f"""
+                        INSERT INTO student_management_dashboard_snapshot AS snapshot
+                            (key, value, version, computed_at, create_uid, create_date, write_uid, write_date)
+                        SELECT v.key, v.value::jsonb, v.version, NOW() AT TIME ZONE 'UTC',
+                               %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+                          FROM (VALUES {', '.join(['%s'] * len(rows))}) AS v(key, value, version)
+                        ON CONFLICT (key) DO UPDATE SET
+                            value = EXCLUDED.value,
+                            version = EXCLUDED.version,
+                            computed_at = EXCLUDED.computed_at,
+                            write_uid = EXCLUDED.write_uid,
+                            write_date = EXCLUDED.write_date
+                    """, [self.env.uid, self.env.uid, *rows])
+            except psycopg2.errors.SerializationFailure:
+                _logger.debug("Dashboard snapshots %s refreshed concurrently, not cached", missing)
+            self.invalidate_model()
+            values.update(computed)
+        return values
+
+    @api.model
+    def _invalidate_snapshots(self, keys):
+        """Invalidate the snapshots of ``keys`` once the transaction commits.
+
+        The writing transaction never touches the snapshot rows: after the
+        commit, admin counters get their sequence bumped and the other
+        (per-user) snapshots are stamped with the invalidation time in a
+        short transaction of their own.
+        """
+        if not keys:
+            return
+        pending = self.env.cr.postcommit.data.setdefault('student_management.dashboard_keys', set())
+        if not pending:
+            self.env.cr.postcommit.add(lambda: self._apply_invalidations(pending))
+        pending.update(keys)
+
+    @api.model
+    def _apply_invalidations(self, keys):
+        versioned = [key for key in keys if key in self._ADMIN_COUNTERS]
+        others = [key for key in keys if key not in self._ADMIN_COUNTERS]
+        try:
+            with self.env.registry.cursor() as cr:
+                if versioned:
+                    cr.execute('SELECT ' + ', '.join(
+                        f"nextval('{self._get_sequence_name(key)}')" for key in versioned
+                    ))
+                if others:
+                    # Insert a marker row when the key has no snapshot yet, so a
+                    # reader that started before the commit cannot store one
+                    cr.execute(f"""
+                        INSERT INTO student_management_dashboard_snapshot AS snapshot
+                            (key, invalidated_at, create_date, write_date)
+                        SELECT v.key, NOW() AT TIME ZONE 'UTC',
+                               NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+                          FROM (VALUES {', '.join(['(%s)'] * len(others))}) AS v(key)
+                        ON CONFLICT (key) DO UPDATE SET
+                            invalidated_at = EXCLUDED.invalidated_at,
+                            write_date = EXCLUDED.write_date
+                    """, sorted(others))
+        except psycopg2.Error as e:
+            # The snapshots still expire with the TTL
+            _logger.warning("Could not invalidate dashboard snapshots %s: %s", sorted(keys), e)
+
+    @api.model
+    def get_admin_dashboard_values(self):
+        """Counters displayed on the admin dashboard"""
+        return self._get_snapshots(list(self._ADMIN_COUNTERS), self._compute_admin_counters)
+
+    @api.model
+    def _compute_admin_counters(self, keys):
+        values = {}
+        for key in keys:
+            model_name, domain = self._ADMIN_COUNTERS[key]
+            values[key] = self.env[model_name].sudo().search_count(domain)
+
+        # Fall back to the members of the staff group when no staff profile exists yet
+        if 'total_staff' in values and not values['total_staff']:
+            staff_group = self.env.ref('odoo_student_management.group_student_management_staff', raise_if_not_found=False)
+            if staff_group:
+                values['total_staff'] = self.env['res.users'].sudo().search_count([
+                    ('groups_id', 'in', [staff_group.id]),
+                    ('active', '=', True),
+                ])
+        return values
+
+    @api.model
+    def get_student_dashboard_values(self, student):
+        """Attendance figures of the student dashboard, cached per student
+        until one of their attendance records changes"""
+        key = f'student_dashboard:{student.id}'
+        return self._get_snapshots(
+            [key], lambda keys: {key: self._compute_student_dashboard(student)}
+        )[key]
+
+    @api.model
+    def _compute_student_dashboard(self, student):
+        """Per-subject present/absent/excused counts from a single grouped query.
+
+        Only the subjects of the student's course are listed; the totals
+        cover every attendance record of the student.
+        """
+        groups = self.env['student_management.attendance'].sudo()._read_group(
+            [('student_id', '=', student.id)], ['subject_id', 'status'], ['__count']
+        )
+        totals = {'present': 0, 'absent': 0, 'excused': 0}
+        per_subject = {}
+        for subject, status, count in groups:
+            totals[status] = totals.get(status, 0) + count
+            if not student.course_id or subject.course_id == student.course_id:
+                per_subject.setdefault(subject, {'present': 0, 'absent': 0, 'excused': 0})[status] = count
+
+        subject_data = [{
+            'name': subject.subject_name,
+            'present_count': counts['present'],
+            'absent_count': counts['absent'],
+            'excused_count': counts['excused'],
+        } for subject, counts in sorted(per_subject.items(), key=lambda item: item[0].subject_name or '')]
+        return {
+            'total_attendance': sum(totals.values()),
+            'present_attendance': totals['present'],
+            'absent_attendance': totals['absent'],
+            'excused_attendance': totals['excused'],
+            'subject_data': subject_data,
+        }
+
+
+class DashboardCounterMixin(models.AbstractModel):
+    _name = 'student_management.dashboard.mixin'
+    _description = 'Dashboard Counter Invalidation'
+
+    # Snapshot keys affected by creating/deleting records of the model
+    _dashboard_counters = ()
+    # Fields whose change also affects those keys
+    _dashboard_fields = ('active',)
+
+    def _get_dashboard_keys(self):
+        """Snapshot keys affected by the records of ``self``"""
+        return list(self._dashboard_counters)
+
+    def _invalidate_dashboard_counters(self, keys=None):
+        if keys is None:
+            keys = self._get_dashboard_keys()
+        self.env['student_management.dashboard_snapshot']._invalidate_snapshots(keys)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._invalidate_dashboard_counters()
+        return records
+
+    def write(self, vals):
+        if not set(self._dashboard_fields) & set(vals):
+            return super().write(vals)
+        # Keys may depend on the written values: collect them before and after
+        keys = set(self._get_dashboard_keys())
+        result = super().write(vals)
+        self._invalidate_dashboard_counters(keys | set(self._get_dashboard_keys()))
+        return result
+
+    def unlink(self):
+        self._invalidate_dashboard_counters()
+        return super().unlink()
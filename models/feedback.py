@@ -242,7 +242,11 @@ class FeedbackStaff(models.Model):
 
     @api.model
     def get_feedback_summary(self, date_from=None, date_to=None):
-        """Get feedback summary statistics"""
+        """Get feedback summary statistics
+
+        One grouped query per feedback model, over category and reply
+        status, whatever the size of the date range.
+        """
         domain = []
         
         if date_from:
@@ -250,34 +254,20 @@ class FeedbackStaff(models.Model):
         if date_to:
             domain.append(('create_date', '<=', date_to))
         
-        # Student feedback
-        student_feedback = self.env['student_management.feedback_student'].search(domain)
-        # Staff feedback
-        staff_feedback = self.search(domain)
-        
-        summary = {
-            'student_feedback': {
-                'total': len(student_feedback),
-                'pending': len(student_feedback.filtered(lambda f: not f.is_replied)),
-                'replied': len(student_feedback.filtered('is_replied')),
-                'by_category': {}
-            },
-            'staff_feedback': {
-                'total': len(staff_feedback),
-                'pending': len(staff_feedback.filtered(lambda f: not f.is_replied)),
-                'replied': len(staff_feedback.filtered('is_replied')),
-                'by_category': {}
+        summary = {}
+        for summary_key, model_name in (('student_feedback', 'student_management.feedback_student'),
+                                        ('staff_feedback', 'student_management.feedback_staff')):
+            Feedback = self.env[model_name]
+            section = summary[summary_key] = {
+                'total': 0,
+                'pending': 0,
+                'replied': 0,
+                'by_category': dict.fromkeys(dict(Feedback._fields['category'].selection), 0),
             }
-        }
-        
-        # Category breakdown for student feedback
-        for category in ['academic', 'administrative', 'facilities', 'technical', 'other']:
-            count = len(student_feedback.filtered(lambda f: f.category == category))
-            summary['student_feedback']['by_category'][category] = count
-        
-        # Category breakdown for staff feedback
-        for category in ['academic', 'administrative', 'facilities', 'technical', 'hr', 'other']:
-            count = len(staff_feedback.filtered(lambda f: f.category == category))
-            summary['staff_feedback']['by_category'][category] = count
+            for category, is_replied, count in Feedback._read_group(domain, ['category', 'is_replied'], ['__count']):
+                section['total'] += count
+                section['replied' if is_replied else 'pending'] += count
+                if category:
+                    section['by_category'][category] = section['by_category'].get(category, 0) + count
         
         return summary
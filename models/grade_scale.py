@@ -0,0 +1,271 @@
+import logging
+from bisect import bisect_right
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+
+_logger = logging.getLogger(__name__)
+
+# Bands used when no grade scale applies: (minimum percentage, grade, grade point)
+DEFAULT_GRADE_BANDS = [
+    (90.0, 'A+', 4.0),
+    (80.0, 'A', 3.7),
+    (70.0, 'B+', 3.3),
+    (60.0, 'B', 3.0),
+    (50.0, 'C+', 2.7),
+    (40.0, 'C', 2.3),
+    (35.0, 'D', 2.0),
+    (0.0, 'F', 0.0),
+]
+DEFAULT_PASS_MARK = 35.0
+
+
+class Grader:
+    """Sorted-threshold lookup of the grade bands of one scale"""
+
+    def __init__(self, bands, pass_mark, scale_id=False):
+        bands = sorted(bands)
+        self.thresholds = [band[0] for band in bands]
+        self.bands = bands
+        self.pass_mark = pass_mark
+        self.scale_id = scale_id
+
+    def classify(self, percentage):
+        """``(grade, grade point)`` of ``percentage``; no grade below the lowest band"""
+        index = bisect_right(self.thresholds, percentage) - 1
+        if index < 0:
+            return False, 0.0
+        _min_percentage, grade, grade_point = self.bands[index]
+        return grade, grade_point
+
+
+class GradeScale(models.Model):
+    _name = 'student_management.grade_scale'
+    _description = 'Grade Scale'
+    _order = 'course_id, session_year_id, id'
+
+    name = fields.Char(string='Name', required=True)
+    course_id = fields.Many2one(
+        'student_management.course',
+        string='Course',
+        ondelete='cascade',
+        help='Leave empty to apply the scale to every course'
+    )
+    session_year_id = fields.Many2one(
+        'student_management.session_year',
+        string='Session Year',
+        ondelete='cascade',
+        help='Leave empty to apply the scale to every session year'
+    )
+    pass_mark = fields.Float(
+        string='Pass Mark (%)',
+        default=DEFAULT_PASS_MARK,
+        required=True,
+        help='Minimum percentage required to pass'
+    )
+    line_ids = fields.One2many(
+        'student_management.grade_scale_line',
+        'scale_id',
+        string='Grade Bands',
+        copy=True
+    )
+    active = fields.Boolean(string='Active', default=True)
+    recompute_pending = fields.Boolean(
+        string='Recompute Pending',
+        readonly=True,
+        copy=False,
+        help='The results graded with or covered by this scale are waiting to be regraded'
+    )
+    result_count = fields.Integer(
+        string='Graded Results',
+        compute='_compute_result_count'
+    )
+
+    def init(self):
+        # At most one scale per course and session year, the empty values included
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS student_management_grade_scale_scope_unique
+                ON student_management_grade_scale ((COALESCE(course_id, 0)), (COALESCE(session_year_id, 0)))
+             WHERE active
+        """)
+
+    def _compute_result_count(self):
+        counts = dict(self.env['student_management.student_result']._read_group(
+            [('grade_scale_id', 'in', self.ids)], ['grade_scale_id'], ['__count']
+        ))
+        for record in self:
+            record.result_count = counts.get(record, 0)
+
+    @api.constrains('pass_mark')
+    def _check_pass_mark(self):
+        for record in self:
+            if not 0 <= record.pass_mark <= 100:
+                raise ValidationError("The pass mark must be between 0 and 100.")
+
+    @api.ondelete(at_uninstall=False)
+    def _unlink_except_graded(self):
+        if self.env['student_management.student_result'].sudo().search_count(
+                [('grade_scale_id', 'in', self.ids)], limit=1):
+            raise ValidationError("Grade scales that graded results cannot be deleted; archive them instead.")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._schedule_recompute()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {'course_id', 'session_year_id', 'pass_mark', 'active'} & set(vals):
+            self._schedule_recompute()
+        return result
+
+    def _schedule_recompute(self):
+        """Flag the scales for regrading and wake up the grading cron.
+
+        Nothing is regraded in the current transaction, however many
+        results the scales cover.
+        """
+        if not self:
+            return
+        self.env.cr.execute("""
+            UPDATE student_management_grade_scale
+               SET recompute_pending = TRUE, write_date = NOW() AT TIME ZONE 'UTC'
+             WHERE id IN %s
+        """, [tuple(self.ids)])
+        self.invalidate_recordset(['recompute_pending', 'write_date'])
+        cron = self.env.ref('odoo_student_management.ir_cron_grade_recompute', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    def _get_scope_domain(self):
+        """Results this scale covers or has graded; a course or session year
+        scale may take results over from a broader one and the other way round"""
+        self.ensure_one()
+        scope = []
+        if self.course_id:
+            scope.append(('course_id', '=', self.course_id.id))
+        if self.session_year_id:
+            scope.append(('session_year_id', '=', self.session_year_id.id))
+        return expression.OR([[('grade_scale_id', '=', self.id)], scope or expression.TRUE_DOMAIN])
+
+    @api.model
+    def _get_graders(self):
+        """Graders of the active scales keyed by ``(course id, session year
+        id)``, loaded with one query per model"""
+        scales = self.sudo().search([])
+        lines = self.env['student_management.grade_scale_line'].sudo().search_read(
+            [('scale_id', 'in', scales.ids)], ['scale_id', 'min_percentage', 'grade', 'grade_point']
+        )
+        bands = {scale.id: [] for scale in scales}
+        for line in lines:
+            bands[line['scale_id'][0]].append((line['min_percentage'], line['grade'], line['grade_point']))
+        return {
+            (scale.course_id.id, scale.session_year_id.id): Grader(bands[scale.id], scale.pass_mark, scale.id)
+            for scale in scales
+        }
+
+    @api.model
+    def _get_default_grader(self):
+        return Grader(DEFAULT_GRADE_BANDS, DEFAULT_PASS_MARK)
+
+    @api.model
+    def _regrade(self, domain, batch_size=1000, commit=False):
+        """Regrade the results matching ``domain`` in chunks of ``batch_size``.
+
+        Each chunk is recomputed and flushed in one pass and, with
+        ``commit``, committed on its own. Returns the number of results
+        regraded.
+        """
+        Result = self.env['student_management.student_result'].sudo()
+        grading_fields = [Result._fields[name] for name in ('grade', 'grade_point', 'status', 'grade_scale_id')]
+        last_id = 0
+        count = 0
+        while True:
+            results = Result.search(expression.AND([domain, [('id', '>', last_id)]]), order='id', limit=batch_size)
+            if not results:
+                break
+            for field in grading_fields:
+                self.env.add_to_compute(field, results)
+            results.flush_recordset([field.name for field in grading_fields])
+            count += len(results)
+            last_id = results[-1].id
+            if commit:
+                self.env.cr.commit()
+            results.invalidate_recordset()
+            if len(results) < batch_size:
+                break
+        return count
+
+    @api.model
+    def _cron_recompute_grades(self, batch_size=1000):
+        """Regrade the results of the scales flagged by a change"""
+        scales = self.with_context(active_test=False).search([('recompute_pending', '=', True)])
+        for scale in scales:
+            write_date = scale.write_date
+            count = self._regrade(scale._get_scope_domain(), batch_size=batch_size, commit=True)
+            # A change made while regrading flags the scale again
+            self.env.cr.execute("""
+                UPDATE student_management_grade_scale SET recompute_pending = FALSE
+                 WHERE id = %s AND write_date = %s
+            """, [scale.id, write_date])
+            self.env.cr.commit()
+            _logger.info("Grade scale %s: %s results regraded", scale.name, count)
+        return True
+
+    def action_recompute(self):
+        """Queue the regrading of the results covered by these scales"""
+        self._schedule_recompute()
+        return True
+
+
+class GradeScaleLine(models.Model):
+    _name = 'student_management.grade_scale_line'
+    _description = 'Grade Scale Band'
+    _order = 'scale_id, min_percentage desc'
+
+    scale_id = fields.Many2one(
+        'student_management.grade_scale',
+        string='Grade Scale',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    grade = fields.Char(string='Grade', required=True)
+    min_percentage = fields.Float(
+        string='Minimum Percentage',
+        required=True,
+        help='Lowest percentage awarded this grade'
+    )
+    grade_point = fields.Float(string='Grade Point', default=0.0)
+
+    _sql_constraints = [
+        ('scale_min_percentage_unique',
+         'unique(scale_id, min_percentage)',
+         'Two bands of a grade scale cannot start at the same percentage.'),
+    ]
+
+    @api.constrains('min_percentage')
+    def _check_min_percentage(self):
+        for record in self:
+            if not 0 <= record.min_percentage <= 100:
+                raise ValidationError("The minimum percentage of a band must be between 0 and 100.")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.scale_id._schedule_recompute()
+        return records
+
+    def write(self, vals):
+        scales = self.scale_id
+        result = super().write(vals)
+        (scales | self.scale_id)._schedule_recompute()
+        return result
+
+    def unlink(self):
+        scales = self.scale_id
+        result = super().unlink()
+        scales.exists()._schedule_recompute()
+        return result
@@ -0,0 +1,25 @@
+from odoo import models
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """Subscribe students and staff to the channels of their broadcasts.
+
+        The channels are records added here only, after checking that the
+        user is in the audience: a client cannot subscribe to them itself.
+        """
+        channels = super()._build_bus_channel_list(channels)
+        user = self.env.user
+        if not user or user._is_public():
+            return channels
+        Broadcast = self.env['student_management.notification_broadcast'].sudo()
+        if user.has_group('odoo_student_management.group_student_management_student'):
+            student = self.env['student_management.student'].sudo().search([('user_id', '=', user.id)], limit=1)
+            if student:
+                channels.extend(Broadcast._get_student_channels(student))
+        if user.has_group('odoo_student_management.group_student_management_staff') and \
+                self.env['student_management.staff'].sudo().search_count([('user_id', '=', user.id)], limit=1):
+            channels.append(Broadcast._get_staff_channel())
+        return channels
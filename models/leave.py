@@ -1,5 +1,257 @@
+import logging
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+# Inclusive date range covered by a leave request; single-day requests have no end date
+LEAVE_RANGE_SQL = "daterange(leave_date, COALESCE(leave_end_date, leave_date), '[]')"
+
+# Leave statuses counted by the balance ledger, in column order
+LEAVE_BALANCE_STATUSES = ('pending', 'approved', 'rejected')
+
+
+class LeaveDecisionMixin(models.AbstractModel):
+    _name = 'student_management.leave.mixin'
+    _description = 'Leave Request Decisions'
+
+    # Many2one holding the person requesting the leave
+    _leave_owner_field = None
+
+    # SQL expression giving the session year of a request aliased ``leave``
+    _balance_session_year_sql = 'leave.session_year_id'
+
+    # Status targeted by each decision, and the statuses it applies to
+    _LEAVE_DECISIONS = {
+        'approve': ('approved', ('pending',)),
+        'reject': ('rejected', ('pending',)),
+        'reset': ('pending', ('approved', 'rejected')),
+    }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._apply_leave_balance_deltas(records._get_leave_balance_deltas())
+        return records
+
+    def write(self, vals):
+        if not {self._leave_owner_field, 'leave_status', 'leave_date', 'leave_end_date'} & set(vals):
+            return super().write(vals)
+        deltas = self._get_leave_balance_deltas(sign=-1)
+        result = super().write(vals)
+        for key, delta in self._get_leave_balance_deltas().items():
+            deltas[key] = [old + new for old, new in zip(deltas[key], delta)]
+        self._apply_leave_balance_deltas(deltas)
+        return result
+
+    def unlink(self):
+        deltas = self._get_leave_balance_deltas(sign=-1)
+        result = super().unlink()
+        self._apply_leave_balance_deltas(deltas)
+        return result
+
+    def _get_balance_session_years(self):
+        """``{request id: session year id}`` under which the requests are
+        filed in the balance ledger"""
+        return {record.id: record.session_year_id.id for record in self}
+
+    def _get_leave_balance_deltas(self, sign=1):
+        """Ledger deltas of these requests, keyed by ``(owner id, session
+        year id)``; the values follow the column order of
+        :meth:`LeaveBalance._apply_deltas`"""
+        session_years = self._get_balance_session_years()
+        deltas = defaultdict(lambda: [0] * (2 * len(LEAVE_BALANCE_STATUSES)))
+        for record in self:
+            owner = record[self._leave_owner_field]
+            if not owner or record.leave_status not in LEAVE_BALANCE_STATUSES:
+                continue
+            index = LEAVE_BALANCE_STATUSES.index(record.leave_status)
+            delta = deltas[(owner.id, session_years[record.id])]
+            delta[index] += sign
+            delta[index + len(LEAVE_BALANCE_STATUSES)] += sign * record.leave_duration
+        return deltas
+
+    def _apply_leave_balance_deltas(self, deltas):
+        self.env['student_management.leave_balance']._apply_deltas(self._leave_owner_field, deltas)
+
+    def _create_leave_range_index(self):
+        """GiST index on (owner, leave range) serving overlap checks and
+        "on leave on date X" lookups, and the exclusion constraint keeping
+        the non-rejected requests of a person from overlapping.
+
+        btree_gist is needed to put the owner id in a GiST index; when the
+        extension cannot be created the index covers the range only and
+        overlaps are left to :meth:`_check_leave_overlap`.
+        """
+        index_name = f'{self._table}_leave_range_index'
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+            expressions = [f'"{self._leave_owner_field}"', LEAVE_RANGE_SQL]
+        except Exception as e:
+            _logger.warning("btree_gist is not available, indexing leave ranges only: %s", e)
+            expressions = [LEAVE_RANGE_SQL]
+        create_index(self.env.cr, index_name, self._table, expressions, method='gist')
+        if len(expressions) > 1:
+            self._create_leave_overlap_constraint()
+
+    def _create_leave_overlap_constraint(self):
+        """Exclusion constraint rejecting overlapping non-rejected requests
+        of the same person, race free unlike a check from Python"""
+        constraint_name = f'{self._table}_leave_overlap_exclude'
+        self.env.cr.execute("SELECT 1 FROM pg_constraint WHERE conname = %s", [constraint_name])
+        if self.env.cr.fetchone():
+            return
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute(f"""
+                    ALTER TABLE {self._table} ADD CONSTRAINT {constraint_name}
+                    EXCLUDE USING gist ("{self._leave_owner_field}" WITH =, {LEAVE_RANGE_SQL} WITH &&)
+                    WHERE (leave_status <> 'rejected')
+                """)
+        except Exception as e:
+            # Overlapping requests recorded before the check existed
+            _logger.warning("Could not add %s, overlaps are checked on date changes only: %s", constraint_name, e)
+
+    @api.constrains('leave_date', 'leave_end_date')
+    def _check_leave_overlap(self):
+        """Reject a request overlapping another non-rejected request of the
+        same person, with a single indexed query for the whole batch.
+
+        Only date changes are checked, so deciding requests never fails on
+        overlaps recorded before the check existed; the exclusion
+        constraint covers the status changes and concurrent requests.
+        """
+        records = self.filtered(lambda record: record.leave_status != 'rejected')
+        if not records:
+            return
+        self.flush_model()
+        owner = self._leave_owner_field
+        self.env.cr.execute(f"""
+            SELECT new.id, other.id
+              FROM {self._table} AS new
+              JOIN {self._table} AS other
+                ON other."{owner}" = new."{owner}"
+               AND other.id <> new.id
+               AND other.leave_status <> 'rejected'
+               AND daterange(other.leave_date, COALESCE(other.leave_end_date, other.leave_date), '[]')
+                && daterange(new.leave_date, COALESCE(new.leave_end_date, new.leave_date), '[]')
+             WHERE new.id IN %s
+             LIMIT 1
+        """, [tuple(records.ids)])
+        row = self.env.cr.fetchone()
+        if row:
+            record, other = self.browse(row[0]), self.browse(row[1])
+            raise ValidationError(
+                f"{record[owner].name} already has a leave request overlapping these dates ({other.display_name})."
+            )
+
+    @api.model
+    def get_on_leave(self, date=None, owner_ids=None):
+        """People with an approved leave covering ``date`` (today by default),
+        answered from the range index"""
+        owner_model = self.env[self._fields[self._leave_owner_field].comodel_name]
+        return owner_model.browse(list(self._get_approved_leaves_on(date, owner_ids)))
+
+    @api.model
+    def _get_approved_leaves_on(self, date=None, owner_ids=None):
+        """``{owner id: leave id}`` of the approved leaves covering ``date``
+        (today by default), with one query on the range index"""
+        date = fields.Date.to_date(date) or fields.Date.context_today(self)
+        owner = self._leave_owner_field
+        query = f"""
+            SELECT DISTINCT ON ("{owner}") "{owner}", id
+              FROM {self._table}
+             WHERE leave_status = 'approved'
+               AND {LEAVE_RANGE_SQL} @> %s::date
+        """
+        params = [date]
+        if owner_ids is not None:
+            if not owner_ids:
+                return {}
+            query += f' AND "{owner}" IN %s'
+            params.append(tuple(owner_ids))
+        self.flush_model()
+        self.env.cr.execute(query + f' ORDER BY "{owner}", id', params)
+        return dict(self.env.cr.fetchall())
+
+    def _apply_decision(self, decision, admin_reply=None):
+        """Apply ``decision`` to the whole recordset with a single write.
+
+        Every request gets the same approval timestamp. Returns the number
+        of requests whose status changed.
+        """
+        status = self._LEAVE_DECISIONS[decision][0]
+        records = self.filtered(lambda record: record.leave_status != status)
+        if not records:
+            return 0
+        if status == 'pending':
+            values = {
+                'leave_status': 'pending',
+                'approved_by': False,
+                'approval_date': False,
+                'admin_reply': ''
+            }
+        else:
+            values = {
+                'leave_status': status,
+                'approved_by': self.env.user.id,
+                'approval_date': fields.Datetime.now()
+            }
+            if admin_reply:
+                values['admin_reply'] = admin_reply
+        records.write(values)
+        return len(records)
+
+    def action_approve(self):
+        """Approve the leave requests"""
+        self._apply_decision('approve')
+        return True
+
+    def action_reject(self):
+        """Reject the leave requests"""
+        self._apply_decision('reject')
+        return True
+
+    def action_reset_to_pending(self):
+        """Reset the leave requests to pending status"""
+        self._apply_decision('reset')
+        return True
+
+    @api.model
+    def _get_scope_domain(self, course_id=None, session_year_id=None):
+        """Domain restricting the requests to a course and/or session year"""
+        return []
+
+    @api.model
+    def bulk_decide(self, decision, ids=None, course_id=None, session_year_id=None, date_from=None, date_to=None, admin_reply=None):
+        """Approve, reject or reset many leave requests in one go.
+
+        The requests are selected by ``ids`` and/or by course, session year
+        and a date range overlapping the leave; only the requests the
+        decision applies to are matched. Returns ``matched``/``updated``
+        counts.
+        """
+        if decision not in self._LEAVE_DECISIONS:
+            raise ValidationError(f"Unknown leave decision '{decision}'.")
+        domain = [('leave_status', 'in', list(self._LEAVE_DECISIONS[decision][1]))]
+        if ids is not None:
+            domain.append(('id', 'in', ids))
+        domain += self._get_scope_domain(course_id, session_year_id)
+        if date_to:
+            domain.append(('leave_date', '<=', date_to))
+        if date_from:
+            domain += ['|', ('leave_end_date', '>=', date_from),
+                       '&', ('leave_end_date', '=', False), ('leave_date', '>=', date_from)]
+
+        leaves = self.search(domain)
+        return {
+            'matched': len(leaves),
+            'updated': leaves._apply_decision(decision, admin_reply=admin_reply),
+        }
 
 
 class LeaveReportStudent(models.Model):
@@ -7,6 +259,10 @@ class LeaveReportStudent(models.Model):
     _description = 'Student Leave Request'
     _order = 'leave_date desc, create_date desc'
     _rec_name = 'display_name'
+    _inherit = ['student_management.dashboard.mixin', 'student_management.leave.mixin']
+    _dashboard_counters = ('pending_student_leaves',)
+    _dashboard_fields = ('leave_status',)
+    _leave_owner_field = 'student_id'
 
     student_id = fields.Many2one(
         'student_management.student',
@@ -33,7 +289,7 @@ class LeaveReportStudent(models.Model):
         ('pending', 'Pending'),
         ('approved', 'Approved'),
         ('rejected', 'Rejected')
-    ], string='Status', default='pending', required=True)
+    ], string='Status', default='pending', required=True, index=True)
     
     admin_reply = fields.Text(
         string='Admin Reply',
@@ -78,6 +334,12 @@ class LeaveReportStudent(models.Model):
         store=True
     )
 
+    def init(self):
+        # A student's requests by status (student leave page and approved-leave counts)
+        create_index(self.env.cr, 'student_management_leave_report_student_student_status_index',
+                     self._table, ['student_id', 'leave_status'])
+        self._create_leave_range_index()
+
     @api.depends('student_id', 'leave_date', 'leave_status')
     def _compute_display_name(self):
         for record in self:
@@ -108,33 +370,83 @@ class LeaveReportStudent(models.Model):
                         "Leave end date cannot be before leave start date."
                     )
 
-    def action_approve(self):
-        """Approve the leave request"""
-        for record in self:
-            record.write({
-                'leave_status': 'approved',
-                'approved_by': self.env.user.id,
-                'approval_date': fields.Datetime.now()
-            })
+    def _apply_decision(self, decision, admin_reply=None):
+        """Excuse the absences covered by newly approved requests and restore
+        them when an approval is withdrawn"""
+        was_approved = self.filtered(lambda record: record.leave_status == 'approved')
+        updated = super()._apply_decision(decision, admin_reply=admin_reply)
+        approved = self.filtered(lambda record: record.leave_status == 'approved')
+        (approved - was_approved)._set_attendance_excused(True)
+        (was_approved - approved)._set_attendance_excused(False)
+        return updated
 
-    def action_reject(self):
-        """Reject the leave request"""
-        for record in self:
-            record.write({
-                'leave_status': 'rejected',
-                'approved_by': self.env.user.id,
-                'approval_date': fields.Datetime.now()
-            })
+    def _set_attendance_excused(self, excused):
+        """Mark the absences of the students inside these leave ranges as
+        excused by the leave, or restore the absences these leaves excused.
 
-    def action_reset_to_pending(self):
-        """Reset the leave request to pending status"""
-        for record in self:
-            record.write({
-                'leave_status': 'pending',
-                'approved_by': False,
-                'approval_date': False,
-                'admin_reply': ''
+        Absences are linked to the leave that excused them, so withdrawing
+        an approval leaves the ones excused by hand alone. Uses one query
+        per model and one write per leave.
+        """
+        if not self:
+            return
+        Attendance = self.env['student_management.attendance'].sudo()
+        AttendanceReport = self.env['student_management.attendance_report'].sudo()
+        if not excused:
+            Attendance.search([('excused_leave_id', 'in', self.ids), ('status', '=', 'excused')]).write({
+                'status': 'absent',
+                'excused_leave_id': False,
             })
+            AttendanceReport.search([('excused_leave_id', 'in', self.ids), ('is_excused', '=', True)]).write({
+                'is_excused': False,
+                'excused_leave_id': False,
+            })
+            return
+        self.flush_recordset()
+        Attendance.flush_model(['student_id', 'attendance_date', 'status'])
+        AttendanceReport.flush_model(['student_id', 'attendance_id', 'status', 'is_excused'])
+        self.env.cr.execute(f"""
+            SELECT leave.id, attendance.id
+              FROM student_management_attendance AS attendance
+              JOIN student_management_leave_report_student AS leave
+                ON leave.student_id = attendance.student_id
+               AND {LEAVE_RANGE_SQL}
+                   @> attendance.attendance_date
+             WHERE leave.id IN %s AND attendance.status = 'absent'
+        """, [tuple(self.ids)])
+        for leave_id, attendance_ids in self._group_by_leave(self.env.cr.fetchall()).items():
+            Attendance.browse(attendance_ids).write({'status': 'excused', 'excused_leave_id': leave_id})
+        self.env.cr.execute(f"""
+            SELECT leave.id, report.id
+              FROM student_management_attendance_report AS report
+              JOIN student_management_attendance AS session ON session.id = report.attendance_id
+              JOIN student_management_leave_report_student AS leave
+                ON leave.student_id = report.student_id
+               AND {LEAVE_RANGE_SQL}
+                   @> session.attendance_date
+             WHERE leave.id IN %s
+               AND NOT COALESCE(report.status, FALSE)
+               AND NOT COALESCE(report.is_excused, FALSE)
+        """, [tuple(self.ids)])
+        for leave_id, report_ids in self._group_by_leave(self.env.cr.fetchall()).items():
+            AttendanceReport.browse(report_ids).write({'is_excused': True, 'excused_leave_id': leave_id})
+
+    @api.model
+    def _group_by_leave(self, rows):
+        """``{leave id: [record ids]}`` from ``(leave id, record id)`` rows"""
+        groups = defaultdict(list)
+        for leave_id, record_id in rows:
+            groups[leave_id].append(record_id)
+        return groups
+
+    @api.model
+    def _get_scope_domain(self, course_id=None, session_year_id=None):
+        domain = []
+        if course_id:
+            domain.append(('course_id', '=', course_id))
+        if session_year_id:
+            domain.append(('session_year_id', '=', session_year_id))
+        return domain
 
 
 class LeaveReportStaff(models.Model):
@@ -142,6 +454,17 @@ class LeaveReportStaff(models.Model):
     _description = 'Staff Leave Request'
     _order = 'leave_date desc, create_date desc'
     _rec_name = 'display_name'
+    _inherit = ['student_management.dashboard.mixin', 'student_management.leave.mixin']
+    _dashboard_counters = ('pending_staff_leaves',)
+    _dashboard_fields = ('leave_status',)
+    _leave_owner_field = 'staff_id'
+    # Staff requests belong to the session year containing their start date
+    _balance_session_year_sql = """(
+        SELECT session_year.id
+          FROM student_management_session_year AS session_year
+         WHERE leave.leave_date BETWEEN session_year.session_start_year AND session_year.session_end_year
+      ORDER BY session_year.id
+         LIMIT 1)"""
 
     staff_id = fields.Many2one(
         'student_management.staff',
@@ -168,7 +491,7 @@ class LeaveReportStaff(models.Model):
         ('pending', 'Pending'),
         ('approved', 'Approved'),
         ('rejected', 'Rejected')
-    ], string='Status', default='pending', required=True)
+    ], string='Status', default='pending', required=True, index=True)
     
     admin_reply = fields.Text(
         string='Admin Reply',
@@ -197,6 +520,12 @@ class LeaveReportStaff(models.Model):
         store=True
     )
 
+    def init(self):
+        # A staff member's requests by status (staff dashboard leave counts)
+        create_index(self.env.cr, 'student_management_leave_report_staff_staff_status_index',
+                     self._table, ['staff_id', 'leave_status'])
+        self._create_leave_range_index()
+
     @api.depends('staff_id', 'leave_date', 'leave_status')
     def _compute_display_name(self):
         for record in self:
@@ -227,53 +556,255 @@ class LeaveReportStaff(models.Model):
                         "Leave end date cannot be before leave start date."
                     )
 
-    def action_approve(self):
-        """Approve the leave request"""
-        for record in self:
-            record.write({
-                'leave_status': 'approved',
-                'approved_by': self.env.user.id,
-                'approval_date': fields.Datetime.now()
-            })
-
-    def action_reject(self):
-        """Reject the leave request"""
-        for record in self:
-            record.write({
-                'leave_status': 'rejected',
-                'approved_by': self.env.user.id,
-                'approval_date': fields.Datetime.now()
-            })
+    @api.model
+    def _get_scope_domain(self, course_id=None, session_year_id=None):
+        # Staff belong to a course through the subjects they teach, and to a
+        # session year through its dates
+        domain = []
+        if course_id:
+            domain.append(('staff_id.subject_ids.course_id', '=', course_id))
+        if session_year_id:
+            session_year = self.env['student_management.session_year'].browse(session_year_id)
+            domain += [('leave_date', '>=', session_year.session_start_year),
+                       ('leave_date', '<=', session_year.session_end_year)]
+        return domain
 
-    def action_reset_to_pending(self):
-        """Reset the leave request to pending status"""
-        for record in self:
-            record.write({
-                'leave_status': 'pending',
-                'approved_by': False,
-                'approval_date': False,
-                'admin_reply': ''
-            })
+    def _get_balance_session_years(self):
+        session_years = self.env['student_management.session_year'].sudo().with_context(
+            active_test=False).search([], order='id')
+        return {
+            record.id: next((
+                session_year.id for session_year in session_years
+                if record.leave_date
+                and session_year.session_start_year <= record.leave_date <= session_year.session_end_year
+            ), False)
+            for record in self
+        }
 
     @api.model
     def get_staff_leave_summary(self, staff_id, date_from=None, date_to=None):
-        """Get leave summary for a staff member"""
+        """Get leave summary for a staff member.
+
+        Without a date range the figures are read from the staff member's
+        balance ledger rows, together with the remaining days; with one,
+        they come from a single grouped query on the requests.
+        """
+        if not date_from and not date_to:
+            return self.env['student_management.leave_balance'].get_balance_summary('staff_id', staff_id)
+
         domain = [('staff_id', '=', staff_id)]
-        
         if date_from:
             domain.append(('leave_date', '>=', date_from))
         if date_to:
             domain.append(('leave_date', '<=', date_to))
-        
-        leaves = self.search(domain)
-        
-        summary = {
-            'total_requests': len(leaves),
-            'pending': len(leaves.filtered(lambda l: l.leave_status == 'pending')),
-            'approved': len(leaves.filtered(lambda l: l.leave_status == 'approved')),
-            'rejected': len(leaves.filtered(lambda l: l.leave_status == 'rejected')),
-            'total_days_requested': sum(leaves.mapped('leave_duration')),
-            'approved_days': sum(leaves.filtered(lambda l: l.leave_status == 'approved').mapped('leave_duration'))
+        groups = {
+            status: (count, days)
+            for status, count, days in self._read_group(
+                domain, ['leave_status'], ['__count', 'leave_duration:sum']
+            )
+        }
+        counts = {status: groups.get(status, (0, 0))[0] for status in LEAVE_BALANCE_STATUSES}
+        return {
+            'total_requests': sum(counts.values()),
+            'pending': counts['pending'],
+            'approved': counts['approved'],
+            'rejected': counts['rejected'],
+            'total_days_requested': sum(days or 0 for _count, days in groups.values()),
+            'approved_days': groups.get('approved', (0, 0))[1] or 0,
+        }
+
+
+class LeaveBalance(models.Model):
+    _name = 'student_management.leave_balance'
+    _description = 'Leave Balance'
+    _order = 'session_year_id desc, id'
+
+    student_id = fields.Many2one(
+        'student_management.student',
+        string='Student',
+        readonly=True,
+        ondelete='cascade'
+    )
+    staff_id = fields.Many2one(
+        'student_management.staff',
+        string='Staff',
+        readonly=True,
+        ondelete='cascade'
+    )
+    session_year_id = fields.Many2one(
+        'student_management.session_year',
+        string='Session Year',
+        readonly=True,
+        ondelete='cascade'
+    )
+    allowance_days = fields.Integer(
+        string='Allowance (Days)',
+        default=lambda self: self._get_default_allowance(),
+        help='Leave days granted for the session year'
+    )
+    pending_count = fields.Integer(string='Pending Requests', readonly=True, default=0)
+    approved_count = fields.Integer(string='Approved Requests', readonly=True, default=0)
+    rejected_count = fields.Integer(string='Rejected Requests', readonly=True, default=0)
+    pending_days = fields.Integer(string='Pending Days', readonly=True, default=0)
+    approved_days = fields.Integer(string='Approved Days', readonly=True, default=0)
+    rejected_days = fields.Integer(string='Rejected Days', readonly=True, default=0)
+    remaining_days = fields.Integer(
+        string='Remaining Days',
+        compute='_compute_remaining_days'
+    )
+
+    def init(self):
+        # One row per person and session year; requests outside any session
+        # year share the row with no session year
+        for owner in ('student_id', 'staff_id'):
+            self.env.cr.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS student_management_leave_balance_{owner}_unique
+                    ON student_management_leave_balance ({owner}, (COALESCE(session_year_id, 0)))
+                 WHERE {owner} IS NOT NULL
+            """)
+
+    @api.depends('allowance_days', 'approved_days')
+    def _compute_remaining_days(self):
+        for record in self:
+            record.remaining_days = record.allowance_days - record.approved_days
+
+    @api.model
+    def _get_default_allowance(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'student_management.leave_allowance_days', 0))
+
+    @api.model
+    def _apply_deltas(self, owner_field, deltas):
+        """Add ledger deltas with a single statement.
+
+        ``deltas`` maps ``(owner id, session year id)`` to the deltas of the
+        pending/approved/rejected request counts followed by the
+        pending/approved/rejected days. Existing rows get the raw deltas,
+        clamped at zero; the missing ones are inserted with the clamped
+        deltas, ``ON CONFLICT`` covering rows created concurrently.
+        """
+        rows = sorted(
+            (owner_id, session_year_id or None, *delta)
+            for (owner_id, session_year_id), delta in deltas.items()
+            if owner_id and any(delta)
+        )
+        if not rows:
+            return
+        columns = ('pending_count', 'approved_count', 'rejected_count', 'pending_days', 'approved_days', 'rejected_days')
+        self.env.cr.execute(f"""
+            WITH delta AS (
+                SELECT v.owner_id, v.session_year_id::integer AS session_year_id, {', '.join(f'v.{column}' for column in columns)}
+                  FROM (VALUES {', '.join(['%s'] * len(rows))})
+                    AS v(owner_id, session_year_id, {', '.join(columns)})
+            ), updated AS (
+                UPDATE student_management_leave_balance AS balance
+                   SET {', '.join(f'{column} = GREATEST(balance.{column} + d.{column}, 0)' for column in columns)},
+                       write_uid = %s,
+                       write_date = NOW() AT TIME ZONE 'UTC'
+                  FROM delta AS d
+                 WHERE balance.{owner_field} = d.owner_id
+                   AND COALESCE(balance.session_year_id, 0) = COALESCE(d.session_year_id, 0)
+             RETURNING balance.{owner_field} AS owner_id, balance.session_year_id
+            )
+            INSERT INTO student_management_leave_balance AS balance
+                ({owner_field}, session_year_id, allowance_days, {', '.join(columns)},
+                 create_uid, create_date, write_uid, write_date)
+            SELECT d.owner_id, d.session_year_id, %s, {', '.join(f'GREATEST(d.{column}, 0)' for column in columns)},
+                   %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+              FROM delta AS d
+             WHERE NOT EXISTS (
+                    SELECT 1 FROM updated AS u
+                     WHERE u.owner_id = d.owner_id
+                       AND COALESCE(u.session_year_id, 0) = COALESCE(d.session_year_id, 0))
+            ON CONFLICT ({owner_field}, (COALESCE(session_year_id, 0))) WHERE {owner_field} IS NOT NULL
+            DO UPDATE SET
+                {', '.join(f'{column} = GREATEST(balance.{column} + EXCLUDED.{column}, 0)' for column in columns)},
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, [*rows, self.env.uid, self._get_default_allowance(), self.env.uid, self.env.uid])
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild_leave_balances(self):
+        """Rebuild every balance from the leave requests in one pass per
+        request model; the allowances set on existing rows are kept"""
+        self.env.cr.execute("""
+            UPDATE student_management_leave_balance
+               SET pending_count = 0, approved_count = 0, rejected_count = 0,
+                   pending_days = 0, approved_days = 0, rejected_days = 0
+        """)
+        for model_name in ('student_management.leave_report_student', 'student_management.leave_report_staff'):
+            Leave = self.env[model_name]
+            Leave.flush_model()
+            owner = Leave._leave_owner_field
+            self.env.cr.execute(f"""
+                INSERT INTO student_management_leave_balance AS balance
+                    ({owner}, session_year_id, allowance_days,
+                     pending_count, approved_count, rejected_count,
+                     pending_days, approved_days, rejected_days,
+                     create_uid, create_date, write_uid, write_date)
+                SELECT grouped.owner_id, grouped.session_year_id, %s,
+                       grouped.pending_count, grouped.approved_count, grouped.rejected_count,
+                       grouped.pending_days, grouped.approved_days, grouped.rejected_days,
+                       %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC'
+                  FROM (
+                    SELECT leave.{owner} AS owner_id,
+                           {Leave._balance_session_year_sql} AS session_year_id,
+                           COUNT(*) FILTER (WHERE leave.leave_status = 'pending') AS pending_count,
+                           COUNT(*) FILTER (WHERE leave.leave_status = 'approved') AS approved_count,
+                           COUNT(*) FILTER (WHERE leave.leave_status = 'rejected') AS rejected_count,
+                           COALESCE(SUM(leave.leave_duration) FILTER (WHERE leave.leave_status = 'pending'), 0) AS pending_days,
+                           COALESCE(SUM(leave.leave_duration) FILTER (WHERE leave.leave_status = 'approved'), 0) AS approved_days,
+                           COALESCE(SUM(leave.leave_duration) FILTER (WHERE leave.leave_status = 'rejected'), 0) AS rejected_days
+                      FROM {Leave._table} AS leave
+                     WHERE leave.{owner} IS NOT NULL
+                  GROUP BY 1, 2
+                  ) AS grouped
+                ON CONFLICT ({owner}, (COALESCE(session_year_id, 0))) WHERE {owner} IS NOT NULL
+                DO UPDATE SET
+                    pending_count = EXCLUDED.pending_count,
+                    approved_count = EXCLUDED.approved_count,
+                    rejected_count = EXCLUDED.rejected_count,
+                    pending_days = EXCLUDED.pending_days,
+                    approved_days = EXCLUDED.approved_days,
+                    rejected_days = EXCLUDED.rejected_days,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+            """, [self._get_default_allowance(), self.env.uid, self.env.uid])
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def get_remaining_days(self, owner_field, owner_id, session_year_id=False):
+        """Remaining leave days of a student or staff member for a session year"""
+        balance = self.search([
+            (owner_field, '=', owner_id),
+            ('session_year_id', '=', session_year_id),
+        ], limit=1)
+        return balance.remaining_days if balance else self._get_default_allowance()
+
+    @api.model
+    def get_balance_summary(self, owner_field, owner_id, session_year_id=None):
+        """Request and day totals of a student or staff member over every
+        session year, from their ledger rows. The remaining days are those
+        of ``session_year_id``, by default the session year running today."""
+        if session_year_id is None:
+            today = fields.Date.context_today(self)
+            session_year_id = self.env['student_management.session_year'].sudo().search([
+                ('session_start_year', '<=', today),
+                ('session_end_year', '>=', today),
+            ], limit=1).id
+        balances = self.search([(owner_field, '=', owner_id)])
+        current = balances.filtered(lambda balance: balance.session_year_id.id == session_year_id)[:1]
+        counts = {status: sum(balances.mapped(f'{status}_count')) for status in LEAVE_BALANCE_STATUSES}
+        days = {status: sum(balances.mapped(f'{status}_days')) for status in LEAVE_BALANCE_STATUSES}
+        return {
+            'total_requests': sum(counts.values()),
+            'pending': counts['pending'],
+            'approved': counts['approved'],
+            'rejected': counts['rejected'],
+            'total_days_requested': sum(days.values()),
+            'approved_days': days['approved'],
+            'session_year_id': session_year_id,
+            'remaining_days': current.remaining_days if current else self._get_default_allowance(),
         }
-        
-        return summary
@@ -1,10 +1,222 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+
+class NotificationFanOutMixin(models.AbstractModel):
+    _name = 'student_management.notification.mixin'
+    _description = 'Notification Fan-out'
+
+    # Many2one field holding the recipient of a notification
+    _recipient_field = None
+    # Number of rows inserted by one multi-row create
+    _fan_out_batch_size = 1000
+
+    @api.model
+    def _fan_out(self, recipient_ids, values):
+        """Create one notification per recipient with multi-row creates.
+
+        Returns a dict with the ``recipients``/``created``/``batches`` counts.
+        """
+        batch_size = self._fan_out_batch_size
+        batches = 0
+        for start in range(0, len(recipient_ids), batch_size):
+            self.create([
+                dict(values, **{self._recipient_field: recipient_id})
+                for recipient_id in recipient_ids[start:start + batch_size]
+            ])
+            batches += 1
+        return {
+            'recipients': len(recipient_ids),
+            'created': len(recipient_ids),
+            'batches': batches,
+        }
+
+    def _get_unread_deltas(self, sign=1):
+        """``{user_id: sign * unread notifications}`` for the records of ``self``"""
+        deltas = defaultdict(int)
+        for record in self:
+            user = record[self._recipient_field].user_id
+            if user and not record.is_read:
+                deltas[user.id] += sign
+        return deltas
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['student_management.notification_inbox']._apply_unread_deltas(records._get_unread_deltas())
+        records._push_to_bus()
+        return records
+
+    def _push_to_bus(self):
+        """Push the notifications to their recipients through the bus.
+
+        All messages go through one ``_sendmany``; the bus delivers them
+        once the transaction commits.
+        """
+        messages = []
+        for record in self:
+            partner = record[self._recipient_field].user_id.partner_id
+            if partner:
+                messages.append((partner, 'student_management/notification', {
+                    'id': record.id,
+                    'source': 'direct',
+                    'title': record.title,
+                    'message': record.message,
+                    'type': record.notification_type,
+                    'priority': record.priority,
+                }))
+        if messages:
+            self.env['bus.bus']._sendmany(messages)
+
+    def write(self, vals):
+        if 'is_read' not in vals and self._recipient_field not in vals:
+            return super().write(vals)
+        deltas = self._get_unread_deltas(sign=-1)
+        result = super().write(vals)
+        for user_id, delta in self._get_unread_deltas().items():
+            deltas[user_id] += delta
+        self.env['student_management.notification_inbox']._apply_unread_deltas(deltas)
+        return result
+
+    def unlink(self):
+        deltas = self._get_unread_deltas(sign=-1)
+        result = super().unlink()
+        self.env['student_management.notification_inbox']._apply_unread_deltas(deltas)
+        return result
+
+    @api.model
+    def _mark_read(self, ids=None, recipient_ids=None, date_from=None, date_to=None):
+        """Mark unread notifications as read with a single UPDATE.
+
+        Rows are selected by ``ids``, by recipient and/or by a creation date
+        range. The inbox counters are moved accordingly. Returns the number
+        of notifications marked as read.
+        """
+        conditions = ["NOT is_read"]
+        params = []
+        if ids is not None:
+            if not ids:
+                return 0
+            conditions.append("id IN %s")
+            params.append(tuple(ids))
+        if recipient_ids is not None:
+            if not recipient_ids:
+                return 0
+            conditions.append(f'"{self._recipient_field}" IN %s')
+            params.append(tuple(recipient_ids))
+        if date_from:
+            conditions.append("create_date >= %s")
+            params.append(date_from)
+        if date_to:
+            conditions.append("create_date <= %s")
+            params.append(date_to)
+
+        self.flush_model(['is_read', 'read_date', 'display_name'])
+        # display_name ends with the read status, see _compute_display_name
+        self.env.cr.execute(f"""
+            UPDATE {self._table}
+               SET is_read = TRUE,
+                   read_date = NOW() AT TIME ZONE 'UTC',
+                   display_name = regexp_replace(display_name, '\\[Unread\\]$', '[Read]'),
+                   write_uid = %s,
+                   write_date = NOW() AT TIME ZONE 'UTC'
+             WHERE {' AND '.join(conditions)}
+         RETURNING "{self._recipient_field}"
+        """, [self.env.uid, *params])
+        recipient_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.invalidate_model(['is_read', 'read_date', 'display_name', 'write_uid', 'write_date'])
+        if not recipient_ids:
+            return 0
+
+        recipients = self.env[self._fields[self._recipient_field].comodel_name].sudo().browse(set(recipient_ids))
+        user_by_recipient = {recipient.id: recipient.user_id.id for recipient in recipients}
+        deltas = defaultdict(int)
+        for recipient_id in recipient_ids:
+            if user_by_recipient.get(recipient_id):
+                deltas[user_by_recipient[recipient_id]] -= 1
+        self.env['student_management.notification_inbox']._apply_unread_deltas(deltas)
+        return len(recipient_ids)
+
+    @api.model
+    def _apply_retention(self, archive_days, delete_days, batch_size=5000, commit=False):
+        """Archive read notifications older than ``archive_days`` and delete
+        archived ones older than ``delete_days`` (0 disables a step).
+
+        Rows are processed ``batch_size`` at a time, skipping locked rows,
+        so the table is never locked for long. Only read notifications are
+        touched, which keeps the inbox counters valid. Returns the number of
+        archived and deleted rows.
+        """
+        now = fields.Datetime.now()
+        self.flush_model()
+        report = {'archived': 0, 'deleted': 0}
+        steps = []
+        if archive_days:
+            steps.append(('archived', f"""
+                UPDATE {self._table}
+                   SET active = FALSE, write_date = NOW() AT TIME ZONE 'UTC'
+                 WHERE id IN (SELECT id FROM {self._table}
+                               WHERE active AND is_read AND create_date < %s
+                               ORDER BY id LIMIT %s
+                               FOR UPDATE SKIP LOCKED)
+            """, now - timedelta(days=archive_days)))
+        if delete_days:
+            steps.append(('deleted', f"""
+                DELETE FROM {self._table}
+                 WHERE id IN (SELECT id FROM {self._table}
+                               WHERE NOT active AND is_read AND create_date < %s
+                               ORDER BY id LIMIT %s
+                               FOR UPDATE SKIP LOCKED)
+            """, now - timedelta(days=delete_days)))
+
+        for key, query, limit in steps:
+            while True:
+                self.env.cr.execute(query, [limit, batch_size])
+                count = self.env.cr.rowcount
+                report[key] += count
+                if commit:
+                    self.env.cr.commit()
+                if count < batch_size:
+                    break
+        self.invalidate_model()
+        return report
+
+    @api.model
+    def _cron_notification_retention(self):
+        """Enforce the notification retention policy on both notification tables"""
+        params = self.env['ir.config_parameter'].sudo()
+        archive_days = int(params.get_param('student_management.notification_archive_days', 90))
+        delete_days = int(params.get_param('student_management.notification_delete_days', 365))
+        report = {}
+        for model_name in ('student_management.notification_student', 'student_management.notification_staff'):
+            report[model_name] = self.env[model_name].sudo()._apply_retention(archive_days, delete_days, commit=True)
+            _logger.info("Notification retention on %s: %s archived, %s deleted",
+                         model_name, report[model_name]['archived'], report[model_name]['deleted'])
+        return report
+
+    @api.model
+    def _should_run_async(self, recipient_count, run_async=None):
+        """Audiences above the configured threshold are sent by the job cron"""
+        if run_async is not None:
+            return bool(run_async)
+        threshold = int(self.env['ir.config_parameter'].sudo().get_param(
+            'student_management.notification_async_threshold', 2000
+        ))
+        return recipient_count > threshold
 
 
 class NotificationStudent(models.Model):
     _name = 'student_management.notification_student'
     _description = 'Student Notification'
+    _inherit = ['student_management.notification.mixin']
+    _recipient_field = 'student_id'
     _order = 'create_date desc'
     _rec_name = 'display_name'
 
@@ -47,6 +259,11 @@ class NotificationStudent(models.Model):
         default=False,
         help='Indicates if the notification has been read by the student'
     )
+    active = fields.Boolean(
+        string='Active',
+        default=True,
+        help='Read notifications are archived by the retention job'
+    )
     read_date = fields.Datetime(
         string='Read Date',
         help='Date when the notification was read'
@@ -81,6 +298,37 @@ class NotificationStudent(models.Model):
         readonly=True
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._enqueue_push()
+        return records
+
+    def _enqueue_push(self):
+        """Queue a device push for the students that registered a token.
+
+        Notifications with the same content share one payload, so a course
+        fan-out is sent as a few multicasts by the outbox worker.
+        """
+        groups = defaultdict(list)
+        for record in self:
+            groups[(record.title, record.message, record.notification_type)].append(record.student_id.id)
+        Outbox = self.env['student_management.push_outbox']
+        Student = self.env['student_management.student'].sudo()
+        for (title, message, notification_type), student_ids in groups.items():
+            Outbox._enqueue(Student.browse(student_ids), title or 'Notification', message, {
+                'source': 'direct',
+                'type': notification_type,
+            })
+
+    def init(self):
+        # Unread notifications of a student (inbox and unread counters)
+        create_index(self.env.cr, 'student_management_notification_student_student_read_index',
+                     self._table, ['student_id', 'is_read'])
+        # Archive/delete scans of the retention cron
+        create_index(self.env.cr, 'student_management_notification_student_retention_index',
+                     self._table, ['active', 'create_date'])
+
     @api.depends('student_id', 'title', 'notification_type', 'is_read')
     def _compute_display_name(self):
         for record in self:
@@ -94,20 +342,17 @@ class NotificationStudent(models.Model):
 
     def action_mark_as_read(self):
         """Mark notification as read"""
-        for record in self:
-            if not record.is_read:
-                record.write({
-                    'is_read': True,
-                    'read_date': fields.Datetime.now()
-                })
+        self.check_access('write')
+        self._mark_read(ids=self.ids)
+        return True
 
     def action_mark_as_unread(self):
         """Mark notification as unread"""
-        for record in self:
-            record.write({
-                'is_read': False,
-                'read_date': False
-            })
+        self.filtered('is_read').write({
+            'is_read': False,
+            'read_date': False
+        })
+        return True
 
     @api.model
     def send_notification_to_student(self, student_id, message, title=None, notification_type='general', priority='medium'):
@@ -122,32 +367,45 @@ class NotificationStudent(models.Model):
         })
 
     @api.model
-    def send_notification_to_course(self, course_id, message, title=None, notification_type='general', priority='medium', session_year_id=None):
-        """Send notification to all students in a course"""
-        domain = [('course_id', '=', course_id), ('active', '=', True)]
-        if session_year_id:
-            domain.append(('session_year_id', '=', session_year_id))
-        
-        students = self.env['student_management.student'].search(domain)
-        notifications = []
-        
-        for student in students:
-            notification = self.create({
-                'student_id': student.id,
-                'message': message,
-                'title': title,
-                'notification_type': notification_type,
-                'priority': priority,
-                'sent_by': self.env.user.id
-            })
-            notifications.append(notification)
-        
-        return notifications
+    def send_notification_to_course(self, course_id, message, title=None, notification_type='general', priority='medium', session_year_id=None, run_async=None, broadcast=False):
+        """Send notification to all students in a course
+
+        The notifications are created in multi-row batches. Large audiences
+        (or ``run_async=True``) are queued as a notification job instead.
+        Returns the counts, and the ``job_id`` when queued.
+
+        With ``broadcast=True`` the message is stored once as a
+        ``student_management.notification_broadcast`` instead.
+        """
+        if broadcast:
+            record = self.env['student_management.notification_broadcast'].send_broadcast(
+                'course', message, title=title, notification_type=notification_type,
+                priority=priority, course_id=course_id, session_year_id=session_year_id,
+            )
+            return {'recipients': 0, 'created': 0, 'batches': 0, 'broadcast_id': record.id}
+        job_values = {
+            'target': 'course',
+            'course_id': course_id,
+            'session_year_id': session_year_id,
+            'message': message,
+            'title': title,
+            'notification_type': notification_type,
+            'priority': priority,
+            'sent_by': self.env.user.id,
+        }
+        Job = self.env['student_management.notification_job'].sudo()
+        student_ids = self.env['student_management.student'].search(Job._get_recipient_domain(job_values)).ids
+
+        if self._should_run_async(len(student_ids), run_async):
+            return Job._enqueue(job_values, len(student_ids))
+        return self._fan_out(student_ids, Job._get_notification_values(job_values))
 
 
 class NotificationStaff(models.Model):
     _name = 'student_management.notification_staff'
     _description = 'Staff Notification'
+    _inherit = ['student_management.notification.mixin']
+    _recipient_field = 'staff_id'
     _order = 'create_date desc'
     _rec_name = 'display_name'
 
@@ -189,6 +447,11 @@ class NotificationStaff(models.Model):
         default=False,
         help='Indicates if the notification has been read by the staff member'
     )
+    active = fields.Boolean(
+        string='Active',
+        default=True,
+        help='Read notifications are archived by the retention job'
+    )
     read_date = fields.Datetime(
         string='Read Date',
         help='Date when the notification was read'
@@ -207,6 +470,14 @@ class NotificationStaff(models.Model):
         store=True
     )
 
+    def init(self):
+        # Unread notifications of a staff member (inbox and unread counters)
+        create_index(self.env.cr, 'student_management_notification_staff_staff_read_index',
+                     self._table, ['staff_id', 'is_read'])
+        # Archive/delete scans of the retention cron
+        create_index(self.env.cr, 'student_management_notification_staff_retention_index',
+                     self._table, ['active', 'create_date'])
+
     @api.depends('staff_id', 'title', 'notification_type', 'is_read')
     def _compute_display_name(self):
         for record in self:
@@ -220,20 +491,17 @@ class NotificationStaff(models.Model):
 
     def action_mark_as_read(self):
         """Mark notification as read"""
-        for record in self:
-            if not record.is_read:
-                record.write({
-                    'is_read': True,
-                    'read_date': fields.Datetime.now()
-                })
+        self.check_access('write')
+        self._mark_read(ids=self.ids)
+        return True
 
     def action_mark_as_unread(self):
         """Mark notification as unread"""
-        for record in self:
-            record.write({
-                'is_read': False,
-                'read_date': False
-            })
+        self.filtered('is_read').write({
+            'is_read': False,
+            'read_date': False
+        })
+        return True
 
     @api.model
     def send_notification_to_staff(self, staff_id, message, title=None, notification_type='general', priority='medium'):
@@ -248,80 +516,210 @@ class NotificationStaff(models.Model):
         })
 
     @api.model
-    def send_notification_to_all_staff(self, message, title=None, notification_type='general', priority='medium'):
-        """Send notification to all active staff members"""
-        staff_members = self.env['student_management.staff'].search([('active', '=', True)])
-        notifications = []
-        
-        for staff in staff_members:
-            notification = self.create({
-                'staff_id': staff.id,
-                'message': message,
-                'title': title,
-                'notification_type': notification_type,
-                'priority': priority,
-                'sent_by': self.env.user.id
-            })
-            notifications.append(notification)
-        
-        return notifications
+    def send_notification_to_all_staff(self, message, title=None, notification_type='general', priority='medium', run_async=None, broadcast=False):
+        """Send notification to all active staff members
+
+        Same batching, queueing and broadcast rules as
+        ``send_notification_to_course``.
+        """
+        if broadcast:
+            record = self.env['student_management.notification_broadcast'].send_broadcast(
+                'all_staff', message, title=title, notification_type=notification_type, priority=priority,
+            )
+            return {'recipients': 0, 'created': 0, 'batches': 0, 'broadcast_id': record.id}
+        job_values = {
+            'target': 'all_staff',
+            'message': message,
+            'title': title,
+            'notification_type': notification_type,
+            'priority': priority,
+            'sent_by': self.env.user.id,
+        }
+        Job = self.env['student_management.notification_job'].sudo()
+        staff_ids = self.env['student_management.staff'].search(Job._get_recipient_domain(job_values)).ids
+
+        if self._should_run_async(len(staff_ids), run_async):
+            return Job._enqueue(job_values, len(staff_ids))
+        return self._fan_out(staff_ids, Job._get_notification_values(job_values))
 
     @api.model
     def get_notification_summary(self, user_type='all', date_from=None, date_to=None):
-        """Get notification summary statistics"""
-        summary = {
-            'student_notifications': {
-                'total': 0,
-                'read': 0,
-                'unread': 0,
-                'by_type': {},
-                'by_priority': {}
-            },
-            'staff_notifications': {
-                'total': 0,
-                'read': 0,
-                'unread': 0,
-                'by_type': {},
-                'by_priority': {}
-            }
-        }
-        
+        """Get notification summary statistics
+
+        Each user type is summarised with one grouped query over type,
+        priority and read status, whatever the size of the date range.
+        Archived notifications are included.
+        """
         domain = []
         if date_from:
             domain.append(('create_date', '>=', date_from))
         if date_to:
             domain.append(('create_date', '<=', date_to))
-        
-        if user_type in ['all', 'student']:
-            student_notifications = self.env['student_management.notification_student'].search(domain)
-            summary['student_notifications']['total'] = len(student_notifications)
-            summary['student_notifications']['read'] = len(student_notifications.filtered('is_read'))
-            summary['student_notifications']['unread'] = summary['student_notifications']['total'] - summary['student_notifications']['read']
-            
-            # By type
-            for ntype in ['general', 'academic', 'attendance', 'leave', 'result', 'fee', 'event', 'urgent']:
-                count = len(student_notifications.filtered(lambda n: n.notification_type == ntype))
-                summary['student_notifications']['by_type'][ntype] = count
-            
-            # By priority
-            for priority in ['low', 'medium', 'high', 'urgent']:
-                count = len(student_notifications.filtered(lambda n: n.priority == priority))
-                summary['student_notifications']['by_priority'][priority] = count
-        
-        if user_type in ['all', 'staff']:
-            staff_notifications = self.search(domain)
-            summary['staff_notifications']['total'] = len(staff_notifications)
-            summary['staff_notifications']['read'] = len(staff_notifications.filtered('is_read'))
-            summary['staff_notifications']['unread'] = summary['staff_notifications']['total'] - summary['staff_notifications']['read']
-            
-            # By type
-            for ntype in ['general', 'academic', 'administrative', 'leave', 'meeting', 'policy', 'urgent']:
-                count = len(staff_notifications.filtered(lambda n: n.notification_type == ntype))
-                summary['staff_notifications']['by_type'][ntype] = count
-            
-            # By priority
-            for priority in ['low', 'medium', 'high', 'urgent']:
-                count = len(staff_notifications.filtered(lambda n: n.priority == priority))
-                summary['staff_notifications']['by_priority'][priority] = count
-        
+
+        models_by_type = {
+            'student': ('student_notifications', 'student_management.notification_student'),
+            'staff': ('staff_notifications', 'student_management.notification_staff'),
+        }
+        summary = {}
+        for key, (summary_key, model_name) in models_by_type.items():
+            Notification = self.env[model_name].with_context(active_test=False)
+            section = summary[summary_key] = {
+                'total': 0,
+                'read': 0,
+                'unread': 0,
+                'by_type': dict.fromkeys(dict(Notification._fields['notification_type'].selection), 0),
+                'by_priority': dict.fromkeys(dict(Notification._fields['priority'].selection), 0),
+            }
+            if user_type not in ('all', key):
+                continue
+            groups = Notification._read_group(domain, ['notification_type', 'priority', 'is_read'], ['__count'])
+            for notification_type, priority, is_read, count in groups:
+                section['total'] += count
+                section['read' if is_read else 'unread'] += count
+                section['by_type'][notification_type] = section['by_type'].get(notification_type, 0) + count
+                if priority:
+                    section['by_priority'][priority] = section['by_priority'].get(priority, 0) + count
         return summary
+
+
+class NotificationJob(models.Model):
+    _name = 'student_management.notification_job'
+    _description = 'Notification Fan-out Job'
+    _order = 'id desc'
+    _rec_name = 'title'
+
+    target = fields.Selection([
+        ('course', 'Course Students'),
+        ('all_staff', 'All Staff')
+    ], string='Audience', required=True, readonly=True)
+    course_id = fields.Many2one(
+        'student_management.course',
+        string='Course',
+        ondelete='cascade',
+        readonly=True
+    )
+    session_year_id = fields.Many2one(
+        'student_management.session_year',
+        string='Session Year',
+        ondelete='cascade',
+        readonly=True
+    )
+    title = fields.Char(string='Title', readonly=True)
+    message = fields.Text(string='Message', required=True, readonly=True)
+    notification_type = fields.Char(string='Type', readonly=True)
+    priority = fields.Char(string='Priority', readonly=True)
+    sent_by = fields.Many2one('res.users', string='Sent By', readonly=True)
+
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string='Status', default='pending', required=True, readonly=True, index=True)
+    recipient_count = fields.Integer(string='Recipients', readonly=True)
+    created_count = fields.Integer(string='Sent', readonly=True)
+    last_recipient_id = fields.Integer(
+        string='Last Recipient',
+        readonly=True,
+        help='Highest recipient id already notified; the job resumes after it'
+    )
+    date_done = fields.Datetime(string='Completed On', readonly=True)
+    error = fields.Text(string='Error', readonly=True)
+
+    _TARGET_MODELS = {
+        'course': ('student_management.notification_student', 'student_management.student'),
+        'all_staff': ('student_management.notification_staff', 'student_management.staff'),
+    }
+
+    @api.model
+    def _get_recipient_domain(self, values):
+        if values['target'] == 'course':
+            domain = [('course_id', '=', values['course_id']), ('active', '=', True)]
+            if values.get('session_year_id'):
+                domain.append(('session_year_id', '=', values['session_year_id']))
+            return domain
+        return [('active', '=', True)]
+
+    @api.model
+    def _get_notification_values(self, values):
+        return {
+            'message': values['message'],
+            'title': values.get('title'),
+            'notification_type': values.get('notification_type') or 'general',
+            'priority': values.get('priority') or 'medium',
+            'sent_by': values.get('sent_by'),
+        }
+
+    @api.model
+    def _enqueue(self, values, recipient_count):
+        job = self.create(dict(values, recipient_count=recipient_count))
+        self.env.ref('odoo_student_management.ir_cron_notification_jobs')._trigger()
+        return {
+            'recipients': recipient_count,
+            'created': 0,
+            'batches': 0,
+            'job_id': job.id,
+        }
+
+    def _job_values(self):
+        self.ensure_one()
+        return {
+            'target': self.target,
+            'course_id': self.course_id.id,
+            'session_year_id': self.session_year_id.id,
+            'message': self.message,
+            'title': self.title,
+            'notification_type': self.notification_type,
+            'priority': self.priority,
+            'sent_by': self.sent_by.id,
+        }
+
+    def _run(self, commit=False):
+        """Send the notifications of the job one batch at a time.
+
+        Recipients are walked in id order from ``last_recipient_id`` so an
+        interrupted job resumes where it stopped. With ``commit`` every
+        batch is committed on its own, keeping transactions short.
+        """
+        self.ensure_one()
+        notification_model, recipient_model = self._TARGET_MODELS[self.target]
+        Notification = self.env[notification_model].sudo()
+        Recipient = self.env[recipient_model].sudo()
+        values = self._job_values()
+        domain = self._get_recipient_domain(values)
+        notification_values = self._get_notification_values(values)
+
+        self.state = 'running'
+        while True:
+            recipients = Recipient.search(
+                domain + [('id', '>', self.last_recipient_id)],
+                order='id', limit=Notification._fan_out_batch_size
+            )
+            if not recipients:
+                break
+            Notification._fan_out(recipients.ids, notification_values)
+            self.write({
+                'last_recipient_id': recipients[-1].id,
+                'created_count': self.created_count + len(recipients),
+            })
+            if commit:
+                self.env.cr.commit()
+        self.write({'state': 'done', 'date_done': fields.Datetime.now()})
+
+    @api.model
+    def _cron_process_jobs(self):
+        """Run the pending notification jobs"""
+        for job in self.search([('state', 'in', ('pending', 'running'))], order='id'):
+            try:
+                job._run(commit=True)
+                self.env.cr.commit()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.error("Notification job %s failed: %s", job.id, e, exc_info=True)
+                job.write({'state': 'failed', 'error': str(e)})
+                self.env.cr.commit()
+
+    def action_retry(self):
+        """Resume failed jobs from their last sent recipient"""
+        self.filtered(lambda job: job.state == 'failed').write({'state': 'pending', 'error': False})
+        self.env.ref('odoo_student_management.ir_cron_notification_jobs')._trigger()
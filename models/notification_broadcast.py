@@ -0,0 +1,501 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools.sql import create_index
+
+
+class NotificationBroadcast(models.Model):
+    _name = 'student_management.notification_broadcast'
+    _description = 'Broadcast Notification'
+    _order = 'id desc'
+    _rec_name = 'title'
+
+    audience = fields.Selection([
+        ('course', 'Course Students'),
+        ('session', 'Session Year Students'),
+        ('all_staff', 'All Staff')
+    ], string='Audience', required=True, default='course', index=True)
+    course_id = fields.Many2one(
+        'student_management.course',
+        string='Course',
+        ondelete='cascade',
+        index=True,
+        help='Course whose students receive the notification'
+    )
+    session_year_id = fields.Many2one(
+        'student_management.session_year',
+        string='Session Year',
+        ondelete='cascade',
+        index=True,
+        help='Restrict the audience to the students of this session year'
+    )
+    message = fields.Text(
+        string='Message',
+        required=True,
+        help='Notification message content'
+    )
+    title = fields.Char(
+        string='Title',
+        help='Notification title/subject'
+    )
+    notification_type = fields.Selection([
+        ('general', 'General'),
+        ('academic', 'Academic'),
+        ('attendance', 'Attendance'),
+        ('administrative', 'Administrative'),
+        ('leave', 'Leave'),
+        ('result', 'Result'),
+        ('fee', 'Fee'),
+        ('event', 'Event'),
+        ('meeting', 'Meeting'),
+        ('policy', 'Policy'),
+        ('urgent', 'Urgent')
+    ], string='Type', default='general', required=True)
+    priority = fields.Selection([
+        ('low', 'Low'),
+        ('medium', 'Medium'),
+        ('high', 'High'),
+        ('urgent', 'Urgent')
+    ], string='Priority', default='medium')
+    sent_by = fields.Many2one(
+        'res.users',
+        string='Sent By',
+        default=lambda self: self.env.user,
+        help='User who sent the notification'
+    )
+
+    def init(self):
+        # Unread broadcasts of an audience: id ranges above a read cursor
+        # (_get_audience_domain with unread_only), one index per audience kind
+        create_index(self.env.cr, 'student_management_notification_broadcast_course_unread_index',
+                     self._table, ['course_id', 'session_year_id', 'id'], where="audience = 'course'")
+        create_index(self.env.cr, 'student_management_notification_broadcast_session_unread_index',
+                     self._table, ['session_year_id', 'id'], where="audience = 'session'")
+        create_index(self.env.cr, 'student_management_notification_broadcast_staff_unread_index',
+                     self._table, ['id'], where="audience = 'all_staff'")
+
+    _AUDIENCE_FIELDS = ('audience', 'course_id', 'session_year_id')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._update_inbox_counters(1)
+        records._push_to_bus()
+        records._enqueue_push()
+        return records
+
+    def write(self, vals):
+        if not set(self._AUDIENCE_FIELDS) & set(vals):
+            return super().write(vals)
+        self._update_inbox_counters(-1)
+        result = super().write(vals)
+        self._update_inbox_counters(1)
+        return result
+
+    def unlink(self):
+        self._update_inbox_counters(-1)
+        return super().unlink()
+
+    def _update_inbox_counters(self, sign):
+        """Add ``sign`` to the unread broadcast counter of every inbox in
+        the audience that has not read the broadcast yet"""
+        if not self:
+            return
+        self.flush_recordset(list(self._AUDIENCE_FIELDS))
+        for record in self:
+            if record.audience == 'all_staff':
+                recipients = "SELECT user_id FROM student_management_staff WHERE user_id IS NOT NULL AND active"
+                params = []
+            elif record.audience == 'session':
+                recipients = "SELECT user_id FROM student_management_student WHERE session_year_id = %s AND active"
+                params = [record.session_year_id.id]
+            else:
+                recipients = "SELECT user_id FROM student_management_student WHERE course_id = %s AND active"
+                params = [record.course_id.id]
+                if record.session_year_id:
+                    recipients += " AND session_year_id = %s"
+                    params.append(record.session_year_id.id)
+            self.env.cr.execute(f"""
+                UPDATE student_management_notification_inbox AS inbox
+                   SET unread_broadcast_count = GREATEST(inbox.unread_broadcast_count + %s, 0)
+                 WHERE inbox.last_read_broadcast_id < %s
+                   AND inbox.user_id IN ({recipients})
+                   AND NOT EXISTS (
+                       SELECT 1 FROM student_management_notification_inbox_broadcast_read_rel rel
+                        WHERE rel.inbox_id = inbox.id AND rel.broadcast_id = %s
+                   )
+            """, [sign, record.id, *params, record.id])
+        self.env['student_management.notification_inbox'].invalidate_model(['unread_broadcast_count'])
+
+    _BUS_SUBCHANNEL = 'student_management_broadcast'
+
+    @api.model
+    def _get_student_channels(self, student):
+        """Bus channels a student listens to for broadcasts.
+
+        Channels are ``(record, subchannel)`` pairs: clients can only
+        subscribe to string channels, so only the server adds these.
+        """
+        channels = []
+        if student.session_year_id:
+            channels.append((student.session_year_id, self._BUS_SUBCHANNEL))
+        if student.course_id:
+            channels.append((student.course_id, self._BUS_SUBCHANNEL))
+            if student.session_year_id:
+                channels.append((student.course_id, f'{self._BUS_SUBCHANNEL}_{student.session_year_id.id}'))
+        return channels
+
+    @api.model
+    def _get_staff_channel(self):
+        """Bus channel of the broadcasts to all staff"""
+        return (self.env.ref('odoo_student_management.group_student_management_staff'), self._BUS_SUBCHANNEL)
+
+    def _get_bus_channel(self):
+        self.ensure_one()
+        if self.audience == 'all_staff':
+            return self._get_staff_channel()
+        if self.audience == 'session':
+            return (self.session_year_id, self._BUS_SUBCHANNEL)
+        if self.session_year_id:
+            return (self.course_id, f'{self._BUS_SUBCHANNEL}_{self.session_year_id.id}')
+        return (self.course_id, self._BUS_SUBCHANNEL)
+
+    def _push_to_bus(self):
+        """One bus message per broadcast, on the channel of its audience"""
+        self.env['bus.bus']._sendmany([
+            (record._get_bus_channel(), 'student_management/notification', {
+                'id': record.id,
+                'source': 'broadcast',
+                'title': record.title,
+                'message': record.message,
+                'type': record.notification_type,
+                'priority': record.priority,
+            }) for record in self
+        ])
+
+    def _enqueue_push(self):
+        """Queue a device push for the students of the audience"""
+        Student = self.env['student_management.student'].sudo()
+        for record in self.filtered(lambda broadcast: broadcast.audience != 'all_staff'):
+            if record.audience == 'session':
+                domain = [('session_year_id', '=', record.session_year_id.id)]
+            else:
+                domain = [('course_id', '=', record.course_id.id)]
+                if record.session_year_id:
+                    domain.append(('session_year_id', '=', record.session_year_id.id))
+            students = Student.search(domain + [('fcm_token', '!=', False)])
+            self.env['student_management.push_outbox']._enqueue(students, record.title or 'Notification', record.message, {
+                'source': 'broadcast',
+                'type': record.notification_type,
+            })
+
+    @api.constrains('audience', 'course_id', 'session_year_id')
+    def _check_audience(self):
+        for record in self:
+            if record.audience == 'course' and not record.course_id:
+                raise ValidationError("A course broadcast requires a course.")
+            if record.audience == 'session' and not record.session_year_id:
+                raise ValidationError("A session year broadcast requires a session year.")
+
+    @api.model
+    def send_broadcast(self, audience, message, title=None, notification_type='general', priority='medium', course_id=None, session_year_id=None):
+        """Store a notification once for a whole audience"""
+        return self.create({
+            'audience': audience,
+            'course_id': course_id,
+            'session_year_id': session_year_id,
+            'message': message,
+            'title': title,
+            'notification_type': notification_type,
+            'priority': priority,
+            'sent_by': self.env.user.id,
+        })
+
+    @api.model
+    def _get_audience_domain(self, student=None, staff=None):
+        """Domain of the broadcasts addressed to ``student`` or ``staff``"""
+        domains = []
+        if student:
+            domains.append([('audience', '=', 'session'), ('session_year_id', '=', student.session_year_id.id)])
+            domains.append([
+                ('audience', '=', 'course'),
+                ('course_id', '=', student.course_id.id),
+                '|', ('session_year_id', '=', False), ('session_year_id', '=', student.session_year_id.id),
+            ])
+        if staff:
+            domains.append([('audience', '=', 'all_staff')])
+        if not domains:
+            return expression.FALSE_DOMAIN
+        return expression.OR(domains)
+
+    def _to_notification_dict(self, read_cursor, read_ids=()):
+        """Same shape as the direct notifications returned by the API;
+        ``read_ids`` are the broadcasts read above ``read_cursor``"""
+        return [{
+            'id': record.id,
+            'source': 'broadcast',
+            'title': record.title,
+            'message': record.message,
+            'type': record.notification_type,
+            'priority': record.priority,
+            'is_read': record.id <= read_cursor or record.id in read_ids,
+            'date': record.create_date.strftime('%Y-%m-%d %H:%M:%S'),
+        } for record in self]
+
+
+class NotificationInbox(models.Model):
+    _name = 'student_management.notification_inbox'
+    _description = 'Notification Inbox'
+    _rec_name = 'user_id'
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='User',
+        required=True,
+        ondelete='cascade',
+        readonly=True
+    )
+    last_read_broadcast_id = fields.Integer(
+        string='Last Read Broadcast',
+        default=0,
+        readonly=True,
+        help='Broadcasts up to this id are read by the user'
+    )
+    read_broadcast_ids = fields.Many2many(
+        'student_management.notification_broadcast',
+        'student_management_notification_inbox_broadcast_read_rel',
+        'inbox_id',
+        'broadcast_id',
+        string='Read Broadcasts',
+        readonly=True,
+        help='Broadcasts above the read cursor that the user read one by one'
+    )
+    # Maintained on write so the badge never scans the direct notifications
+    unread_direct_count = fields.Integer(
+        string='Unread Direct Notifications',
+        default=0,
+        readonly=True
+    )
+    # Bumped for the audience when a broadcast is sent, lowered when it is read
+    unread_broadcast_count = fields.Integer(
+        string='Unread Broadcasts',
+        default=0,
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('user_unique', 'unique(user_id)', 'A user can only have one notification inbox.'),
+    ]
+
+    @api.model
+    def _get_inbox(self, user=None):
+        """Return the inbox of ``user``, creating it if needed"""
+        user = user or self.env.user
+        inbox = self.sudo().search([('user_id', '=', user.id)], limit=1)
+        if not inbox:
+            self.env.cr.execute("""
+                INSERT INTO student_management_notification_inbox
+                    (user_id, last_read_broadcast_id, unread_direct_count, unread_broadcast_count,
+                     create_uid, create_date, write_uid, write_date)
+                VALUES (%s, 0, 0, 0, %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC')
+                ON CONFLICT (user_id) DO NOTHING
+            """, [user.id, self.env.uid, self.env.uid])
+            inbox = self.sudo().search([('user_id', '=', user.id)], limit=1)
+            inbox._recompute_unread_counts()
+        return inbox
+
+    @api.model
+    def _get_unread_count(self, user=None):
+        """Unread notifications of ``user``, read from the inbox counters only"""
+        user = user or self.env.user
+        self.env.cr.execute("""
+            SELECT unread_direct_count + unread_broadcast_count
+              FROM student_management_notification_inbox
+             WHERE user_id = %s
+        """, [user.id])
+        row = self.env.cr.fetchone()
+        if row is None:
+            inbox = self._get_inbox(user)
+            return inbox.unread_direct_count + inbox.unread_broadcast_count
+        return row[0]
+
+    @api.model
+    def _apply_unread_deltas(self, deltas):
+        """Add ``{user_id: delta}`` to the unread direct counters with one
+        statement. Users without an inbox are skipped: their counters are
+        computed when the inbox is created."""
+        rows = sorted((user_id, delta) for user_id, delta in deltas.items() if delta)
+        if not rows:
+            return
+        self.env.cr.execute(f"""
+            UPDATE student_management_notification_inbox AS inbox
+               SET unread_direct_count = GREATEST(inbox.unread_direct_count + v.delta, 0)
+              FROM (VALUES {', '.join(['%s'] * len(rows))}) AS v(user_id, delta)
+             WHERE inbox.user_id = v.user_id
+        """, rows)
+        self.invalidate_model(['unread_direct_count'])
+
+    def _recompute_unread_counts(self):
+        """Recount both counters from the notification tables"""
+        Broadcast = self.env['student_management.notification_broadcast'].sudo()
+        for inbox in self:
+            student, staff = inbox._get_recipients()
+            direct = 0
+            if student:
+                direct = self.env['student_management.notification_student'].sudo().search_count([
+                    ('student_id', '=', student.id), ('is_read', '=', False)
+                ])
+            elif staff:
+                direct = self.env['student_management.notification_staff'].sudo().search_count([
+                    ('staff_id', '=', staff.id), ('is_read', '=', False)
+                ])
+            inbox.sudo().write({
+                'unread_direct_count': direct,
+                'unread_broadcast_count': Broadcast.search_count(inbox._get_broadcast_domain(unread_only=True)),
+            })
+        return True
+
+    @api.model
+    def _recompute_for_users(self, users):
+        """Recount the inboxes of ``users`` after their audience changed"""
+        self.sudo().search([('user_id', 'in', users.ids)])._recompute_unread_counts()
+
+    def _get_recipients(self):
+        """The student and staff records of the inbox owner"""
+        self.ensure_one()
+        user = self.user_id
+        student = staff = None
+        if user.has_group('odoo_student_management.group_student_management_student'):
+            student = self.env['student_management.student'].sudo().search([('user_id', '=', user.id)], limit=1)
+        elif user.has_group('odoo_student_management.group_student_management_staff'):
+            staff = self.env['student_management.staff'].sudo().search([('user_id', '=', user.id)], limit=1)
+        return student or None, staff or None
+
+    def _get_broadcast_domain(self, unread_only=False):
+        student, staff = self._get_recipients()
+        domain = self.env['student_management.notification_broadcast']._get_audience_domain(student, staff)
+        if unread_only:
+            domain = expression.AND([domain, [
+                ('id', '>', self.last_read_broadcast_id),
+                ('id', 'not in', self.read_broadcast_ids.ids),
+            ]])
+        return domain
+
+    def _get_direct_source(self, unread_only=False):
+        """Model and domain of the direct notifications of the owner"""
+        student, staff = self._get_recipients()
+        if student:
+            model, domain = 'student_management.notification_student', [('student_id', '=', student.id)]
+        elif staff:
+            model, domain = 'student_management.notification_staff', [('staff_id', '=', staff.id)]
+        else:
+            return None, None
+        if unread_only:
+            domain.append(('is_read', '=', False))
+        return self.env[model].sudo(), domain
+
+    def get_notifications(self, limit=10, unread_only=True, offset=0):
+        """Direct and broadcast notifications of the owner, newest first
+
+        Each source is read up to ``offset + limit`` rows, so a page never
+        loads more than the notifications before it.
+        """
+        self.ensure_one()
+        window = offset + limit if limit else None
+        items = []
+        direct, domain = self._get_direct_source(unread_only=unread_only)
+        if direct is not None:
+            for notif in direct.search(domain, limit=window, order='create_date desc'):
+                items.append({
+                    'id': notif.id,
+                    'source': 'direct',
+                    'title': notif.title,
+                    'message': notif.message,
+                    'type': notif.notification_type,
+                    'priority': notif.priority,
+                    'is_read': notif.is_read,
+                    'date': notif.create_date.strftime('%Y-%m-%d %H:%M:%S'),
+                })
+
+        broadcasts = self.env['student_management.notification_broadcast'].sudo().search(
+            self._get_broadcast_domain(unread_only=unread_only), limit=window, order='id desc'
+        )
+        items += broadcasts._to_notification_dict(self.last_read_broadcast_id, set(self.read_broadcast_ids.ids))
+
+        items.sort(key=lambda item: item['date'], reverse=True)
+        return items[offset:window]
+
+    def count_notifications(self, unread_only=False):
+        """Number of direct and broadcast notifications of the owner"""
+        self.ensure_one()
+        direct, domain = self._get_direct_source(unread_only=unread_only)
+        count = direct.search_count(domain) if direct is not None else 0
+        return count + self.env['student_management.notification_broadcast'].sudo().search_count(
+            self._get_broadcast_domain(unread_only=unread_only)
+        )
+
+    def mark_all_read(self):
+        """Mark every direct and broadcast notification of the owner as read"""
+        self.ensure_one()
+        student, staff = self._get_recipients()
+        if student:
+            self.env['student_management.notification_student'].sudo()._mark_read(recipient_ids=student.ids)
+        elif staff:
+            self.env['student_management.notification_staff'].sudo()._mark_read(recipient_ids=staff.ids)
+        return self.mark_broadcasts_read()
+
+    def mark_broadcasts_read(self, up_to_id=None):
+        """Mark every broadcast up to ``up_to_id`` as read.
+
+        Moves the read cursor forward (to the latest broadcast by default),
+        it never moves backwards; use :meth:`mark_broadcast_read` to read a
+        single broadcast.
+        """
+        self.ensure_one()
+        if up_to_id is None:
+            latest = self.env['student_management.notification_broadcast'].sudo().search(
+                self._get_broadcast_domain(), limit=1, order='id desc'
+            )
+            up_to_id = latest.id
+        if up_to_id and up_to_id > self.last_read_broadcast_id:
+            # The broadcasts read one by one below the cursor are covered by it
+            below = self.read_broadcast_ids.filtered(lambda broadcast: broadcast.id <= up_to_id)
+            self.sudo().write({
+                'last_read_broadcast_id': up_to_id,
+                'read_broadcast_ids': [(3, broadcast_id) for broadcast_id in below.ids],
+            })
+            self.sudo().write({
+                'unread_broadcast_count': self.env['student_management.notification_broadcast'].sudo().search_count(
+                    self._get_broadcast_domain(unread_only=True)
+                ),
+            })
+        return True
+
+    def mark_broadcast_read(self, broadcasts):
+        """Mark the given broadcasts as read, leaving the older ones untouched"""
+        self.ensure_one()
+        unread = broadcasts.filtered(
+            lambda broadcast: broadcast.id > self.last_read_broadcast_id and broadcast not in self.read_broadcast_ids
+        )
+        if unread:
+            self.sudo().write({'read_broadcast_ids': [(4, broadcast_id) for broadcast_id in unread.ids]})
+            # In place, so a broadcast sent meanwhile keeps its increment
+            self.env.cr.execute("""
+                UPDATE student_management_notification_inbox
+                   SET unread_broadcast_count = GREATEST(unread_broadcast_count - %s, 0)
+                 WHERE id = %s
+            """, [len(unread), self.id])
+            self.invalidate_recordset(['unread_broadcast_count'])
+        return True
+
+    def mark_notifications_read(self, notifications):
+        """Mark the entries returned by :meth:`get_notifications` as read"""
+        self.ensure_one()
+        unread = [item for item in notifications if not item['is_read']]
+        direct_ids = [item['id'] for item in unread if item['source'] == 'direct']
+        direct, _domain = self._get_direct_source()
+        if direct is not None and direct_ids:
+            direct._mark_read(ids=direct_ids)
+        return self.mark_broadcast_read(self.env['student_management.notification_broadcast'].sudo().browse(
+            [item['id'] for item in unread if item['source'] == 'broadcast']
+        ))
@@ -0,0 +1,272 @@
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import firebase_admin
+    from firebase_admin import credentials, messaging
+except ImportError:
+    firebase_admin = None
+
+
+class StubPushSender:
+    """Sender that only records the messages, for tests and benchmarks.
+
+    Never used unless ``student_management.push_sender`` is set to
+    ``stub``. Tokens starting with ``invalid`` are reported as
+    unregistered and tokens starting with ``retry`` as a temporary failure.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.sent = []
+
+    def send_multicast(self, tokens, title, body, data):
+        self.sent.append({'tokens': list(tokens), 'title': title, 'body': body, 'data': data})
+        results = {}
+        for token in tokens:
+            if token.startswith('invalid'):
+                results[token] = ('invalid', 'Unregistered token')
+            elif token.startswith('retry'):
+                results[token] = ('retry', 'Temporary failure')
+            else:
+                results[token] = ('ok', None)
+        return results
+
+
+class FirebasePushSender:
+    """Firebase Cloud Messaging sender (requires the firebase_admin package)"""
+
+    # FCM accepts at most 500 tokens per multicast message
+    max_tokens = 500
+
+    def __init__(self, env):
+        if firebase_admin is None:
+            raise ImportError("The firebase_admin Python package is required to send push notifications.")
+        self.env = env
+        try:
+            self.app = firebase_admin.get_app()
+        except ValueError:
+            path = env['ir.config_parameter'].sudo().get_param('student_management.firebase_credentials')
+            self.app = firebase_admin.initialize_app(credentials.Certificate(path) if path else None)
+
+    def send_multicast(self, tokens, title, body, data):
+        results = {}
+        for start in range(0, len(tokens), self.max_tokens):
+            chunk = tokens[start:start + self.max_tokens]
+            response = messaging.send_each_for_multicast(messaging.MulticastMessage(
+                tokens=chunk,
+                notification=messaging.Notification(title=title, body=body),
+                data={key: str(value) for key, value in (data or {}).items()},
+            ), app=self.app)
+            for token, result in zip(chunk, response.responses):
+                if result.success:
+                    results[token] = ('ok', None)
+                elif isinstance(result.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+                    results[token] = ('invalid', str(result.exception))
+                else:
+                    results[token] = ('retry', str(result.exception))
+        return results
+
+
+PUSH_SENDERS = {
+    'stub': StubPushSender,
+    'firebase': FirebasePushSender,
+}
+
+
+class PushOutbox(models.Model):
+    _name = 'student_management.push_outbox'
+    _description = 'Push Notification Outbox'
+    _order = 'id'
+    _rec_name = 'title'
+
+    student_id = fields.Many2one(
+        'student_management.student',
+        string='Student',
+        ondelete='cascade',
+        readonly=True
+    )
+    token = fields.Text(string='Device Token', required=True, readonly=True)
+    title = fields.Char(string='Title', readonly=True)
+    body = fields.Text(string='Body', readonly=True)
+    data = fields.Json(string='Data', readonly=True)
+    payload_key = fields.Char(
+        string='Payload Key',
+        readonly=True,
+        index=True,
+        help='Hash of the payload; messages with the same key are sent as one multicast'
+    )
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed')
+    ], string='Status', default='pending', required=True, readonly=True)
+    attempts = fields.Integer(string='Attempts', default=0, readonly=True)
+    next_attempt_at = fields.Datetime(string='Next Attempt', default=fields.Datetime.now, readonly=True)
+    sent_at = fields.Datetime(string='Sent On', readonly=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    def init(self):
+        # The worker only scans due pending messages
+        create_index(self.env.cr, 'student_management_push_outbox_due_index',
+                     self._table, ['next_attempt_at'], where="state = 'pending'")
+
+    @api.model
+    def _get_payload_key(self, title, body, data):
+        return hashlib.sha1(json.dumps([title, body, data], sort_keys=True).encode()).hexdigest()
+
+    @api.model
+    def _enqueue(self, students, title, body, data=None):
+        """Queue one message per student device with a single multi-create.
+
+        Only writes to the outbox: nothing is sent inside the caller's
+        transaction.
+        """
+        students = students.filtered('fcm_token')
+        if not students:
+            return self.browse()
+        payload_key = self._get_payload_key(title, body, data)
+        return self.sudo().create([{
+            'student_id': student.id,
+            'token': student.fcm_token,
+            'title': title,
+            'body': body,
+            'data': data,
+            'payload_key': payload_key,
+        } for student in students])
+
+    @api.model
+    def _get_sender(self):
+        """Sender named by ``student_management.push_sender``, or None when
+        it is not configured: the messages then stay pending"""
+        name = self.env['ir.config_parameter'].sudo().get_param('student_management.push_sender')
+        if not name:
+            _logger.warning("No push sender configured (student_management.push_sender), messages stay pending")
+            return None
+        if name not in PUSH_SENDERS:
+            _logger.error("Unknown push sender %r, expected one of %s", name, ', '.join(sorted(PUSH_SENDERS)))
+            return None
+        return PUSH_SENDERS[name](self.env)
+
+    @api.model
+    def _get_retry_delay(self, attempts):
+        """Exponential backoff: 1, 2, 4... minutes, capped at one day"""
+        return timedelta(minutes=min(2 ** (attempts - 1), 24 * 60))
+
+    @api.model
+    def _drain(self, batch_size=500, max_attempts=5, commit=False):
+        """Send the due messages of the outbox, one batch per transaction.
+
+        Due rows are claimed with ``FOR UPDATE SKIP LOCKED`` so several
+        workers can drain in parallel. Messages sharing a payload are sent
+        as one multicast; unregistered tokens are removed from the students
+        and temporary failures are retried with backoff. Returns the number
+        of sent, failed and retried messages.
+        """
+        report = {'sent': 0, 'failed': 0, 'retried': 0}
+        sender = self._get_sender()
+        if sender is None:
+            return report
+        while True:
+            self.flush_model()
+            self.env.cr.execute("""
+                SELECT id FROM student_management_push_outbox
+                 WHERE state = 'pending' AND next_attempt_at <= NOW() AT TIME ZONE 'UTC'
+                 ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, [batch_size])
+            messages = self.browse([row[0] for row in self.env.cr.fetchall()])
+            if not messages:
+                break
+
+            groups = defaultdict(lambda: self.browse())
+            for message in messages:
+                groups[message.payload_key] |= message
+
+            now = fields.Datetime.now()
+            sent = self.browse()
+            invalid_tokens = set()
+            retry = defaultdict(lambda: self.browse())
+            for group in groups.values():
+                first = group[0]
+                tokens = list(set(group.mapped('token')))
+                try:
+                    results = sender.send_multicast(tokens, first.title, first.body, first.data)
+                except Exception as e:
+                    _logger.warning("Push multicast failed: %s", e)
+                    results = {token: ('retry', str(e)) for token in tokens}
+                for message in group:
+                    status, error = results.get(message.token, ('retry', 'No result'))
+                    if status == 'ok':
+                        sent |= message
+                    elif status == 'invalid':
+                        invalid_tokens.add(message.token)
+                        retry[('failed', error)] |= message
+                    else:
+                        retry[('retry', error)] |= message
+
+            # One write per outcome and attempt count rather than per message
+            sent_by_attempts = defaultdict(lambda: self.browse())
+            for message in sent:
+                sent_by_attempts[message.attempts + 1] |= message
+            for attempts, group in sent_by_attempts.items():
+                group.write({'state': 'sent', 'sent_at': now, 'attempts': attempts})
+            report['sent'] += len(sent)
+
+            updates = defaultdict(lambda: self.browse())
+            for (status, error), group in retry.items():
+                for message in group:
+                    attempts = message.attempts + 1
+                    updates[(status == 'failed' or attempts >= max_attempts, error, attempts)] |= message
+            for (final, error, attempts), group in updates.items():
+                if final:
+                    group.write({'state': 'failed', 'attempts': attempts, 'last_error': error})
+                    report['failed'] += len(group)
+                else:
+                    group.write({
+                        'attempts': attempts,
+                        'last_error': error,
+                        'next_attempt_at': now + self._get_retry_delay(attempts),
+                    })
+                    report['retried'] += len(group)
+
+            if invalid_tokens:
+                self.env['student_management.student'].sudo().search([
+                    ('fcm_token', 'in', list(invalid_tokens))
+                ]).write({'fcm_token': False})
+                # Drop the pending messages queued for the same dead devices
+                self.search([('state', '=', 'pending'), ('token', 'in', list(invalid_tokens))]).write({
+                    'state': 'failed', 'last_error': 'Unregistered token',
+                })
+            if commit:
+                self.env.cr.commit()
+            if len(messages) < batch_size:
+                break
+        return report
+
+    @api.model
+    def _cron_drain_outbox(self):
+        """Send the queued push notifications"""
+        report = self._drain(commit=True)
+        if any(report.values()):
+            _logger.info("Push outbox: %(sent)s sent, %(failed)s failed, %(retried)s retried", report)
+        return report
+
+    @api.model
+    def _cron_purge_outbox(self, days=30):
+        """Remove the sent and failed messages older than ``days``"""
+        limit = fields.Datetime.now() - timedelta(days=days)
+        self.env.cr.execute("""
+            DELETE FROM student_management_push_outbox
+             WHERE state IN ('sent', 'failed') AND create_date < %s
+        """, [limit])
+        return self.env.cr.rowcount
@@ -0,0 +1,293 @@
+import base64
+import csv
+import io
+import logging
+from datetime import date, datetime
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Columns of a gradebook file; the first three are required
+GRADEBOOK_COLUMNS = (
+    'student_id', 'subject_code', 'exam_marks',
+    'assignment_marks', 'max_exam_marks', 'max_assignment_marks',
+    'semester', 'academic_year', 'exam_date', 'remarks',
+)
+GRADEBOOK_REQUIRED_COLUMNS = GRADEBOOK_COLUMNS[:3]
+
+
+class ResultImport(models.TransientModel):
+    _name = 'student_management.result_import'
+    _description = 'Gradebook Import'
+
+    file = fields.Binary(string='Gradebook File', required=True)
+    file_name = fields.Char(string='File Name')
+    created_count = fields.Integer(string='Imported Results', readonly=True)
+    error_count = fields.Integer(string='Rejected Rows', readonly=True)
+    error_report = fields.Text(string='Errors', readonly=True)
+    state = fields.Selection([
+        ('draft', 'Upload'),
+        ('done', 'Done')
+    ], default='draft')
+
+    @api.model
+    def _iter_rows(self, stream, file_name):
+        """Yield ``(row number, {column: value})`` from a CSV or XLSX file
+        without loading it in memory; the first row holds the column names"""
+        if (file_name or '').lower().endswith('.xlsx'):
+            if openpyxl is None:
+                raise UserError("The openpyxl Python package is required to import XLSX files.")
+            workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+            try:
+                rows = workbook.active.iter_rows(values_only=True)
+                header = [str(name or '').strip().lower() for name in next(rows, ())]
+                self._check_header(header)
+                for number, values in enumerate(rows, start=2):
+                    if any(value not in (None, '') for value in values):
+                        yield number, dict(zip(header, values))
+            finally:
+                workbook.close()
+        else:
+            reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+            header = [name.strip().lower() for name in next(reader, [])]
+            self._check_header(header)
+            for number, values in enumerate(reader, start=2):
+                if any(value.strip() for value in values):
+                    yield number, dict(zip(header, values))
+
+    @api.model
+    def _check_header(self, header):
+        missing = [column for column in GRADEBOOK_REQUIRED_COLUMNS if column not in header]
+        if missing:
+            raise UserError(f"The gradebook is missing the columns {', '.join(missing)}.")
+
+    @api.model
+    def _to_text(self, value):
+        if value is None:
+            return ''
+        # Spreadsheets turn identifiers such as 1001 into 1001.0
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value).strip()
+
+    @api.model
+    def _to_float(self, value, column, default=None):
+        text = self._to_text(value)
+        if not text:
+            if default is None:
+                raise ValueError(f"Missing {column}.")
+            return default
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"Invalid {column} '{text}'.")
+
+    @api.model
+    def _to_date(self, value):
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        text = self._to_text(value)
+        if not text:
+            return False
+        try:
+            return fields.Date.to_date(text)
+        except ValueError:
+            raise ValueError(f"Invalid exam_date '{text}', expected YYYY-MM-DD.")
+
+    @api.model
+    def _get_reference_maps(self, subjects=None):
+        """Students by student number and subjects by code, preloaded with
+        one query each; ``subjects`` restricts the importable subjects"""
+        Subject = self.env['student_management.subject'].sudo()
+        subject_domain = [('id', 'in', subjects.ids)] if subjects is not None else []
+        subject_map = {
+            subject['subject_code']: (subject['id'], subject['course_id'] and subject['course_id'][0])
+            for subject in Subject.search_read(subject_domain, ['subject_code', 'course_id'])
+            if subject['subject_code']
+        }
+        student_domain = [('student_id', '!=', 'New')]
+        if subjects is not None:
+            student_domain.append(('course_id', 'in', list({course for _id, course in subject_map.values()})))
+        student_map = {
+            student['student_id']: (student['id'], student['course_id'] and student['course_id'][0])
+            for student in self.env['student_management.student'].sudo().search_read(
+                student_domain, ['student_id', 'course_id']
+            )
+            if student['student_id']
+        }
+        return student_map, subject_map
+
+    @api.model
+    def _parse_row(self, row, student_map, subject_map):
+        """Values of a result from a gradebook row; raises ValueError with
+        the reason the row is rejected"""
+        missing = [column for column in GRADEBOOK_REQUIRED_COLUMNS if not self._to_text(row.get(column))]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)}.")
+        student_number = self._to_text(row['student_id'])
+        subject_code = self._to_text(row['subject_code'])
+        if student_number not in student_map:
+            raise ValueError(f"Unknown student '{student_number}'.")
+        if subject_code not in subject_map:
+            raise ValueError(f"Unknown or unauthorized subject '{subject_code}'.")
+        student_id, student_course = student_map[student_number]
+        subject_id, subject_course = subject_map[subject_code]
+        if subject_course and student_course != subject_course:
+            raise ValueError(f"Student '{student_number}' is not enrolled in the course of '{subject_code}'.")
+
+        semester = self._to_text(row.get('semester'))
+        if semester:
+            try:
+                semester = int(float(semester))
+            except ValueError:
+                raise ValueError(f"Invalid semester '{semester}'.")
+        return {
+            'student_id': student_id,
+            'subject_id': subject_id,
+            'subject_exam_marks': self._to_float(row.get('exam_marks'), 'exam_marks'),
+            'subject_assignment_marks': self._to_float(row.get('assignment_marks'), 'assignment_marks', 0.0),
+            'max_exam_marks': self._to_float(row.get('max_exam_marks'), 'max_exam_marks', 100.0),
+            'max_assignment_marks': self._to_float(row.get('max_assignment_marks'), 'max_assignment_marks', 100.0),
+            'semester': semester or False,
+            'academic_year': self._to_text(row.get('academic_year')) or False,
+            'exam_date': self._to_date(row.get('exam_date')),
+            'remarks': self._to_text(row.get('remarks')) or False,
+        }
+
+    @api.model
+    def _validate_marks(self, vals_list):
+        """Reason each row breaks the mark constraints of the results, or
+        None, checked on the whole chunk before it is created"""
+        errors = []
+        for vals in vals_list:
+            error = None
+            for marks, maximum, label in (
+                ('subject_exam_marks', 'max_exam_marks', 'Exam'),
+                ('subject_assignment_marks', 'max_assignment_marks', 'Assignment'),
+            ):
+                if vals[maximum] <= 0:
+                    error = f"Maximum {label.lower()} marks must be greater than 0."
+                elif vals[marks] < 0:
+                    error = f"{label} marks cannot be negative."
+                elif vals[marks] > vals[maximum]:
+                    error = f"{label} marks {vals[marks]:g} exceed the maximum of {vals[maximum]:g}."
+                if error:
+                    break
+            errors.append(error)
+        return errors
+
+    @api.model
+    def _result_key(self, student_id, subject_id, semester, academic_year):
+        return student_id, subject_id, semester or 0, academic_year or ''
+
+    @api.model
+    def _create_chunk(self, chunk, report):
+        """Create the valid rows of ``chunk`` (a list of ``(row number,
+        values)``) with one multi-create; the existing results are looked up
+        with one query"""
+        Result = self.env['student_management.student_result'].sudo()
+        valid = []
+        for (number, vals), error in zip(chunk, self._validate_marks([vals for _number, vals in chunk])):
+            if error:
+                report['errors'].append({'row': number, 'error': error})
+            else:
+                valid.append((number, vals))
+        if not valid:
+            return
+
+        existing = {
+            self._result_key(result['student_id'][0], result['subject_id'][0],
+                             result['semester'], result['academic_year'])
+            for result in Result.search_read([
+                ('student_id', 'in', list({vals['student_id'] for _number, vals in valid})),
+                ('subject_id', 'in', list({vals['subject_id'] for _number, vals in valid})),
+            ], ['student_id', 'subject_id', 'semester', 'academic_year'])
+        }
+        to_create = []
+        for number, vals in valid:
+            if self._result_key(vals['student_id'], vals['subject_id'], vals['semester'], vals['academic_year']) in existing:
+                report['errors'].append({'row': number, 'error': "A result already exists for this student, subject and term."})
+            else:
+                to_create.append((number, vals))
+        if not to_create:
+            return
+
+        try:
+            with self.env.cr.savepoint():
+                Result.create([vals for _number, vals in to_create])
+            report['created'] += len(to_create)
+        except Exception:
+            # Pinpoint the offending rows; the others are still imported
+            for number, vals in to_create:
+                try:
+                    with self.env.cr.savepoint():
+                        Result.create(vals)
+                    report['created'] += 1
+                except Exception as e:
+                    report['errors'].append({'row': number, 'error': str(e)})
+
+    @api.model
+    def _import_gradebook(self, stream, file_name, subjects=None, chunk_size=1000):
+        """Import the results of a gradebook file.
+
+        Rows are streamed from the file, resolved against the preloaded
+        student and subject maps, and created in chunks of ``chunk_size``.
+        Rejected rows do not stop the import; returns the number of
+        created results and the errors as ``{'row', 'error'}`` dicts.
+        """
+        student_map, subject_map = self._get_reference_maps(subjects)
+        report = {'created': 0, 'errors': []}
+        seen = set()
+        chunk = []
+        rows = self._iter_rows(stream, file_name)
+        try:
+            for number, row in rows:
+                try:
+                    vals = self._parse_row(row, student_map, subject_map)
+                except ValueError as e:
+                    report['errors'].append({'row': number, 'error': str(e)})
+                    continue
+                key = self._result_key(vals['student_id'], vals['subject_id'], vals['semester'], vals['academic_year'])
+                if key in seen:
+                    report['errors'].append({'row': number, 'error': "Duplicate row for this student, subject and term."})
+                    continue
+                seen.add(key)
+                chunk.append((number, vals))
+                if len(chunk) >= chunk_size:
+                    self._create_chunk(chunk, report)
+                    chunk = []
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise UserError(f"The gradebook file could not be read: {e}")
+        finally:
+            rows.close()
+        self._create_chunk(chunk, report)
+        _logger.info("Gradebook %s: %s results imported, %s rows rejected",
+                     file_name, report['created'], len(report['errors']))
+        return report
+
+    def action_import(self):
+        """Import the uploaded gradebook and show the report"""
+        self.ensure_one()
+        report = self._import_gradebook(io.BytesIO(base64.b64decode(self.file)), self.file_name)
+        self.write({
+            'state': 'done',
+            'created_count': report['created'],
+            'error_count': len(report['errors']),
+            'error_report': '\n'.join(f"Row {error['row']}: {error['error']}" for error in report['errors']),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
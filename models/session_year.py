@@ -15,7 +15,9 @@ class SessionYear(models.Model):
         'mail.activity.mixin',         # لدعم الأنشطة المجدولة
         'mail.tracking.duration.mixin',# لتتبع مدة المراحل
         'ir.attachment',               # لربط المرفقات مباشرة بالنموذج
+        'student_management.dashboard.mixin',  # لتحديث عدادات لوحة التحكم
     ]
+    _dashboard_counters = ('total_sessions',)
 
     session_start_year = fields.Date(
         string='Session Start Year',
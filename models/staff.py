@@ -4,8 +4,9 @@ from odoo.exceptions import ValidationError, AccessError, UserError
 _logger = logging.getLogger(__name__)
 
 class Staff(models.Model):
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'student_management.dashboard.mixin']
     _name = 'student_management.staff'
+    _dashboard_counters = ('total_staff',)
     _description = 'Staff Member'
     _order = 'name'
     _rec_name = 'name'
@@ -127,6 +128,12 @@ class Staff(models.Model):
         string='Notifications'
     )
 
+    _sql_constraints = [
+        ('employee_id_unique',
+         "EXCLUDE USING btree (employee_id WITH =) WHERE (employee_id <> '')",
+         'Employee ID already exists.'),
+    ]
+
     
 
     def _compute_subject_count(self):
@@ -145,20 +152,7 @@ class Staff(models.Model):
         for record in self:
             record.notification_count = len(record.notification_ids)
 
-    @api.constrains('employee_id')
-    def _check_employee_id_unique(self):
-        for record in self:
-            if record.employee_id:
-                existing = self.search([
-                    ('id', '!=', record.id),
-                    ('employee_id', '=', record.employee_id)
-                ])
-                if existing:
-                    raise ValidationError(
-                        f"Employee ID '{record.employee_id}' already exists."
-                    )
-
-    @api.constrains('user_id', 'employee_id')
+    @api.constrains('user_id')
     def _check_unique_records(self):
         for record in self:
             if not record.active:
@@ -175,18 +169,6 @@ class Staff(models.Model):
                         "User account is already linked to active staff member: %s (ID: %s)" %
                         (existing_user.name, existing_user.id)
                     )
-            
-            if record.employee_id:
-                existing_emp = self.search([
-                    ('id', '!=', record.id),
-                    ('employee_id', '=', record.employee_id),
-                    ('active', '=', True)
-                ], limit=1)
-                if existing_emp:
-                    raise ValidationError(
-                        "Employee ID already exists for active staff member: %s (ID: %s)" %
-                        (existing_emp.name, existing_emp.id)
-                    )
 
     @api.constrains('experience_years')
     def _check_experience_years(self):
@@ -196,9 +178,22 @@ class Staff(models.Model):
                     "Years of experience cannot be negative."
                 )
 
+    def _check_employee_ids_available(self, employee_ids):
+        """Name the duplicate employee ID before employee_id_unique rejects it"""
+        employee_ids = [employee_id for employee_id in employee_ids if employee_id]
+        duplicate = next((eid for eid in employee_ids if employee_ids.count(eid) > 1), None)
+        if not duplicate and employee_ids:
+            duplicate = self.with_context(active_test=False).search_fetch([
+                ('employee_id', 'in', employee_ids),
+                ('id', 'not in', self.ids)
+            ], ['employee_id'], limit=1).employee_id
+        if duplicate:
+            raise ValidationError(f"Employee ID '{duplicate}' already exists.")
+
     @api.model_create_multi
     def create(self, vals_list):
         """Override create to ensure users are assigned to staff group"""
+        self._check_employee_ids_available([vals.get('employee_id') for vals in vals_list])
         staffs = super().create(vals_list)
         staff_group = self.env.ref('odoo_student_management.group_student_management_staff', raise_if_not_found=False)
         
@@ -284,6 +279,8 @@ class Staff(models.Model):
             return super(Staff, self).write(filtered_vals)
         
         # إذا كان المستخدم مديرًا، اسمح له بتعديل كل شيء
+        if vals.get('employee_id'):
+            self._check_employee_ids_available([vals['employee_id']] * len(self))
         return super(Staff, self).write(vals)
 
 
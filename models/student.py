@@ -1,5 +1,6 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
 
 
 class Student(models.Model):
@@ -7,7 +8,9 @@ class Student(models.Model):
     _description = 'Student'
     _order = 'name'
     _rec_name = 'name'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'student_management.dashboard.mixin']
+    _dashboard_counters = ('total_students',)
+    _dashboard_fields = ('active', 'course_id')
 
     # Basic Information
     user_id = fields.Many2one(
@@ -15,7 +18,8 @@ class Student(models.Model):
         string='User Account',
         required=True,
         ondelete='cascade',
-        help='Linked user account for login'
+        help='Linked user account for login',
+        index=True
     )
     name = fields.Char(
         string='Name',
@@ -67,14 +71,16 @@ class Student(models.Model):
         string='Course',
         required=True,
         ondelete='restrict',
-        help='Course in which the student is enrolled'
+        help='Course in which the student is enrolled',
+        index=True
     )
     session_year_id = fields.Many2one(
         'student_management.session_year',
         string='Session Year',
         required=True,
         ondelete='cascade',
-        help='Academic session year of enrollment'
+        help='Academic session year of enrollment',
+        index=True
     )
     admission_date = fields.Date(
         string='Admission Date',
@@ -97,6 +103,18 @@ class Student(models.Model):
     )
     
     # Related fields for statistics
+    attendance_total_count = fields.Integer(
+        string='Attendance Sessions',
+        default=0,
+        readonly=True,
+        help='Number of attendance reports recorded for the student'
+    )
+    attendance_present_count = fields.Integer(
+        string='Sessions Attended',
+        default=0,
+        readonly=True,
+        help='Number of attendance reports marked present'
+    )
     attendance_percentage = fields.Float(
         string='Overall Attendance %',
         compute='_compute_attendance_percentage',
@@ -165,15 +183,79 @@ class Student(models.Model):
         compute='_compute_overall_grade'
     )
 
+    _sql_constraints = [
+        ('student_id_unique',
+         "EXCLUDE USING btree (student_id WITH =) WHERE (student_id <> 'New')",
+         'Student ID already exists.'),
+    ]
+
+    def init(self):
+        # Class rosters: students of a course in a session year
+        create_index(self.env.cr, 'student_management_student_course_session_index',
+                     self._table, ['course_id', 'session_year_id'])
+
+    @api.depends('attendance_total_count', 'attendance_present_count')
     def _compute_attendance_percentage(self):
         for record in self:
-            total_attendance = len(record.attendance_report_ids)
-            if total_attendance > 0:
-                present_count = len(record.attendance_report_ids.filtered('status'))
-                record.attendance_percentage = (present_count / total_attendance) * 100
+            if record.attendance_total_count > 0:
+                record.attendance_percentage = (record.attendance_present_count / record.attendance_total_count) * 100
             else:
                 record.attendance_percentage = 0.0
 
+    @api.model
+    def _apply_attendance_deltas(self, deltas):
+        """Add counter deltas to the students with a single UPDATE.
+
+        ``deltas`` maps a student id to a ``[total_delta, present_delta]``
+        pair. Rows are updated in id order to keep concurrent roll calls
+        from deadlocking on the same students.
+        """
+        rows = sorted(
+            (student_id, total, present)
+            for student_id, (total, present) in deltas.items()
+            if student_id and (total or present)
+        )
+        if not rows:
+            return
+        self.env.cr.execute(f"""
+            UPDATE student_management_student AS s
+               SET attendance_total_count = GREATEST(s.attendance_total_count + v.total, 0),
+                   attendance_present_count = GREATEST(s.attendance_present_count + v.present, 0),
+                   attendance_percentage = CASE
+                       WHEN s.attendance_total_count + v.total > 0
+                       THEN 100.0 * GREATEST(s.attendance_present_count + v.present, 0)
+                            / (s.attendance_total_count + v.total)
+                       ELSE 0 END
+              FROM (VALUES {', '.join(['%s'] * len(rows))}) AS v(id, total, present)
+             WHERE s.id = v.id
+        """, rows)
+        self.invalidate_model(['attendance_total_count', 'attendance_present_count', 'attendance_percentage'])
+
+    @api.model
+    def _recompute_attendance_counters(self):
+        """Recompute the attendance counters of every student from the
+        aggregate table with one grouped statement."""
+        self.env['student_management.attendance_stat'].flush_model()
+        self.env.cr.execute("""
+            UPDATE student_management_student AS s
+               SET attendance_total_count = COALESCE(agg.total, 0),
+                   attendance_present_count = COALESCE(agg.present, 0),
+                   attendance_percentage = CASE
+                       WHEN COALESCE(agg.total, 0) > 0 THEN 100.0 * agg.present / agg.total
+                       ELSE 0 END
+              FROM student_management_student AS src
+         LEFT JOIN (SELECT student_id, SUM(total_count) AS total, SUM(present_count) AS present
+                      FROM student_management_attendance_stat
+                  GROUP BY student_id) AS agg ON agg.student_id = src.id
+             WHERE s.id = src.id
+        """)
+        self.invalidate_model(['attendance_total_count', 'attendance_present_count', 'attendance_percentage'])
+        return True
+
+    def _get_dashboard_keys(self):
+        # The course decides which subjects the student dashboard lists
+        return super()._get_dashboard_keys() + [f'student_dashboard:{student_id}' for student_id in self.ids]
+
     def _compute_leave_count(self):
         for record in self:
             record.leave_count = len(record.leave_ids)
@@ -190,19 +272,6 @@ class Student(models.Model):
         for record in self:
             record.result_count = len(record.result_ids)
 
-    @api.constrains('student_id')
-    def _check_student_id_unique(self):
-        for record in self:
-            if record.student_id and record.student_id != 'New':
-                existing = self.search([
-                    ('id', '!=', record.id),
-                    ('student_id', '=', record.student_id)
-                ], limit=1)
-                if existing:
-                    raise ValidationError(
-                        f"Student ID '{record.student_id}' already exists."
-                    )
-
     @api.constrains('user_id')
     def _check_user_id_unique(self):
         for record in self:
@@ -224,6 +293,18 @@ class Student(models.Model):
                     "Current semester must be greater than 0."
                     )
 
+    def _check_student_ids_available(self, student_ids):
+        """Name the duplicate Student ID before student_id_unique rejects it"""
+        student_ids = [student_id for student_id in student_ids if student_id and student_id != 'New']
+        duplicate = next((sid for sid in student_ids if student_ids.count(sid) > 1), None)
+        if not duplicate and student_ids:
+            duplicate = self.with_context(active_test=False).search_fetch([
+                ('student_id', 'in', student_ids),
+                ('id', 'not in', self.ids)
+            ], ['student_id'], limit=1).student_id
+        if duplicate:
+            raise ValidationError(f"Student ID '{duplicate}' already exists.")
+
     @api.model_create_multi
     def create(self, vals_list):
         """
@@ -263,6 +344,8 @@ class Student(models.Model):
             if student_ids_to_assign[i]:
                 vals['student_id'] = student_ids_to_assign[i]
         
+        self._check_student_ids_available([vals.get('student_id') for vals in vals_list])
+
         # رابعاً: إنشاء السجلات
         students = super(Student, self).create(vals_list)
         
@@ -281,6 +364,9 @@ class Student(models.Model):
         """
         Override write to update subjects when course changes
         """
+        if vals.get('student_id'):
+            self._check_student_ids_available([vals['student_id']] * len(self))
+
         # إذا تم تغيير الدورة، قم بتحديث المواد المرتبطة بالطالب
         if 'course_id' in vals:
             subjects = self.env['student_management.subject'].search([
@@ -291,7 +377,20 @@ class Student(models.Model):
             else:
                 vals['subject_ids'] = [(5, 0, 0)]  # إزالة جميع المواد إذا لم توجد
         
+        # Leave requests are filed in the balance ledger under the student's session year
+        leaves = self.env['student_management.leave_report_student']
+        if 'session_year_id' in vals:
+            leaves = leaves.search([('student_id', 'in', self.ids)])
+            balance_deltas = leaves._get_leave_balance_deltas(sign=-1)
+
         result = super(Student, self).write(vals)
+        # The course and session year decide which broadcasts reach the student
+        if 'course_id' in vals or 'session_year_id' in vals:
+            self.env['student_management.notification_inbox']._recompute_for_users(self.user_id)
+        if leaves:
+            for key, delta in leaves._get_leave_balance_deltas().items():
+                balance_deltas[key] = [old + new for old, new in zip(balance_deltas[key], delta)]
+            leaves._apply_leave_balance_deltas(balance_deltas)
         return result
 
     def action_view_attendance(self):
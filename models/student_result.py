@@ -1,5 +1,8 @@
+from collections import defaultdict
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 
 class StudentResult(models.Model):
@@ -20,7 +23,8 @@ class StudentResult(models.Model):
         string='Subject',
         required=True,
         ondelete='cascade',
-        help='Subject for which the result is recorded'
+        help='Subject for which the result is recorded',
+        index=True
     )
     
     # Marks and Grades
@@ -66,13 +70,13 @@ class StudentResult(models.Model):
     )
     grade = fields.Char(
         string='Grade',
-        compute='_compute_grade',
+        compute='_compute_grading',
         store=True,
         help='Grade based on percentage'
     )
     grade_point = fields.Float(
         string='Grade Point',
-        compute='_compute_grade_point',
+        compute='_compute_grading',
         store=True,
         help='Grade point based on percentage'
     )
@@ -80,7 +84,16 @@ class StudentResult(models.Model):
         ('pass', 'Pass'),
         ('fail', 'Fail'),
         ('absent', 'Absent')
-    ], string='Status', compute='_compute_status', store=True)
+    ], string='Status', compute='_compute_grading', store=True)
+    grade_scale_id = fields.Many2one(
+        'student_management.grade_scale',
+        string='Grade Scale',
+        compute='_compute_grading',
+        store=True,
+        ondelete='set null',
+        index=True,
+        help='Grade scale used to grade the result'
+    )
     
     # Additional Information
     exam_date = fields.Date(
@@ -106,7 +119,8 @@ class StudentResult(models.Model):
         string='Course',
         related='student_id.course_id',
         store=True,
-        readonly=True
+        readonly=True,
+        index=True
     )
     session_year_id = fields.Many2one(
         'student_management.session_year',
@@ -129,6 +143,13 @@ class StudentResult(models.Model):
         store=True
     )
 
+    _sql_constraints = [
+        ('student_subject_term_unique',
+         "EXCLUDE USING btree (student_id WITH =, subject_id WITH =, "
+         "(COALESCE(semester, 0)) WITH =, (COALESCE(academic_year, '')) WITH =)",
+         'Result for this student in this subject for this semester/academic year already exists.'),
+    ]
+
     @api.depends('student_id', 'subject_id', 'total_marks', 'grade')
     def _compute_display_name(self):
         for record in self:
@@ -155,52 +176,26 @@ class StudentResult(models.Model):
             else:
                 record.percentage = 0.0
 
-    @api.depends('percentage')
-    def _compute_grade(self):
-        for record in self:
-            percentage = record.percentage
-            if percentage >= 90:
-                record.grade = 'A+'
-            elif percentage >= 80:
-                record.grade = 'A'
-            elif percentage >= 70:
-                record.grade = 'B+'
-            elif percentage >= 60:
-                record.grade = 'B'
-            elif percentage >= 50:
-                record.grade = 'C+'
-            elif percentage >= 40:
-                record.grade = 'C'
-            elif percentage >= 35:
-                record.grade = 'D'
-            else:
-                record.grade = 'F'
-
-    @api.depends('percentage')
-    def _compute_grade_point(self):
-        for record in self:
-            percentage = record.percentage
-            if percentage >= 90:
-                record.grade_point = 4.0
-            elif percentage >= 80:
-                record.grade_point = 3.7
-            elif percentage >= 70:
-                record.grade_point = 3.3
-            elif percentage >= 60:
-                record.grade_point = 3.0
-            elif percentage >= 50:
-                record.grade_point = 2.7
-            elif percentage >= 40:
-                record.grade_point = 2.3
-            elif percentage >= 35:
-                record.grade_point = 2.0
-            else:
-                record.grade_point = 0.0
+    @api.depends('percentage', 'total_marks', 'course_id', 'session_year_id')
+    def _compute_grading(self):
+        """Grade, grade point and status of the whole recordset in one pass.
 
-    @api.depends('percentage')
-    def _compute_status(self):
+        The grade scales are loaded once; each result is graded with the
+        scale of its course and session year, falling back to the course
+        scale, the session year scale, the default scale and finally the
+        built-in bands.
+        """
+        graders = self.env['student_management.grade_scale']._get_graders()
+        default = graders.get((False, False)) or self.env['student_management.grade_scale']._get_default_grader()
         for record in self:
-            if record.percentage >= 35:  # Passing percentage
+            course_id, session_year_id = record.course_id.id, record.session_year_id.id
+            grader = (graders.get((course_id, session_year_id))
+                      or graders.get((course_id, False))
+                      or graders.get((False, session_year_id))
+                      or default)
+            record.grade, record.grade_point = grader.classify(record.percentage)
+            record.grade_scale_id = grader.scale_id
+            if record.percentage >= grader.pass_mark:
                 record.status = 'pass'
             elif record.total_marks == 0 and record.subject_exam_marks == 0 and record.subject_assignment_marks == 0:
                 record.status = 'absent'
@@ -227,26 +222,60 @@ class StudentResult(models.Model):
             if record.subject_assignment_marks > record.max_assignment_marks:
                 raise ValidationError("Assignment marks cannot exceed maximum assignment marks.")
 
-    @api.constrains('student_id', 'subject_id', 'semester', 'academic_year')
-    def _check_unique_result(self):
-        for record in self:
-            domain = [
-                ('id', '!=', record.id),
-                ('student_id', '=', record.student_id.id),
-                ('subject_id', '=', record.subject_id.id)
-            ]
-            if record.semester:
-                domain.append(('semester', '=', record.semester))
-            if record.academic_year:
-                domain.append(('academic_year', '=', record.academic_year))
-            
-            existing = self.search(domain)
-            if existing:
+    def _check_results_available(self, terms):
+        """
+        Name the clashing result before the flush reaches
+        student_subject_term_unique. A result without semester or academic
+        year clashes with any term of the same student and subject.
+        """
+        terms = [term for term in terms if term[0] and term[1]]
+        if not terms:
+            return
+        existing = self.search_fetch([
+            ('student_id', 'in', list({term[0] for term in terms})),
+            ('subject_id', 'in', list({term[1] for term in terms})),
+            ('id', 'not in', self.ids)
+        ], ['student_id', 'subject_id', 'semester', 'academic_year'])
+        by_pair = defaultdict(list)
+        for result in existing:
+            by_pair[result.student_id.id, result.subject_id.id].append(
+                (result.semester, result.academic_year or False))
+        for student_id, subject_id, semester, academic_year in terms:
+            by_pair[student_id, subject_id].append((semester, academic_year))
+
+        for student_id, subject_id, semester, academic_year in terms:
+            others = list(by_pair[student_id, subject_id])
+            others.remove((semester, academic_year))
+            if any((not semester or other_semester == semester)
+                   and (not academic_year or other_year == academic_year)
+                   for other_semester, other_year in others):
+                student = self.env['student_management.student'].browse(student_id)
+                subject = self.env['student_management.subject'].browse(subject_id)
                 raise ValidationError(
-                    f"Result for {record.student_id.name} in {record.subject_id.subject_name} "
+                    f"Result for {student.name} in {subject.subject_name} "
                     f"for this semester/academic year already exists."
                 )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._check_results_available([
+            (vals.get('student_id'), vals.get('subject_id'),
+             vals.get('semester') or 0, vals.get('academic_year') or False)
+            for vals in vals_list
+        ])
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if {'student_id', 'subject_id', 'semester', 'academic_year'} & set(vals):
+            self._check_results_available([
+                (vals.get('student_id', record.student_id.id),
+                 vals.get('subject_id', record.subject_id.id),
+                 vals.get('semester', record.semester) or 0,
+                 vals.get('academic_year', record.academic_year) or False)
+                for record in self
+            ])
+        return super().write(vals)
+
     @api.model
     def get_student_result_summary(self, student_id, semester=None, academic_year=None):
         """Get result summary for a student"""
@@ -292,48 +321,93 @@ class StudentResult(models.Model):
 
     @api.model
     def get_class_result_summary(self, course_id, subject_id=None, semester=None, academic_year=None):
-        """Get result summary for a class/course"""
+        """Get result summary for a class/course.
+
+        Every figure comes from a single aggregate query grouped by
+        ``GROUPING SETS`` over the class, the grades and the subjects: the
+        status counts, the average, median, standard deviation, minimum and
+        maximum percentage, and the same statistics per subject. The query
+        is built on ``_search``, so only the results the user can read are
+        aggregated.
+        """
         domain = [('course_id', '=', course_id)]
-        
         if subject_id:
             domain.append(('subject_id', '=', subject_id))
         if semester:
             domain.append(('semester', '=', semester))
         if academic_year:
             domain.append(('academic_year', '=', academic_year))
-        
-        results = self.search(domain)
-        
-        if not results:
-            return {}
-        
-        total_students = len(results.mapped('student_id'))
-        average_percentage = sum(results.mapped('percentage')) / len(results) if results else 0
-        
-        # Grade distribution
+
+        self.check_access('read')
+        self.flush_model()
+        query = self._search(domain)
+        query.order = None
+        columns = {
+            name: SQL.identifier(self._table, name)
+            for name in ('grade', 'subject_id', 'student_id', 'status', 'percentage')
+        }
+        query.groupby = SQL("GROUPING SETS ((), (%s), (%s))", columns['grade'], columns['subject_id'])
+        self.env.cr.execute(query.select(SQL("""
+            GROUPING(%(grade)s) = 0, GROUPING(%(subject_id)s) = 0, %(grade)s, %(subject_id)s,
+            COUNT(*),
+            COUNT(DISTINCT %(student_id)s),
+            COUNT(*) FILTER (WHERE %(status)s = 'pass'),
+            COUNT(*) FILTER (WHERE %(status)s = 'fail'),
+            COUNT(*) FILTER (WHERE %(status)s = 'absent'),
+            AVG(%(percentage)s),
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY %(percentage)s),
+            stddev_samp(%(percentage)s),
+            MIN(%(percentage)s),
+            MAX(%(percentage)s)
+        """, **columns)))
+
+        overall = None
         grade_distribution = {}
-        for grade in ['A+', 'A', 'B+', 'B', 'C+', 'C', 'D', 'F']:
-            count = len(results.filtered(lambda r: r.grade == grade))
-            grade_distribution[grade] = count
-        
-        # Status distribution
-        passed = len(results.filtered(lambda r: r.status == 'pass'))
-        failed = len(results.filtered(lambda r: r.status == 'fail'))
-        absent = len(results.filtered(lambda r: r.status == 'absent'))
-        
+        subject_stats = {}
+        for (by_grade, by_subject, grade, group_subject_id, count, students, passed, failed, absent,
+             average, median, stddev, minimum, maximum) in self.env.cr.fetchall():
+            statistics = {
+                'average_percentage': average or 0.0,
+                'median_percentage': median or 0.0,
+                'stddev_percentage': stddev or 0.0,
+                'min_percentage': minimum or 0.0,
+                'max_percentage': maximum or 0.0,
+            }
+            if by_grade:
+                grade_distribution[grade] = count
+            elif by_subject:
+                subject_stats[group_subject_id] = {
+                    'total_students': students,
+                    'total_results': count,
+                    'pass_rate': passed / count * 100,
+                    **statistics,
+                }
+            else:
+                overall = (count, students, passed, failed, absent, statistics)
+
+        if not overall or not overall[0]:
+            return {}
+        count, students, passed, failed, absent, statistics = overall
+
+        subjects = self.env['student_management.subject'].browse(list(subject_stats))
         summary = {
-            'total_students': total_students,
-            'total_results': len(results),
-            'average_percentage': average_percentage,
-            'pass_rate': (passed / len(results) * 100) if results else 0,
+            'total_students': students,
+            'total_results': count,
+            'pass_rate': passed / count * 100,
             'grade_distribution': grade_distribution,
             'status_distribution': {
                 'passed': passed,
                 'failed': failed,
                 'absent': absent
-            }
+            },
+            **statistics,
+            'subjects': [{
+                'subject_id': subject.id,
+                'subject_name': subject.subject_name,
+                **subject_stats[subject.id],
+            } for subject in subjects.sorted(lambda subject: subject.subject_name or '')],
         }
-        
+
         return summary
 
 
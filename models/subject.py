@@ -5,7 +5,8 @@ from odoo.exceptions import ValidationError
 class Subject(models.Model):
     _name = 'student_management.subject'
     _description = 'Academic Subject'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'student_management.dashboard.mixin']
+    _dashboard_counters = ('total_subjects',)
     _order = 'subject_name'
     _rec_name = 'subject_name'
 
@@ -32,14 +33,16 @@ class Subject(models.Model):
         string='Course',
         required=True,
         ondelete='cascade',
-        help='Course to which this subject belongs'
+        help='Course to which this subject belongs',
+        index=True
     )
     staff_id = fields.Many2one(
         'student_management.staff',
         string='Assigned Staff',
         required=True,
         ondelete='cascade',
-        help='Staff member assigned to teach this subject'
+        help='Staff member assigned to teach this subject',
+        index=True
     )
     active = fields.Boolean(
         string='Active',
@@ -89,6 +92,12 @@ class Subject(models.Model):
         string='Attendance Reports'
     )
 
+    _sql_constraints = [
+        ('subject_code_unique',
+         "EXCLUDE USING btree (subject_code WITH =) WHERE (subject_code <> '')",
+         'Subject code already exists.'),
+    ]
+
     def _compute_attendance_count(self):
         """Compute attendance count efficiently"""
         for subject in self:
@@ -119,20 +128,6 @@ class Subject(models.Model):
                         f"Subject '{subject.subject_name}' already exists in course '{subject.course_id.course_name}'."
                     )
 
-    @api.constrains('subject_code')
-    def _check_subject_code_unique(self):
-        """Check subject code uniqueness"""
-        for subject in self:
-            if subject.subject_code:
-                existing = self.search([
-                    ('id', '!=', subject.id),
-                    ('subject_code', '=', subject.subject_code)
-                ], limit=1)
-                if existing:
-                    raise ValidationError(
-                        f"Subject code '{subject.subject_code}' already exists."
-                    )
-
     @api.constrains('credits')
     def _check_credits(self):
         """Validate credits value"""
@@ -140,6 +135,28 @@ class Subject(models.Model):
             if subject.credits and subject.credits <= 0:
                 raise ValidationError("Subject credits must be greater than 0.")
 
+    def _check_subject_codes_available(self, codes):
+        """Name the duplicate code before subject_code_unique rejects it"""
+        codes = [code for code in codes if code]
+        duplicate = next((code for code in codes if codes.count(code) > 1), None)
+        if not duplicate and codes:
+            duplicate = self.with_context(active_test=False).search_fetch([
+                ('subject_code', 'in', codes),
+                ('id', 'not in', self.ids)
+            ], ['subject_code'], limit=1).subject_code
+        if duplicate:
+            raise ValidationError(f"Subject code '{duplicate}' already exists.")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._check_subject_codes_available([vals.get('subject_code') for vals in vals_list])
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if vals.get('subject_code'):
+            self._check_subject_codes_available([vals['subject_code']] * len(self))
+        return super().write(vals)
+
     def action_view_attendance(self):
         """Action to view attendance records for this subject"""
         self.ensure_one()
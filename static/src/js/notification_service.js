@@ -0,0 +1,24 @@
+/** @odoo-module **/
+
+import { registry } from "@web/core/registry";
+
+// Receives the notifications pushed by the server on the bus and
+// updates the unread badges, so pages no longer poll the JSON API.
+export const studentNotificationService = {
+    dependencies: ["bus_service"],
+    start(env, { bus_service }) {
+        bus_service.subscribe("student_management/notification", (payload) => {
+            document.querySelectorAll("[data-sm-unread-badge]").forEach((badge) => {
+                const count = parseInt(badge.textContent, 10) || 0;
+                badge.textContent = count + 1;
+                badge.classList.remove("d-none");
+            });
+            document.dispatchEvent(
+                new CustomEvent("student_management:notification", { detail: payload })
+            );
+        });
+        bus_service.start();
+    },
+};
+
+registry.category("services").add("student_management_notification", studentNotificationService);
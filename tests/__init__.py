@@ -0,0 +1,6 @@
+from . import test_attendance_bulk
+from . import test_attendance_stat
+from . import test_push_outbox
+from . import test_leave_balance
+from . import test_grading
+from . import test_result_import
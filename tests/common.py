@@ -0,0 +1,33 @@
+from datetime import date
+
+from odoo.tests.common import TransactionCase
+
+
+class StudentManagementCase(TransactionCase):
+    """A course with one subject, its staff member and two students"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, no_reset_password=True))
+        cls.session_year = cls.env['student_management.session_year'].create({
+            'session_start_year': date(2025, 9, 1),
+            'session_end_year': date(2026, 6, 30),
+        })
+        cls.course = cls.env['student_management.course'].create({'course_name': 'Computer Science'})
+        cls.staff = cls.env['student_management.staff'].create({'user_id': cls._create_user('teacher').id})
+        cls.subject = cls.env['student_management.subject'].create({
+            'subject_name': 'Algorithms',
+            'subject_code': 'CS101',
+            'course_id': cls.course.id,
+            'staff_id': cls.staff.id,
+        })
+        cls.student, cls.other_student = cls.env['student_management.student'].create([{
+            'user_id': cls._create_user(login).id,
+            'course_id': cls.course.id,
+            'session_year_id': cls.session_year.id,
+        } for login in ('student1', 'student2')])
+
+    @classmethod
+    def _create_user(cls, login):
+        return cls.env['res.users'].create({'name': login.title(), 'login': login})
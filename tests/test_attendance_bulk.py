@@ -0,0 +1,102 @@
+from datetime import date
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+from .common import StudentManagementCase
+
+
+@tagged('post_install', '-at_install')
+class TestSaveAttendanceBulk(StudentManagementCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.day = date(2025, 10, 6)
+        cls.other_course = cls.env['student_management.course'].create({'course_name': 'Mathematics'})
+        cls.outsider = cls.env['student_management.student'].create({
+            'user_id': cls._create_user('outsider').id,
+            'course_id': cls.other_course.id,
+            'session_year_id': cls.session_year.id,
+        })
+
+    def _save(self, student_data):
+        return self.env['student_management.attendance'].save_attendance_bulk(
+            self.subject.id, self.session_year.id, self.day, student_data
+        )
+
+    def _get_attendance(self, student):
+        return self.env['student_management.attendance'].search([
+            ('student_id', '=', student.id),
+            ('subject_id', '=', self.subject.id),
+            ('attendance_date', '=', self.day),
+        ])
+
+    def test_outcome_per_row(self):
+        report = self._save([
+            {'id': self.student.id, 'status': 'present'},
+            {'id': str(self.other_student.id), 'status': 'absent'},
+            {'id': self.student.id, 'status': 'absent'},
+            {'id': self.outsider.id, 'status': 'present'},
+            {'id': 'abc', 'status': 'present'},
+            {'id': self.other_student.id, 'status': 'late'},
+        ])
+        self.assertEqual((report['created'], report['updated'], report['failed']), (2, 0, 4))
+        results = report['results']
+        self.assertEqual([result['result'] for result in results],
+                         ['created', 'created', 'error', 'error', 'error', 'error'])
+        self.assertEqual(results[1]['student_id'], self.other_student.id)
+        self.assertIn('Duplicate entry', results[2]['error'])
+        self.assertIn('not enrolled', results[3]['error'])
+        self.assertIn("Invalid student id 'abc'", results[4]['error'])
+        self.assertIn("Invalid status 'late'", results[5]['error'])
+
+        self.assertEqual(results[0]['attendance_id'], self._get_attendance(self.student).id)
+        self.assertEqual(self._get_attendance(self.student).status, 'present')
+        self.assertEqual(self._get_attendance(self.other_student).status, 'absent')
+        self.assertFalse(self._get_attendance(self.outsider))
+
+    def test_existing_rows_are_updated(self):
+        self._save([{'id': self.student.id, 'status': 'present'}])
+        attendance = self._get_attendance(self.student)
+
+        report = self._save([
+            {'id': self.student.id, 'status': 'absent'},
+            {'id': self.other_student.id, 'status': 'present'},
+        ])
+        self.assertEqual((report['created'], report['updated'], report['failed']), (1, 1, 0))
+        self.assertEqual(report['results'][0], {
+            'student_id': self.student.id, 'result': 'updated', 'status': 'absent', 'attendance_id': attendance.id,
+        })
+        self.assertEqual(self._get_attendance(self.student), attendance)
+        self.assertEqual(attendance.status, 'absent')
+
+    def test_absence_on_leave_is_excused(self):
+        leave = self.env['student_management.leave_report_student'].create({
+            'student_id': self.student.id,
+            'leave_date': date(2025, 10, 6),
+            'leave_end_date': date(2025, 10, 7),
+            'leave_message': 'Medical appointment',
+        })
+        leave.action_approve()
+
+        report = self._save([
+            {'id': self.student.id, 'status': 'absent'},
+            {'id': self.other_student.id, 'status': 'absent'},
+        ])
+        self.assertEqual([result['status'] for result in report['results']], ['excused', 'absent'])
+        self.assertRecordValues(self._get_attendance(self.student), [{
+            'status': 'excused', 'excused_leave_id': leave.id,
+        }])
+
+        # Withdrawing the approval restores the absence the leave excused
+        leave.action_reset_to_pending()
+        self.assertRecordValues(self._get_attendance(self.student), [{
+            'status': 'absent', 'excused_leave_id': False,
+        }])
+
+    def test_unknown_subject(self):
+        with self.assertRaises(ValidationError):
+            self.env['student_management.attendance'].save_attendance_bulk(
+                0, self.session_year.id, self.day, [{'id': self.student.id, 'status': 'present'}]
+            )
@@ -0,0 +1,63 @@
+from datetime import date
+
+from odoo.tests import tagged
+
+from .common import StudentManagementCase
+
+
+@tagged('post_install', '-at_install')
+class TestAttendanceStat(StudentManagementCase):
+
+    def _get_stat(self, student=None):
+        return self.env['student_management.attendance_stat'].search([
+            ('student_id', '=', (student or self.student).id),
+            ('subject_id', '=', self.subject.id),
+            ('session_year_id', '=', self.session_year.id),
+        ])
+
+    def _apply(self, total, present, student=None):
+        self.env['student_management.attendance_stat']._apply_deltas({
+            ((student or self.student).id, self.subject.id, self.session_year.id): [total, present],
+        })
+
+    def test_apply_deltas_inserts_and_updates(self):
+        self._apply(2, 1)
+        stat = self._get_stat()
+        self.assertRecordValues(stat, [{'total_count': 2, 'present_count': 1, 'attendance_percentage': 50.0}])
+
+        self._apply(2, 2)
+        self.assertRecordValues(stat, [{'total_count': 4, 'present_count': 3, 'attendance_percentage': 75.0}])
+
+    def test_apply_deltas_clamps_at_zero(self):
+        self._apply(1, 1)
+        self._apply(-3, -2)
+        self.assertRecordValues(self._get_stat(), [{'total_count': 0, 'present_count': 0, 'attendance_percentage': 0.0}])
+
+        # A negative delta on a missing row inserts it clamped
+        self._apply(-1, -1, student=self.other_student)
+        self.assertRecordValues(self._get_stat(self.other_student), [{'total_count': 0, 'present_count': 0}])
+
+    def test_reports_move_the_counters(self):
+        session = self.env['student_management.attendance'].create({
+            'student_id': self.student.id,
+            'subject_id': self.subject.id,
+            'session_year_id': self.session_year.id,
+            'attendance_date': date(2025, 10, 1),
+        })
+        report = self.env['student_management.attendance_report'].create({
+            'student_id': self.student.id,
+            'attendance_id': session.id,
+            'status': True,
+        })
+        self.assertRecordValues(self._get_stat(), [{'total_count': 1, 'present_count': 1}])
+
+        report.status = False
+        self.assertRecordValues(self._get_stat(), [{'total_count': 1, 'present_count': 0}])
+
+        # Excused absences are left out of the statistics
+        report.is_excused = True
+        self.assertRecordValues(self._get_stat(), [{'total_count': 0, 'present_count': 0}])
+
+        report.write({'is_excused': False, 'status': True})
+        report.unlink()
+        self.assertRecordValues(self._get_stat(), [{'total_count': 0, 'present_count': 0}])
@@ -0,0 +1,68 @@
+from odoo.tests import tagged
+
+from odoo.addons.odoo_student_management.models.grade_scale import Grader
+
+from .common import StudentManagementCase
+
+
+@tagged('post_install', '-at_install')
+class TestGrader(StudentManagementCase):
+
+    def test_classify(self):
+        # Bands are sorted by the grader, whatever their input order
+        grader = Grader([(50.0, 'B', 3.0), (80.0, 'A', 4.0), (0.0, 'F', 0.0)], 50.0)
+        self.assertEqual(grader.classify(100.0), ('A', 4.0))
+        self.assertEqual(grader.classify(80.0), ('A', 4.0))
+        self.assertEqual(grader.classify(79.99), ('B', 3.0))
+        self.assertEqual(grader.classify(50.0), ('B', 3.0))
+        self.assertEqual(grader.classify(0.0), ('F', 0.0))
+
+    def test_classify_below_lowest_band(self):
+        grader = Grader([(40.0, 'P', 1.0)], 40.0)
+        self.assertEqual(grader.classify(39.0), (False, 0.0))
+
+
+@tagged('post_install', '-at_install')
+class TestResultGrading(StudentManagementCase):
+
+    def _create_result(self, exam_marks, assignment_marks):
+        return self.env['student_management.student_result'].create({
+            'student_id': self.student.id,
+            'subject_id': self.subject.id,
+            'subject_exam_marks': exam_marks,
+            'subject_assignment_marks': assignment_marks,
+            'max_exam_marks': 100.0,
+            'max_assignment_marks': 100.0,
+        })
+
+    def test_default_scale(self):
+        result = self._create_result(80.0, 90.0)
+        self.assertRecordValues(result, [{'percentage': 85.0, 'grade': 'A', 'grade_point': 3.7, 'status': 'pass'}])
+
+        result.write({'subject_exam_marks': 20.0, 'subject_assignment_marks': 30.0})
+        self.assertRecordValues(result, [{'grade': 'F', 'status': 'fail'}])
+
+        result.write({'subject_exam_marks': 0.0, 'subject_assignment_marks': 0.0})
+        self.assertEqual(result.status, 'absent')
+
+    def test_course_scale_takes_over(self):
+        result = self._create_result(80.0, 90.0)
+        scale = self.env['student_management.grade_scale'].create({
+            'name': 'Honours',
+            'course_id': self.course.id,
+            'pass_mark': 90.0,
+            'line_ids': [
+                (0, 0, {'grade': 'Distinction', 'min_percentage': 90.0, 'grade_point': 4.0}),
+                (0, 0, {'grade': 'Merit', 'min_percentage': 75.0, 'grade_point': 3.0}),
+                (0, 0, {'grade': 'Fail', 'min_percentage': 0.0, 'grade_point': 0.0}),
+            ],
+        })
+        # Changing a scale only queues the regrading
+        self.assertTrue(scale.recompute_pending)
+        self.assertEqual(result.grade, 'A')
+
+        count = scale._regrade(scale._get_scope_domain())
+        self.assertEqual(count, 1)
+        self.assertRecordValues(result, [{
+            'grade': 'Merit', 'grade_point': 3.0, 'status': 'fail', 'grade_scale_id': scale.id,
+        }])
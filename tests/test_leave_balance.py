@@ -0,0 +1,74 @@
+from datetime import date
+
+from odoo.tests import tagged
+
+from .common import StudentManagementCase
+
+
+@tagged('post_install', '-at_install')
+class TestLeaveBalance(StudentManagementCase):
+
+    def _get_balance(self, student=None):
+        return self.env['student_management.leave_balance'].search([
+            ('student_id', '=', (student or self.student).id),
+            ('session_year_id', '=', self.session_year.id),
+        ])
+
+    def _create_leave(self, leave_date, leave_end_date=False):
+        return self.env['student_management.leave_report_student'].create({
+            'student_id': self.student.id,
+            'leave_date': leave_date,
+            'leave_end_date': leave_end_date,
+            'leave_message': 'Family event',
+        })
+
+    def test_requests_move_the_ledger(self):
+        leave = self._create_leave(date(2025, 11, 3), date(2025, 11, 4))
+        balance = self._get_balance()
+        self.assertRecordValues(balance, [{'pending_count': 1, 'pending_days': 2, 'approved_count': 0}])
+
+        leave.action_approve()
+        self.assertRecordValues(balance, [{
+            'pending_count': 0, 'pending_days': 0, 'approved_count': 1, 'approved_days': 2,
+        }])
+
+        leave.action_reject()
+        self.assertRecordValues(balance, [{'approved_count': 0, 'approved_days': 0, 'rejected_count': 1}])
+
+        leave.unlink()
+        self.assertRecordValues(balance, [{'pending_count': 0, 'approved_count': 0, 'rejected_count': 0}])
+
+    def test_apply_deltas_clamps_at_zero(self):
+        Balance = self.env['student_management.leave_balance']
+        Balance._apply_deltas('student_id', {(self.student.id, self.session_year.id): [1, 0, 0, 3, 0, 0]})
+        Balance._apply_deltas('student_id', {(self.student.id, self.session_year.id): [-2, 0, 0, -5, 0, 0]})
+        self.assertRecordValues(self._get_balance(), [{'pending_count': 0, 'pending_days': 0}])
+
+        # A negative delta on a missing row inserts it clamped
+        Balance._apply_deltas('student_id', {(self.other_student.id, self.session_year.id): [-1, 1, 0, -2, 2, 0]})
+        self.assertRecordValues(self._get_balance(self.other_student), [{
+            'pending_count': 0, 'pending_days': 0, 'approved_count': 1, 'approved_days': 2,
+        }])
+
+    def test_requests_without_session_year_share_a_row(self):
+        Balance = self.env['student_management.leave_balance']
+        Balance._apply_deltas('student_id', {(self.student.id, False): [1, 0, 0, 1, 0, 0]})
+        Balance._apply_deltas('student_id', {(self.student.id, False): [1, 0, 0, 2, 0, 0]})
+        balance = Balance.search([('student_id', '=', self.student.id), ('session_year_id', '=', False)])
+        self.assertRecordValues(balance, [{'pending_count': 2, 'pending_days': 3}])
+
+    def test_summary_remaining_days_of_one_session_year(self):
+        self.env['ir.config_parameter'].sudo().set_param('student_management.leave_allowance_days', 10)
+        next_year = self.env['student_management.session_year'].create({
+            'session_start_year': date(2026, 9, 1),
+            'session_end_year': date(2027, 6, 30),
+        })
+        Balance = self.env['student_management.leave_balance']
+        Balance._apply_deltas('staff_id', {
+            (self.staff.id, self.session_year.id): [0, 1, 0, 0, 3, 0],
+            (self.staff.id, next_year.id): [0, 1, 0, 0, 1, 0],
+        })
+        summary = Balance.get_balance_summary('staff_id', self.staff.id, self.session_year.id)
+        self.assertEqual(summary['approved_days'], 4)
+        self.assertEqual(summary['remaining_days'], 7)
+        self.assertEqual(Balance.get_balance_summary('staff_id', self.staff.id, next_year.id)['remaining_days'], 9)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import StudentManagementCase
+
+
+@tagged('post_install', '-at_install')
+class TestPushOutbox(StudentManagementCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['ir.config_parameter'].sudo().set_param('student_management.push_sender', 'stub')
+        cls.retry_student = cls.other_student
+        cls.invalid_student = cls.env['student_management.student'].create({
+            'user_id': cls._create_user('student3').id,
+            'course_id': cls.course.id,
+            'session_year_id': cls.session_year.id,
+        })
+        cls.student.fcm_token = 'ok-device'
+        cls.retry_student.fcm_token = 'retry-device'
+        cls.invalid_student.fcm_token = 'invalid-device'
+
+    def _enqueue(self):
+        Outbox = self.env['student_management.push_outbox']
+        messages = Outbox._enqueue(self.student | self.retry_student | self.invalid_student, 'Exam', 'Room 12')
+        self._make_due(messages)
+        return {message.student_id: message for message in messages}
+
+    def _make_due(self, messages):
+        # The worker compares with the transaction time, earlier than the creation time
+        messages.write({'next_attempt_at': fields.Datetime.now() - timedelta(hours=1)})
+
+    def test_drain_outcomes(self):
+        messages = self._enqueue()
+        report = self.env['student_management.push_outbox']._drain()
+        self.assertEqual(report, {'sent': 1, 'failed': 1, 'retried': 1})
+
+        self.assertRecordValues(messages[self.student], [{'state': 'sent', 'attempts': 1}])
+        self.assertRecordValues(messages[self.invalid_student], [{'state': 'failed', 'attempts': 1}])
+        self.assertFalse(self.invalid_student.fcm_token, "Unregistered tokens are removed from the student")
+
+        retried = messages[self.retry_student]
+        self.assertRecordValues(retried, [{'state': 'pending', 'attempts': 1, 'last_error': 'Temporary failure'}])
+        self.assertGreater(retried.next_attempt_at, fields.Datetime.now())
+
+    def test_retry_backoff(self):
+        Outbox = self.env['student_management.push_outbox']
+        self.assertEqual(Outbox._get_retry_delay(1), timedelta(minutes=1))
+        self.assertEqual(Outbox._get_retry_delay(3), timedelta(minutes=4))
+        self.assertEqual(Outbox._get_retry_delay(20), timedelta(days=1))
+
+        retried = self._enqueue()[self.retry_student]
+        Outbox._drain(max_attempts=3)
+        # Not due yet: the second drain leaves it alone
+        self.assertEqual(Outbox._drain(max_attempts=3), {'sent': 0, 'failed': 0, 'retried': 0})
+
+        self._make_due(retried)
+        Outbox._drain(max_attempts=3)
+        self.assertRecordValues(retried, [{'state': 'pending', 'attempts': 2}])
+
+        self._make_due(retried)
+        Outbox._drain(max_attempts=3)
+        self.assertRecordValues(retried, [{'state': 'failed', 'attempts': 3}])
+
+    def test_sent_after_retry_keeps_attempts(self):
+        retried = self._enqueue()[self.retry_student]
+        Outbox = self.env['student_management.push_outbox']
+        Outbox._drain()
+        retried.write({'token': 'ok-device-2'})
+        self._make_due(retried)
+        Outbox._drain()
+        self.assertRecordValues(retried, [{'state': 'sent', 'attempts': 2}])
+
+    def test_no_sender_leaves_messages_pending(self):
+        self.env['ir.config_parameter'].sudo().set_param('student_management.push_sender', False)
+        messages = self._enqueue()
+        report = self.env['student_management.push_outbox']._drain()
+        self.assertEqual(report, {'sent': 0, 'failed': 0, 'retried': 0})
+        self.assertEqual(set(self.env['student_management.push_outbox'].browse(
+            [message.id for message in messages.values()]).mapped('state')), {'pending'})
@@ -0,0 +1,69 @@
+import io
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import StudentManagementCase
+
+
+@tagged('post_install', '-at_install')
+class TestResultImport(StudentManagementCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.other_course = cls.env['student_management.course'].create({'course_name': 'Mathematics'})
+        cls.other_student.course_id = cls.other_course
+
+    def _import(self, lines, **kwargs):
+        content = '\n'.join(lines).encode()
+        return self.env['student_management.result_import']._import_gradebook(
+            io.BytesIO(content), 'gradebook.csv', **kwargs
+        )
+
+    def test_rows_are_rejected_individually(self):
+        number = self.student.student_id
+        report = self._import([
+            'student_id,subject_code,exam_marks,assignment_marks,semester',
+            f'{number},CS101,70,80,1',
+            'UNKNOWN,CS101,70,80,1',
+            f'{number},XX999,70,80,1',
+            f'{number},CS101,,80,2',
+            f'{number},CS101,120,80,3',
+            f'{number},CS101,abc,80,4',
+            f'{number},CS101,60,80,1',
+            f'{self.other_student.student_id},CS101,60,80,1',
+        ])
+        self.assertEqual(report['created'], 1)
+        errors = {error['row']: error['error'] for error in report['errors']}
+        self.assertEqual(sorted(errors), [3, 4, 5, 6, 7, 8, 9])
+        self.assertIn('Unknown student', errors[3])
+        self.assertIn('Unknown or unauthorized subject', errors[4])
+        self.assertIn('Missing exam_marks', errors[5])
+        self.assertIn('exceed the maximum', errors[6])
+        self.assertIn("Invalid exam_marks 'abc'", errors[7])
+        self.assertIn('Duplicate row', errors[8])
+        self.assertIn('not enrolled', errors[9])
+
+        result = self.env['student_management.student_result'].search([('student_id', '=', self.student.id)])
+        self.assertRecordValues(result, [{'subject_exam_marks': 70.0, 'subject_assignment_marks': 80.0, 'semester': 1}])
+
+    def test_existing_results_are_rejected(self):
+        number = self.student.student_id
+        lines = ['student_id,subject_code,exam_marks,semester', f'{number},CS101,70,1']
+        self.assertEqual(self._import(lines)['created'], 1)
+        report = self._import(lines)
+        self.assertEqual(report['created'], 0)
+        self.assertIn('already exists', report['errors'][0]['error'])
+
+    def test_subjects_restrict_the_import(self):
+        report = self._import([
+            'student_id,subject_code,exam_marks',
+            f'{self.student.student_id},CS101,70',
+        ], subjects=self.env['student_management.subject'])
+        self.assertEqual(report['created'], 0)
+        self.assertIn('Unknown or unauthorized subject', report['errors'][0]['error'])
+
+    def test_missing_required_columns(self):
+        with self.assertRaises(UserError):
+            self._import(['student_id,exam_marks', f'{self.student.student_id},70'])